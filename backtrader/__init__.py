@@ -56,11 +56,14 @@ from .sizers import SizerFix  # old sizer for compatibility
 from .strategy import *
 
 from .writer import *
+from .optsink import *
 
 from .signal import *
+from .vecsignal import *
 
 from .cerebro import *
 from .timer import *
+from .profiler import *
 from .flt import *
 
 from . import utils as utils
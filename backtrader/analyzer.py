@@ -343,12 +343,13 @@ class TimeFrameAnalyzerBase(with_metaclass(MetaTimeFrameAnalyzerBase,
     def on_dt_over(self):
         pass
 
-    def _dt_over(self):
+    def _dt_over(self, dt=None):
         if self.timeframe == TimeFrame.NoTimeFrame:
             dtcmp, dtkey = MAXINT, datetime.datetime.max
         else:
-            # With >= 1.9.x the system datetime is in the strategy
-            dt = self.strategy.datetime.datetime()
+            if dt is None:
+                # With >= 1.9.x the system datetime is in the strategy
+                dt = self.strategy.datetime.datetime()
             dtcmp, dtkey = self._get_dt_cmpkey(dt)
 
         if self.dtcmp is None or dtcmp > self.dtcmp:
@@ -25,6 +25,7 @@ import collections
 import datetime
 
 import backtrader as bt
+from backtrader.brokers.orderbook import OrderBook
 from backtrader.comminfo import CommInfoBase
 from backtrader.order import Order, BuyOrder, SellOrder
 from backtrader.position import Position
@@ -261,7 +262,8 @@ class BackBroker(bt.BrokerBase):
         self._unrealized = 0.0  # no open position
 
         self.orders = list()  # will only be appending
-        self.pending = collections.deque()  # popleft and append(right)
+        self._orefs = dict()  # ref -> order for all transmitted orders
+        self.pending = OrderBook()  # indexed by ref and trigger price
         self._toactivate = collections.deque()  # to activate in next cycle
 
         self.positions = collections.defaultdict(Position)
@@ -389,10 +391,8 @@ class BackBroker(bt.BrokerBase):
     fundvalue = property(get_fundvalue)
 
     def cancel(self, order, bracket=False):
-        try:
-            self.pending.remove(order)
-        except ValueError:
-            # If the list didn't have the element we didn't cancel anything
+        if self.pending.remove(order) is None:
+            # If the order was not pending we didn't cancel anything
             return False
 
         order.cancel()
@@ -500,7 +500,7 @@ class BackBroker(bt.BrokerBase):
         if safe:
             os = [x.clone() for x in self.pending]
         else:
-            os = [x for x in self.pending]
+            os = list(self.pending)
 
         return os
 
@@ -510,12 +510,7 @@ class BackBroker(bt.BrokerBase):
         return self.positions[data]
 
     def orderstatus(self, order):
-        try:
-            o = self.orders.index(order)
-        except ValueError:
-            o = order
-
-        return o.status
+        return self._orefs.get(order.ref, order).status
 
     def _take_children(self, order):
         oref = order.ref
@@ -545,6 +540,7 @@ class BackBroker(bt.BrokerBase):
         return order
 
     def transmit(self, order, check=True):
+        self._orefs[order.ref] = order
         if check and self.p.checksubmit:
             order.submit()
             self.submitted.append(order)
@@ -586,7 +582,7 @@ class BackBroker(bt.BrokerBase):
         order.pannotated = None
         order.submit()
         order.accept()
-        self.pending.append(order)
+        self.pending.add(order)
         self.notify(order)
 
     def _bracketize(self, order, cancel=False):
@@ -612,12 +608,9 @@ class BackBroker(bt.BrokerBase):
         ocoref = self._ocos.get(parentref, None)
         ocol = self._ocol.pop(ocoref, None)
         if ocol:
-            for i in range(len(self.pending) - 1, -1, -1):
-                o = self.pending[i]
-                if o is not None and o.ref in ocol:
-                    del self.pending[i]
-                    o.cancel()
-                    self.notify(o)
+            for o in reversed(self.pending.take(ocol)):
+                o.cancel()
+                self.notify(o)
 
     def _ocoize(self, order, oco):
         oref = order.ref
@@ -1037,9 +1030,8 @@ class BackBroker(bt.BrokerBase):
 
         return None  # no price can be returned
 
-    def _try_exec(self, order):
-        data = order.data
-
+    def _prices(self, data):
+        # Returns open, high, low, close of the current bar/tick
         popen = getattr(data, 'tick_open', None)
         if popen is None:
             popen = data.open[0]
@@ -1053,6 +1045,20 @@ class BackBroker(bt.BrokerBase):
         if pclose is None:
             pclose = data.close[0]
 
+        return popen, phigh, plow, pclose
+
+    def _pricerange(self, data):
+        # Returns datetime, low and high of the prices at which orders can
+        # execute in the current bar (see OrderBook.candidates)
+        popen, phigh, plow, pclose = self._prices(data)
+        if popen != popen or phigh != phigh or plow != plow:
+            return data.datetime[0], None, None  # NaN - range unknown
+
+        return data.datetime[0], min(popen, plow), max(popen, phigh)
+
+    def _try_exec(self, order):
+        popen, phigh, plow, pclose = self._prices(order.data)
+
         pcreated = order.created.price
         plimit = order.created.pricelimit
 
@@ -1195,12 +1201,13 @@ class BackBroker(bt.BrokerBase):
 
         self._process_order_history()
 
-        # Iterate once over all elements of the pending queue
-        self.pending.append(None)
-        while True:
-            order = self.pending.popleft()
-            if order is None:
-                break
+        # Iterate once over the pending orders which may execute or expire in
+        # this bar. The others would not change
+        pending = self.pending
+        for order in pending.candidates(self._pricerange):
+            seq = pending.remove(order)
+            if seq is None:
+                continue  # removed by the execution of a previous order
 
             if order.expire():
                 self.notify(order)
@@ -1208,12 +1215,12 @@ class BackBroker(bt.BrokerBase):
                 self._bracketize(order, cancel=True)
 
             elif not order.active():
-                self.pending.append(order)  # cannot yet be processed
+                pending.add(order, seq)  # cannot yet be processed
 
             else:
                 self._try_exec(order)
                 if order.alive():
-                    self.pending.append(order)
+                    pending.add(order, seq)
 
                 elif order.status == Order.Completed:
                     # a bracket parent order may have been executed
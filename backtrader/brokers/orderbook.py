@@ -0,0 +1,198 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+from bisect import bisect_left, bisect_right, insort
+import heapq
+import itertools
+from operator import itemgetter
+
+from backtrader.order import Order
+from backtrader.utils.py3 import integer_types
+
+
+__all__ = ['OrderBook']
+
+
+class OrderBook(object):
+    '''Pending orders of a broker, kept in arrival order and indexed by
+    ``ref``
+
+    Per data, the orders which only execute when the price reaches a level
+    (``Limit``, ``Stop`` and ``StopLimit``) are kept in 2 ladders sorted by
+    that price:
+
+      - ``down``: executed when the price goes down to the level (buy limit,
+        sell stop, triggered buy stop limit)
+      - ``up``: executed when the price goes up to the level (sell limit,
+        buy stop, triggered sell stop limit)
+
+    and those with an expiration date in a heap. ``candidates`` returns only
+    the orders of the ladders reached by the range of the current bar and
+    those which expire, together with the orders which have to be looked at
+    in each bar (``Market``, ``Close``, trailing stops, inactive orders, ...)
+    '''
+    INF = float('inf')
+
+    def __init__(self):
+        self._orders = dict()  # ref -> [seq, order, level, ladder]
+        self._always = dict()  # ref -> seq of orders seen in each bar
+        self._books = dict()  # data -> [down, up, expiry]
+        self._expiring = set()  # refs with an entry in an expiry heap
+        self._seq = itertools.count()
+
+    def __len__(self):
+        return len(self._orders)
+
+    def __bool__(self):
+        return bool(self._orders)
+
+    __nonzero__ = __bool__
+
+    def __iter__(self):
+        '''Iterates over the orders in arrival order'''
+        entries = sorted(self._orders.values(), key=itemgetter(0))
+        return (entry[1] for entry in entries)
+
+    def __contains__(self, order):
+        return order.ref in self._orders
+
+    def get(self, ref, default=None):
+        '''Returns the pending order with the given ``ref``'''
+        entry = self._orders.get(ref)
+        return default if entry is None else entry[1]
+
+    def add(self, order, seq=None):
+        '''Adds an order at the end of the arrival order or with the position
+        ``seq`` returned by a previous ``remove``'''
+        if seq is None:
+            seq = next(self._seq)
+
+        ref = order.ref
+        level, up = self._level(order)
+        self._orders[ref] = [seq, order, level, up]
+        if level is None:
+            self._always[ref] = seq
+            return
+
+        book = self._books.get(order.data)
+        if book is None:
+            self._books[order.data] = book = [list(), list(), list()]
+
+        insort(book[up], (level, seq, ref))
+
+        # A single expiry entry per order, also if taken and added again
+        valid = order.valid
+        if valid and isinstance(valid, (float, integer_types)) and \
+           ref not in self._expiring:
+            self._expiring.add(ref)
+            heapq.heappush(book[2], (valid, seq, ref))
+
+    def remove(self, order):
+        '''Removes the order (looked up by ``ref``) and returns its position
+        in the arrival order, or ``None`` if the order is not pending'''
+        ref = order.ref
+        entry = self._orders.pop(ref, None)
+        if entry is None:
+            return None
+
+        seq, order, level, up = entry
+        if level is None:
+            del self._always[ref]
+        else:
+            ladder = self._books[order.data][up]
+            del ladder[bisect_left(ladder, (level, seq, ref))]
+            # expiry entries are discarded when found with no pending order
+
+        return seq
+
+    def take(self, refs):
+        '''Removes the pending orders with the given refs and returns them in
+        arrival order'''
+        entries = [self._orders[ref] for ref in refs if ref in self._orders]
+        entries.sort(key=itemgetter(0))
+        orders = [entry[1] for entry in entries]
+        for order in orders:
+            self.remove(order)
+
+        return orders
+
+    def _level(self, order):
+        # Returns the price level and the ladder (0 down, 1 up) of the order
+        # or (None, None) if it has to be looked at in each bar
+        if not order.active():
+            return None, None
+
+        exectype = order.exectype
+        if exectype == Order.Limit:
+            level, up = order.created.price, not order.isbuy()
+        elif exectype == Order.Stop:
+            level, up = order.created.price, order.isbuy()
+        elif exectype == Order.StopLimit:
+            if order.triggered:  # the limit part is the one pending
+                level, up = order.created.pricelimit, not order.isbuy()
+            else:
+                level, up = order.created.price, order.isbuy()
+        else:
+            return None, None
+
+        if level is None or level != level:  # no price or NaN
+            return None, None
+
+        return level, int(up)
+
+    def candidates(self, getrange):
+        '''Returns, in arrival order, the orders which may be executed or
+        expire in the current bar
+
+        ``getrange(data)`` must return the current ``(datetime, low, high)``
+        of a data. ``low`` and ``high`` can be ``None`` if the range is not
+        known, in which case all orders of the data are returned
+        '''
+        seqs = dict(self._always)
+        orders = self._orders
+        INF = self.INF
+
+        for data, (down, up, expiry) in self._books.items():
+            if not down and not up and not expiry:
+                continue
+
+            dt, low, high = getrange(data)
+            if low is None:
+                reached = itertools.chain(down, up)
+            else:
+                reached = itertools.chain(
+                    down[bisect_left(down, (low,)):],
+                    up[:bisect_right(up, (high, INF))])
+
+            for _, seq, ref in reached:
+                seqs[ref] = seq
+
+            while expiry and expiry[0][0] < dt:
+                _, _, ref = heapq.heappop(expiry)
+                self._expiring.discard(ref)
+                entry = orders.get(ref)
+                if entry is not None:
+                    seqs[ref] = entry[0]
+
+        return [orders[ref][1]
+                for ref, _ in sorted(seqs.items(), key=itemgetter(1))]
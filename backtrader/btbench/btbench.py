@@ -0,0 +1,563 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import argparse
+import collections
+import datetime
+import fnmatch
+import json
+import multiprocessing
+import os.path
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+import backtrader as bt
+
+
+###############################################################################
+# Data
+###############################################################################
+DATAS = dict(
+    yahoo='yhoo-1996-2015.txt',  # daily bars, yahoo format
+    minutes='2006-01-02-volume-min-001.txt',  # 1 minute bars, btcsv format
+)
+
+
+def gendata(path, bars, seed=0):
+    '''Writes ``bars`` synthetic 1 minute bars (a random walk, 390 bars per
+    session from 09:31 to 16:00 on weekdays) in the backtrader csv format to
+    ``path``'''
+    rnd = random.Random(seed)
+    day = datetime.date(2000, 1, 3)
+    price = 100.0
+    with open(path, 'w') as f:
+        f.write('Date,Time,Open,High,Low,Close,Volume,OpenInterest\n')
+        while bars > 0:
+            dttxt = day.isoformat()
+            for i in range(min(bars, 390)):
+                tm = 9 * 60 + 31 + i
+                o = price
+                c = o * (1.0 + rnd.gauss(0.0, 0.001))
+                h = max(o, c) * (1.0 + abs(rnd.gauss(0.0, 0.0005)))
+                l = min(o, c) * (1.0 - abs(rnd.gauss(0.0, 0.0005)))
+                v = rnd.randint(100, 10000)
+                f.write('%s,%02d:%02d:00,%.4f,%.4f,%.4f,%.4f,%d,0\n' %
+                        (dttxt, tm // 60, tm % 60, o, h, l, c, v))
+                price = c
+
+            bars -= 390
+            day += datetime.timedelta(days=3 if day.weekday() == 4 else 1)
+
+
+def getdata(opts, **kwargs):
+    return bt.feeds.BacktraderCSVData(
+        dataname=opts['synthetic'],
+        timeframe=bt.TimeFrame.Minutes, compression=1, **kwargs)
+
+
+def getdatasfile(opts, name):
+    datadir = opts['datadir']
+    if datadir is None:
+        return None
+
+    path = os.path.join(datadir, DATAS[name])
+    return path if os.path.isfile(path) else None
+
+
+###############################################################################
+# Strategies
+###############################################################################
+class IndStrategy(bt.Strategy):
+    '''Adds ``indicators`` indicators of different kinds and periods'''
+    params = (
+        ('indicators', 10),
+        ('period', 10),
+    )
+
+    INDICATORS = (bt.ind.SMA, bt.ind.EMA, bt.ind.RSI, bt.ind.BollingerBands,
+                  bt.ind.ATR, bt.ind.CCI, bt.ind.WMA, bt.ind.Momentum)
+
+    def __init__(self):
+        for i in range(self.p.indicators):
+            ind = self.INDICATORS[i % len(self.INDICATORS)]
+            ind(period=self.p.period + i)
+
+
+class OrderStrategy(bt.Strategy):
+    '''Issues ``orders`` limit orders around the price in each bar, which are
+    valid for ``valid`` bars, and a market order every ``every`` bars'''
+    params = (
+        ('orders', 10),
+        ('valid', 5),
+        ('every', 10),
+    )
+
+    def start(self):
+        self.norders = 0
+
+    def next(self):
+        close = self.data.close[0]
+        valid = (self.data.datetime.datetime() +
+                 datetime.timedelta(minutes=self.p.valid))
+        for i in range(1, self.p.orders // 2 + 1):
+            self.buy(exectype=bt.Order.Limit, price=close * (1 - 0.001 * i),
+                     valid=valid)
+            self.sell(exectype=bt.Order.Limit, price=close * (1 + 0.001 * i),
+                      valid=valid)
+
+        self.norders += self.p.orders // 2 * 2
+        if not len(self) % self.p.every:
+            self.order_target_size(target=0)
+            self.norders += 1
+
+
+class CrossStrategy(bt.SignalStrategy):
+    '''Long/short on the crossover of 2 moving averages'''
+    params = (
+        ('fast', 10),
+        ('slow', 30),
+    )
+
+    def __init__(self):
+        sma1 = bt.ind.SMA(period=self.p.fast)
+        sma2 = bt.ind.SMA(period=self.p.slow)
+        self.signal_add(bt.SIGNAL_LONGSHORT, bt.ind.CrossOver(sma1, sma2))
+
+
+###############################################################################
+# Benchmarks
+###############################################################################
+# The synthetic data has opts['bars'] bars, which is returned as the number of
+# bars processed, because the buffers of the data may not keep them all
+# (exactbars) or may hold the bars of a resampling
+
+def bench_preload(opts):
+    cerebro = bt.Cerebro(stdstats=False)
+    cerebro.adddata(getdata(opts))
+    cerebro.addstrategy(bt.Strategy)
+    cerebro.run()
+    return opts['bars']
+
+
+def bench_preload_datas(opts, datas):
+    path = getdatasfile(opts, datas)
+    if path is None:
+        return None  # skipped
+
+    if datas == 'yahoo':
+        data = bt.feeds.YahooFinanceCSVData(dataname=path)
+    else:
+        data = bt.feeds.BacktraderCSVData(
+            dataname=path, timeframe=bt.TimeFrame.Minutes)
+
+    cerebro = bt.Cerebro(stdstats=False)
+    cerebro.adddata(data)
+    cerebro.addstrategy(bt.Strategy)
+    cerebro.run()
+    return data.buflen()
+
+
+def bench_resample(opts, timeframe, compression, replay=False):
+    cerebro = bt.Cerebro(stdstats=False)
+    kwargs = dict(timeframe=getattr(bt.TimeFrame, timeframe),
+                  compression=compression)
+    data = getdata(opts)
+    if replay:
+        cerebro.replaydata(data, **kwargs)
+    else:
+        cerebro.resampledata(data, **kwargs)
+
+    cerebro.addstrategy(bt.Strategy)
+    cerebro.run()
+    return opts['bars']
+
+
+def bench_indicators(opts, runonce=True, exactbars=False):
+    cerebro = bt.Cerebro(stdstats=False, runonce=runonce, exactbars=exactbars)
+    cerebro.adddata(getdata(opts))
+    cerebro.addstrategy(IndStrategy, indicators=opts['indicators'])
+    cerebro.run()
+    return opts['bars']
+
+
+def bench_optimize(opts, optdatas, optreturn):
+    cerebro = bt.Cerebro(stdstats=False, maxcpus=opts['maxcpus'],
+                         optdatas=optdatas, optreturn=optreturn)
+    cerebro.adddata(getdata(opts))
+    cerebro.optstrategy(CrossStrategy, fast=range(5, 5 + opts['optruns']))
+    cerebro.addanalyzer(bt.analyzers.TradeAnalyzer)
+    return opts['bars'] * len(cerebro.run())
+
+
+def bench_orders(opts):
+    cerebro = bt.Cerebro(stdstats=False)
+    cerebro.adddata(getdata(opts))
+    cerebro.addstrategy(OrderStrategy)
+    strat = cerebro.run()[0]
+    return opts['bars'], dict(orders=strat.norders)
+
+
+ANALYZERS = (bt.analyzers.TimeReturn, bt.analyzers.Returns,
+             bt.analyzers.DrawDown, bt.analyzers.TradeAnalyzer,
+             bt.analyzers.SharpeRatio, bt.analyzers.SQN,
+             bt.analyzers.PeriodStats, bt.analyzers.VWR)
+
+
+def bench_analyzers(opts, analyzers):
+    cerebro = bt.Cerebro(stdstats=False)
+    cerebro.adddata(getdata(opts))
+    cerebro.addstrategy(CrossStrategy)
+    if analyzers:
+        for analyzer in ANALYZERS:
+            cerebro.addanalyzer(analyzer)
+
+    cerebro.run()
+    return opts['bars']
+
+
+# Benchmarks: name -> (function, kwargs). Each function receives the options
+# of the run and the kwargs and returns the number of bars processed (and
+# optionally a dict of other processed units, like orders) or None if it
+# cannot be run
+BENCHMARKS = collections.OrderedDict([
+    ('preload-csv', (bench_preload, dict())),
+    ('preload-datas-yahoo', (bench_preload_datas, dict(datas='yahoo'))),
+    ('preload-datas-minutes', (bench_preload_datas, dict(datas='minutes'))),
+    ('resample-minutes', (bench_resample, dict(timeframe='Minutes',
+                                               compression=60))),
+    ('resample-days', (bench_resample, dict(timeframe='Days',
+                                            compression=1))),
+    ('replay-days', (bench_resample, dict(timeframe='Days', compression=1,
+                                          replay=True))),
+    ('runonce-indicators', (bench_indicators, dict(runonce=True))),
+    ('runnext-indicators', (bench_indicators, dict(runonce=False))),
+    ('exactbars=1', (bench_indicators, dict(exactbars=1))),
+    ('exactbars=-1', (bench_indicators, dict(exactbars=-1))),
+    ('exactbars=-2', (bench_indicators, dict(exactbars=-2))),
+    ('optimize', (bench_optimize, dict(optdatas=True, optreturn=True))),
+    ('optimize-noopt', (bench_optimize, dict(optdatas=False,
+                                             optreturn=False))),
+    ('broker-orders', (bench_orders, dict())),
+    ('analyzers-none', (bench_analyzers, dict(analyzers=False))),
+    ('analyzers-all', (bench_analyzers, dict(analyzers=True))),
+])
+
+
+###############################################################################
+# Measurement
+###############################################################################
+def peakrss():
+    '''Returns the peak resident memory of the process in bytes or ``None``
+    if not available in the platform'''
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if sys.platform == 'darwin' else maxrss * 1024
+
+
+def runbench(name, opts):
+    '''Runs the benchmark ``name`` ``opts['repeat']`` times and returns the
+    measurements as a dict'''
+    func, kwargs = BENCHMARKS[name]
+    res = dict(rss_start=peakrss())
+
+    times = list()
+    for i in range(opts['repeat']):
+        t0 = time.time()
+        done = func(opts, **kwargs)
+        times.append(time.time() - t0)
+        if done is None:
+            return dict(skipped=True)
+
+    res['peak_rss'] = peakrss()
+
+    units = dict()
+    if isinstance(done, tuple):
+        done, units = done
+
+    best = min(times)
+    res.update(
+        seconds=best,
+        mean=sum(times) / len(times),
+        runs=times,
+        bars=done,
+        bars_per_sec=done / best if best else None,
+    )
+    for unit, count in units.items():
+        res[unit] = count
+        res[unit + '_per_sec'] = count / best if best else None
+
+    if opts['allocs']:
+        import tracemalloc
+        getblocks = getattr(sys, 'getallocatedblocks', lambda: 0)
+        blocks = getblocks()
+        tracemalloc.start()
+        func(opts, **kwargs)
+        res['alloc_peak'] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        res['alloc_blocks'] = getblocks() - blocks
+
+    return res
+
+
+def _runchild(name, opts, conn):
+    conn.send(runbench(name, opts))
+    conn.close()
+
+
+def runisolated(name, opts):
+    '''Runs the benchmark in a new process, to measure the peak memory of the
+    benchmark alone'''
+    ctx = multiprocessing.get_context('spawn')
+    rconn, wconn = ctx.Pipe(duplex=False)
+    proc = ctx.Process(target=_runchild, args=(name, opts, wconn))
+    proc.start()
+    wconn.close()  # the child holds the only writing end
+    try:
+        res = rconn.recv()
+    except EOFError:
+        res = None
+
+    proc.join()
+    if res is None:
+        res = dict(error='benchmark process exited with %s' % proc.exitcode)
+
+    return res
+
+
+###############################################################################
+# Baseline comparison
+###############################################################################
+def compare(baseline, current, threshold=0.10):
+    '''Compares the results of 2 runs (as returned by ``btbench``) and returns
+    a dict with, for each benchmark present in both, the relative change of
+    ``bars_per_sec`` and ``peak_rss`` and a ``status``: ``regression`` if the
+    throughput drops more than ``threshold``, ``improvement`` if it rises
+    more than ``threshold`` or else ``same``'''
+    comparison = collections.OrderedDict()
+    bresults = baseline['results']
+    for name, res in current['results'].items():
+        bres = bresults.get(name)
+        if not bres or not bres.get('bars_per_sec') or \
+           not res.get('bars_per_sec'):
+            continue
+
+        speed = res['bars_per_sec'] / bres['bars_per_sec'] - 1.0
+        if speed < -threshold:
+            status = 'regression'
+        elif speed > threshold:
+            status = 'improvement'
+        else:
+            status = 'same'
+
+        rss = None
+        if bres.get('peak_rss') and res.get('peak_rss'):
+            rss = res['peak_rss'] / bres['peak_rss'] - 1.0
+
+        comparison[name] = dict(speed=speed, rss=rss, status=status)
+
+    return comparison
+
+
+def printresults(results, comparison=None, out=sys.stderr):
+    print('%-24s %10s %14s %10s %10s' %
+          ('benchmark', 'seconds', 'bars/sec', 'rss MB', 'change'), file=out)
+    for name, res in results.items():
+        if res.get('skipped') or res.get('error'):
+            print('%-24s %s' % (name, res.get('error') or 'skipped'),
+                  file=out)
+            continue
+
+        rss = res.get('peak_rss')
+        change = ''
+        if comparison and name in comparison:
+            cmp = comparison[name]
+            change = '%+.1f%% %s' % (100.0 * cmp['speed'], cmp['status'])
+
+        print('%-24s %10.3f %14.1f %10s %s' %
+              (name, res['seconds'], res['bars_per_sec'],
+               '%.1f' % (rss / 2.0 ** 20) if rss else '-', change),
+              file=out)
+
+
+###############################################################################
+# Entry point
+###############################################################################
+def getbenchmarks(only=None):
+    names = list(BENCHMARKS)
+    if not only:
+        return names
+
+    return [name for name in names
+            if any(fnmatch.fnmatch(name, pattern) for pattern in only)]
+
+
+def btbench(pargs=None):
+    args = parse_args(pargs)
+
+    names = getbenchmarks(args.only)
+    if args.list:
+        for name in names:
+            print(name)
+        return 0
+
+    datadir = args.datadir
+    if datadir is None:
+        # datas directory of a source checkout
+        datadir = os.path.join(os.path.dirname(bt.__file__), '..', 'datas')
+        datadir = datadir if os.path.isdir(datadir) else None
+
+    workdir = tempfile.mkdtemp(prefix='btbench')
+    try:
+        opts = dict(
+            bars=args.bars,
+            indicators=args.indicators,
+            optruns=args.optruns,
+            maxcpus=args.maxcpus,
+            repeat=args.repeat,
+            allocs=args.allocs,
+            datadir=datadir,
+            synthetic=os.path.join(workdir, 'synthetic.txt'),
+        )
+        gendata(opts['synthetic'], args.bars, seed=args.seed)
+
+        results = collections.OrderedDict()
+        for name in names:
+            if not args.quiet:
+                print('running %s' % name, file=sys.stderr)
+
+            if args.inprocess:
+                results[name] = runbench(name, opts)
+            else:
+                results[name] = runisolated(name, opts)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    params = dict((k, v) for k, v in opts.items()
+                  if k not in ('datadir', 'synthetic'))
+    params['seed'] = args.seed
+    current = collections.OrderedDict(
+        version=bt.__version__,
+        python=platform.python_version(),
+        platform=platform.platform(),
+        date=datetime.datetime.now().isoformat(),
+        params=params,
+        results=results,
+    )
+
+    comparison = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+        if baseline.get('params') != params:
+            print('warning: the baseline was run with other params',
+                  file=sys.stderr)
+
+        comparison = compare(baseline, current, threshold=args.threshold)
+        current['comparison'] = comparison
+
+    if not args.quiet:
+        printresults(results, comparison)
+
+    output = json.dumps(current, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+    if comparison and any(c['status'] == 'regression'
+                          for c in comparison.values()):
+        return 1
+
+    return 0
+
+
+def parse_args(pargs=None):
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+        description=('Backtrader Benchmark Script. The results are written '
+                     'as JSON and can be compared to a previous run'))
+
+    parser.add_argument('--only', '-k', action='append', metavar='pattern',
+                        help=('Run only the benchmarks matching the pattern '
+                              '(fnmatch style). Can be given several times'))
+
+    parser.add_argument('--list', action='store_true',
+                        help='List the benchmarks and exit')
+
+    parser.add_argument('--bars', type=int, default=20000,
+                        help='Bars of the synthetic data')
+
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Seed of the synthetic data')
+
+    parser.add_argument('--indicators', type=int, default=10,
+                        help='Indicators in the indicator benchmarks')
+
+    parser.add_argument('--optruns', type=int, default=4,
+                        help='Strategy runs in the optimization benchmarks')
+
+    parser.add_argument('--maxcpus', type=int, default=2,
+                        help='Processes in the optimization benchmarks')
+
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Runs of each benchmark (the best is taken)')
+
+    parser.add_argument('--allocs', action='store_true',
+                        help=('Run each benchmark once more with tracemalloc '
+                              'to record the peak of allocated memory'))
+
+    parser.add_argument('--datadir', default=None,
+                        help=('Directory with the sample datas. Default: '
+                              'the datas directory of a source checkout'))
+
+    parser.add_argument('--inprocess', action='store_true',
+                        help=('Run the benchmarks in this process and not in '
+                              'a new one for each (the peak memory is then '
+                              'cumulative)'))
+
+    parser.add_argument('--output', '-o', default=None,
+                        help='File for the JSON results (default: stdout)')
+
+    parser.add_argument('--baseline', '-b', default=None,
+                        help=('JSON results of a previous run to compare '
+                              'with. The exit code is 1 if any benchmark '
+                              'regresses'))
+
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help=('Relative drop of bars/sec considered a '
+                              'regression'))
+
+    parser.add_argument('--quiet', '-q', action='store_true',
+                        help='Do not print progress and the results table')
+
+    return parser.parse_args(pargs)
@@ -23,8 +23,10 @@ from __future__ import (absolute_import, division, print_function,
 
 import datetime
 import collections
+import heapq
 import itertools
 import multiprocessing
+import time
 
 try:  # For new Python versions
     collectionsAbc = collections.abc  # collections.Iterable -> collections.abc.Iterable
@@ -41,8 +43,11 @@ from .brokers import BackBroker
 from .metabase import MetaParams
 from . import observers
 from .writer import WriterFile
+from .optsink import optkey
 from .utils import OrderedDict, tzparse, num2date, date2num
 from .strategy import Strategy, SignalStrategy
+from .vecsignal import VecSignal
+from .profiler import Profiler
 from .tradingcal import (TradingCalendarBase, TradingCalendar,
                          PandasMarketCalendar)
 from .timer import Timer
@@ -57,6 +62,65 @@ class OptReturn(object):
             setattr(self, k, v)
 
 
+# Cerebro instance of an optimization worker process. It is transferred once
+# per process (with the pool initializer) and not once per task
+
+_optcerebro = None
+
+
+def _optinit(cerebro):
+    global _optcerebro
+    _optcerebro = cerebro
+
+
+def _optrunchunk(iterstrats):
+    start = time.time()
+    runstrats = [_optcerebro(iterstrat) for iterstrat in iterstrats]
+    return time.time() - start, runstrats
+
+
+class OptProgress(object):
+    '''Progress of an optimization, handed over to the callbacks added with
+    ``Cerebro.optprogress`` each time a combination has been run
+
+    Attributes:
+
+      - ``total``: number of combinations to run
+      - ``skipped``: number of combinations skipped because the sinks already
+        had them (resumed optimization)
+      - ``done``: number of combinations already run
+      - ``chunksize``: size of the last chunk of combinations sent to a
+        process
+      - ``elapsed``: seconds since the start of the optimization
+      - ``rate``: combinations run per second
+      - ``eta``: estimated seconds until the end of the optimization (or
+        ``None`` if nothing has been run yet)
+    '''
+    def __init__(self, total, skipped=0):
+        self.total = total
+        self.skipped = skipped
+        self.done = 0
+        self.chunksize = 1
+        self._start = time.time()
+
+    @property
+    def elapsed(self):
+        return time.time() - self._start
+
+    @property
+    def rate(self):
+        elapsed = self.elapsed
+        return self.done / elapsed if elapsed else 0.0
+
+    @property
+    def eta(self):
+        rate = self.rate
+        if not rate:
+            return None
+
+        return (self.total - self.done) / rate
+
+
 class Cerebro(with_metaclass(MetaParams, object)):
     '''Params:
 
@@ -160,6 +224,23 @@ class Cerebro(with_metaclass(MetaParams, object)):
 
             - ``runonce`` will be deactivated
 
+      - ``chunkbars`` (default: ``0``)
+
+        With ``exactbars`` set to ``True`` or ``1``, keep ``runonce`` by
+        running in chunks of (at least) ``chunkbars`` bars: the bars of a
+        chunk are loaded, the indicators are calculated for them in vector
+        mode and they are then delivered to the strategies. Only the last
+        values needed to calculate the next chunk (the largest minimum period
+        of the datas and indicators) are kept in memory
+
+        As with ``exactbars`` only the values within the minimum period can
+        be looked at by the strategies
+
+        Only a single data feed is supported. With ``0``, several datas,
+        replay, live feeds, indicators which disable ``runonce`` or lines
+        which look into the future, the standard ``exactbars`` behavior
+        applies
+
       - ``objcache`` (default: ``False``)
 
         Experimental option to implement a cache of lines objects and reduce
@@ -175,6 +256,66 @@ class Cerebro(with_metaclass(MetaParams, object)):
         Corner cases may happen in which this drives a line object off its
         minimum period and breaks things and it is therefore disabled.
 
+      - ``indcache`` (default: ``False``)
+
+        Keep the values calculated by indicators in ``runonce`` mode across
+        the executions of an optimization (in each process). An indicator
+        with the same class and params applied to the same inputs (datas or
+        other cached indicators) as in a previous execution takes the values
+        from the cache instead of calculating them again.
+
+        Only indicators whose values depend exclusively on the params and
+        inputs can be cached and it is therefore disabled.
+
+      - ``oncegraph`` (default: ``False``)
+
+        In ``runonce`` mode, compile the tree of indicators (and line
+        operations) declared by each strategy into a flat schedule when the
+        strategy starts. The schedule holds the same calls, in the same
+        order, which the recursive calculation of the tree makes: each
+        indicator is still calculated on its own (there is no batching) and
+        keeps its buffers. What is saved is the recursion itself and, for
+        each bar in ``next``, the chain of calls needed to move the
+        indicators forward. Indicators with their own ``_once`` are kept as a
+        single step. The resulting values are the same
+
+        With ``numpy`` and all data preloaded (no ``chunkbars``), chains of
+        line operations (ex: ``(d.high - d.low) / (d.close + 1.0)``) are
+        fused into a single numpy expression: an operation whose only user is
+        another operation (not kept in an attribute, not bound to a line, not
+        the input of an indicator) has no buffer and is calculated in the
+        ``once`` of the last operation of the chain. If the expression
+        cannot be calculated with ``numpy`` (ex: a division by zero) the
+        operations are calculated one by one as usual
+
+      - ``vecsignals`` (default: ``False``)
+
+        In ``runonce`` mode, run a single ``SignalStrategy`` with the
+        vectorized engine ``VecSignal``: the market orders of the signals are
+        filled and the cash, positions and portfolio value are calculated in
+        one pass over the preloaded bars, delivering the results of the
+        analyzers ``TimeReturn``, ``DrawDown`` and ``TradeAnalyzer`` without
+        the event loop. The results are the same as with the event loop
+
+        The run falls back to the event loop if anything which would have to
+        be called bar by bar (``next`` in the strategy, observers, other
+        analyzers, timers, writers, broker features ...) is present. See
+        ``VecSignal`` for the details
+
+      - ``profile`` (default: ``False``)
+
+        Record the wall time and the number of calls of each stage of the
+        event loop: ``preload``, ``next``, ``advance`` and ``load`` of the
+        datas and their filters, ``_next``/``_once`` of each indicator,
+        ``next`` of the broker, the strategies' ``next``, ``_next_observers``
+        and ``_next_analyzers``, the writers and the timers
+
+        The report (see ``Profiler``) is set as attribute ``profile`` of the
+        returned strategies and is part of the strategy information delivered
+        to the writers. Indicators are calculated recursively even if
+        ``oncegraph`` is ``True``, to time each of them. Nothing is timed and
+        there is no cost if ``False``
+
       - ``writer`` (default: ``False``)
 
         If set to ``True`` a default WriterFile will be created which will
@@ -196,6 +337,13 @@ class Cerebro(with_metaclass(MetaParams, object)):
         The tests show an approximate ``20%`` speed-up moving from a sample
         execution in ``83`` seconds to ``66``
 
+      - ``optshared`` (default: ``True``)
+
+        If ``True`` and the datas are preloaded in the main process (see
+        ``optdatas``), the values of the datas are moved to shared memory
+        blocks to which the optimization worker processes attach, instead of
+        receiving a copy of the values. Requires Python >= 3.8
+
       - ``optreturn`` (default: ``True``)
 
         If ``True`` the optimization results will not be full ``Strategy``
@@ -214,6 +362,20 @@ class Cerebro(with_metaclass(MetaParams, object)):
         with ``optdatas`` the total gain increases to a total speed-up of
         ``32%`` in an optimization run.
 
+      - ``optchunksize`` (default: ``None``)
+
+        Number of combinations sent at once to an optimization worker
+        process. With ``None`` the size adapts to the measured execution
+        time of the combinations, to amortize the interprocess communication
+        overhead of quick runs
+
+      - ``optkeep`` (default: ``True``)
+
+        If ``False`` the results of the optimization are not kept in memory
+        and ``run`` returns an empty list. They are only delivered to the
+        callbacks (see ``optcallback``) and sinks (see ``addoptsink``) as
+        they are produced
+
       - ``oldsync`` (default: ``False``)
 
         Starting with release 1.9.0.99 the synchronization of multiple datas
@@ -280,9 +442,17 @@ class Cerebro(with_metaclass(MetaParams, object)):
         ('oldtrades', False),
         ('lookahead', 0),
         ('exactbars', False),
+        ('chunkbars', 0),
         ('optdatas', True),
+        ('optshared', True),
         ('optreturn', True),
+        ('optchunksize', None),
+        ('optkeep', True),
         ('objcache', False),
+        ('indcache', False),
+        ('oncegraph', False),
+        ('vecsignals', False),
+        ('profile', False),
         ('live', False),
         ('writer', False),
         ('tradehistory', False),
@@ -293,6 +463,8 @@ class Cerebro(with_metaclass(MetaParams, object)):
         ('quicknotify', False),
     )
 
+    _OPTCHUNKTIME = 0.5  # target seconds of work per adaptive opt chunk
+
     def __init__(self):
         self._dolive = False
         self._doreplay = False
@@ -303,6 +475,8 @@ class Cerebro(with_metaclass(MetaParams, object)):
         self.datasbyname = collections.OrderedDict()
         self.strats = list()
         self.optcbs = list()  # holds a list of callbacks for opt strategies
+        self.optprogcbs = list()  # callbacks for the progress of opt runs
+        self.optsinks = list()  # sinks for opt results
         self.observers = list()
         self.analyzers = list()
         self.indicators = list()
@@ -856,6 +1030,27 @@ class Cerebro(with_metaclass(MetaParams, object)):
         '''
         self.optcbs.append(cb)
 
+    def optprogress(self, cb):
+        '''
+        Adds a *callback* to the list of callbacks that will be called with an
+        ``OptProgress`` instance (throughput, eta, ...) each time a
+        combination of the optimization has been run
+
+        The signature: cb(progress)
+        '''
+        self.optprogcbs.append(cb)
+
+    def addoptsink(self, sinkcls, *args, **kwargs):
+        '''
+        Adds an ``OptSink`` class (see ``OptSinkCSV``) to receive the
+        results of the optimization as they are produced. Instantiation will
+        be done at ``run`` time.
+
+        Combinations already stored by all sinks (from a previous run which
+        may have crashed) are not run again
+        '''
+        self.optsinks.append((sinkcls, args, kwargs))
+
     def optstrategy(self, strategy, *args, **kwargs):
         '''
         Adds a ``Strategy`` class to the mix for optimization. Instantiation
@@ -1059,10 +1254,17 @@ class Cerebro(with_metaclass(MetaParams, object)):
         linebuffer.LineActions.usecache(self.p.objcache)
         indicator.Indicator.usecache(self.p.objcache)
 
+        indicator.Indicator.cleanoncecache()  # values from other runs
+
         self._dorunonce = self.p.runonce
         self._dopreload = self.p.preload
         self._exactbars = int(self.p.exactbars)
 
+        # chunks keep runonce while saving memory
+        self._dochunks = (self.p.chunkbars > 0 and self._exactbars > 0 and
+                          self._dorunonce and self._dopreload and
+                          len(self.datas) == 1)
+
         if self._exactbars:
             self._dorunonce = False  # something is saving memory, no runonce
             self._dopreload = self._dopreload and self._exactbars < 1
@@ -1072,11 +1274,13 @@ class Cerebro(with_metaclass(MetaParams, object)):
             # preloading is not supported with replay. full timeframe bars
             # are constructed in realtime
             self._dopreload = False
+            self._dochunks = False
 
         if self._dolive or self.p.live:
             # in this case both preload and runonce must be off
             self._dorunonce = False
             self._dopreload = False
+            self._dochunks = False
 
         self.runwriters = list()
 
@@ -1125,42 +1329,145 @@ class Cerebro(with_metaclass(MetaParams, object)):
             self.addstrategy(Strategy)
 
         iterstrats = itertools.product(*self.strats)
-        if not self._dooptimize or self.p.maxcpus == 1:
-            # If no optimmization is wished ... or 1 core is to be used
-            # let's skip process "spawning"
+        if not self._dooptimize:
             for iterstrat in iterstrats:
                 runstrat = self.runstrategies(iterstrat)
                 self.runstrats.append(runstrat)
-                if self._dooptimize:
-                    for cb in self.optcbs:
-                        cb(runstrat)  # callback receives finished strategy
         else:
-            if self.p.optdatas and self._dopreload and self._dorunonce:
-                for data in self.datas:
-                    data.reset()
-                    if self._exactbars < 1:  # datas can be full length
-                        data.extend(size=self.params.lookahead)
-                    data._start()
-                    if self._dopreload:
-                        data.preload()
+            self._runopt(iterstrats)
+
+        if not self._dooptimize:
+            # avoid a list of list for regular cases
+            return self.runstrats[0]
+
+        return self.runstrats
+
+    def _runopt(self, iterstrats):
+        '''
+        Internal method invoked by ``run``` to run the optimization, handing
+        the results over to the sinks and callbacks as they are produced
+        '''
+        sinks = [skcls(*skargs, **skkwargs)
+                 for skcls, skargs, skkwargs in self.optsinks]
+
+        for sink in sinks:
+            sink.start()
+
+        # combinations already in all sinks are not run again
+        finished = set(sinks[0].finished()) if sinks else set()
+        for sink in sinks[1:]:
+            finished.intersection_update(sink.finished())
+
+        combos = [(optkey(iterstrat), iterstrat) for iterstrat in iterstrats]
+        pending = [x for x in combos if x[0] not in finished]
+        progress = OptProgress(len(pending), skipped=len(combos) - len(pending))
+
+        if self.p.maxcpus == 1:
+            # If 1 core is to be used let's skip process "spawning"
+            results = ((key, iterstrat, self.runstrategies(iterstrat))
+                       for key, iterstrat in pending)
+        else:
+            results = self._runoptpool(pending, progress)
+
+        try:
+            for key, iterstrat, runstrat in results:
+                if self.p.optkeep:
+                    self.runstrats.append(runstrat)
+
+                for sink in sinks:
+                    sink.add(key, iterstrat, runstrat)
 
-            pool = multiprocessing.Pool(self.p.maxcpus or None)
-            for r in pool.imap(self, iterstrats):
-                self.runstrats.append(r)
                 for cb in self.optcbs:
-                    cb(r)  # callback receives finished strategy
+                    cb(runstrat)  # callback receives finished strategy
+
+                progress.done += 1
+                for cb in self.optprogcbs:
+                    cb(progress)
+        finally:
+            results.close()
+            for sink in sinks:
+                sink.stop()
+
+    def _runoptpool(self, pending, progress):
+        '''
+        Internal generator which runs the ``pending`` combinations in chunks
+        in a pool of processes, yielding the results in order.
+
+        Unless fixed with ``optchunksize``, the size of the chunks adapts to
+        the measured execution time of the combinations, to keep the
+        interprocess communication overhead low while still balancing the
+        load across the processes
+        '''
+        predata = self.p.optdatas and self._dopreload and self._dorunonce
+        if predata:
+            for data in self.datas:
+                data.reset()
+                if self._exactbars < 1:  # datas can be full length
+                    data.extend(size=self.params.lookahead)
+                data._start()
+                if self._dopreload:
+                    data.preload()
+
+                if self.p.optshared:
+                    for line in data.lines:
+                        line.share()
+
+        ncpus = self.p.maxcpus or multiprocessing.cpu_count()
+        pool = multiprocessing.Pool(ncpus,
+                                    initializer=_optinit,
+                                    initargs=(self,))
+        try:
+            todo = iter(pending)
+            remaining = len(pending)
+            inflight = collections.deque()
+            tasktime = None  # running average of time per combination
+            while True:
+                # keep all processes busy with a queue of chunks
+                while remaining and len(inflight) < 2 * ncpus:
+                    chunksize = self.p.optchunksize
+                    if not chunksize:
+                        chunksize = 1
+                        if tasktime:
+                            chunksize = int(self._OPTCHUNKTIME / tasktime)
+
+                        # leave work for all processes at the end
+                        chunksize = max(1, min(chunksize,
+                                               remaining // ncpus))
+
+                    chunk = list(itertools.islice(todo, chunksize))
+                    remaining -= len(chunk)
+                    iterstrats = [iterstrat for key, iterstrat in chunk]
+                    r = pool.apply_async(_optrunchunk, (iterstrats,))
+                    inflight.append((chunk, r))
+                    progress.chunksize = chunksize
+
+                if not inflight:
+                    break
+
+                chunk, r = inflight.popleft()
+                elapsed, runstrats = r.get()
+
+                chunktime = elapsed / len(chunk)
+                if tasktime is None:
+                    tasktime = chunktime
+                else:
+                    tasktime = 0.8 * tasktime + 0.2 * chunktime
+
+                for (key, iterstrat), runstrat in zip(chunk, runstrats):
+                    yield key, iterstrat, runstrat
 
             pool.close()
+        finally:
+            pool.terminate()
+            pool.join()
 
-            if self.p.optdatas and self._dopreload and self._dorunonce:
+            if predata:
                 for data in self.datas:
-                    data.stop()
-
-        if not self._dooptimize:
-            # avoid a list of list for regular cases
-            return self.runstrats[0]
+                    if self.p.optshared:
+                        for line in data.lines:
+                            line.unmap()  # release the shared memory
 
-        return self.runstrats
+                    data.stop()
 
     def _init_stcount(self):
         self.stcount = itertools.count(0)
@@ -1207,103 +1514,153 @@ class Cerebro(with_metaclass(MetaParams, object)):
         # self._plotfillers = [list() for d in self.datas]
         # self._plotfillers2 = [list() for d in self.datas]
 
-        if not predata:
-            for data in self.datas:
-                data.reset()
-                if self._exactbars < 1:  # datas can be full length
-                    data.extend(size=self.params.lookahead)
-                data._start()
-                if self._dopreload:
-                    data.preload()
-
-        for stratcls, sargs, skwargs in iterstrat:
-            sargs = self.datas + list(sargs)
-            try:
-                strat = stratcls(*sargs, **skwargs)
-            except bt.errors.StrategySkipError:
-                continue  # do not add strategy to the mix
+        profiler = None
+        if self.p.profile:
+            profiler = Profiler()
 
-            if self.p.oldsync:
-                strat._oldsync = True  # tell strategy to use old clock update
-            if self.p.tradehistory:
-                strat.set_tradehistory()
-            runstrats.append(strat)
-
-        tz = self.p.tz
-        if isinstance(tz, integer_types):
-            tz = self.datas[tz]._tz
-        else:
-            tz = tzparse(tz)
-
-        if runstrats:
-            # loop separated for clarity
-            defaultsizer = self.sizers.get(None, (None, None, None))
-            for idx, strat in enumerate(runstrats):
-                if self.p.stdstats:
-                    strat._addobserver(False, observers.Broker)
-                    if self.p.oldbuysell:
-                        strat._addobserver(True, observers.BuySell)
-                    else:
-                        strat._addobserver(True, observers.BuySell,
-                                           barplot=True)
+        try:
+            if profiler is not None:
+                for i, data in enumerate(self.datas):
+                    profiler.add_data(data, data._name or str(i))
 
-                    if self.p.oldtrades or len(self.datas) == 1:
-                        strat._addobserver(False, observers.Trades)
-                    else:
-                        strat._addobserver(False, observers.DataTrades)
-
-                for multi, obscls, obsargs, obskwargs in self.observers:
-                    strat._addobserver(multi, obscls, *obsargs, **obskwargs)
-
-                for indcls, indargs, indkwargs in self.indicators:
-                    strat._addindicator(indcls, *indargs, **indkwargs)
+            if not predata:
+                for data in self.datas:
+                    data.reset()
+                    if self._exactbars < 1:  # datas can be full length
+                        data.extend(size=self.params.lookahead)
+                    data._start()
+                    if self._dopreload:
+                        data.preload()
 
-                for ancls, anargs, ankwargs in self.analyzers:
-                    strat._addanalyzer(ancls, *anargs, **ankwargs)
+            # set here and not in run to also reach optimization workers
+            indcache = self.p.indcache and not self._dochunks  # values trimmed
+            indicator.Indicator.useoncecache(indcache)
+            if indcache:
+                indicator.Indicator.startoncecache(self.datas)
 
-                sizer, sargs, skwargs = self.sizers.get(idx, defaultsizer)
-                if sizer is not None:
-                    strat._addsizer(sizer, *sargs, **skwargs)
+            for stratcls, sargs, skwargs in iterstrat:
+                sargs = self.datas + list(sargs)
+                try:
+                    strat = stratcls(*sargs, **skwargs)
+                except bt.errors.StrategySkipError:
+                    continue  # do not add strategy to the mix
 
-                strat._settz(tz)
-                strat._start()
+                if self.p.oldsync:
+                    # tell strategy to use old clock update
+                    strat._oldsync = True
+                if (self.p.oncegraph and profiler is None and
+                        (self._dopreload and self._dorunonce or
+                         self._dochunks)):
+                    strat._oncegraph = True  # compile indicators in _start
+                    # the buffers of chunks are trimmed: no fused operations
+                    strat._oncegraphfuse = not self._dochunks
+                if self.p.tradehistory:
+                    strat.set_tradehistory()
+                runstrats.append(strat)
+
+            tz = self.p.tz
+            if isinstance(tz, integer_types):
+                tz = self.datas[tz]._tz
+            else:
+                tz = tzparse(tz)
+
+            if runstrats:
+                # loop separated for clarity
+                defaultsizer = self.sizers.get(None, (None, None, None))
+                for idx, strat in enumerate(runstrats):
+                    if self.p.stdstats:
+                        strat._addobserver(False, observers.Broker)
+                        if self.p.oldbuysell:
+                            strat._addobserver(True, observers.BuySell)
+                        else:
+                            strat._addobserver(True, observers.BuySell,
+                                               barplot=True)
+
+                        if self.p.oldtrades or len(self.datas) == 1:
+                            strat._addobserver(False, observers.Trades)
+                        else:
+                            strat._addobserver(False, observers.DataTrades)
+
+                    for multi, obscls, obsargs, obskwargs in self.observers:
+                        strat._addobserver(multi, obscls,
+                                           *obsargs, **obskwargs)
+
+                    for indcls, indargs, indkwargs in self.indicators:
+                        strat._addindicator(indcls, *indargs, **indkwargs)
+
+                    for ancls, anargs, ankwargs in self.analyzers:
+                        strat._addanalyzer(ancls, *anargs, **ankwargs)
+
+                    sizer, sargs, skwargs = self.sizers.get(idx, defaultsizer)
+                    if sizer is not None:
+                        strat._addsizer(sizer, *sargs, **skwargs)
+
+                    strat._settz(tz)
+                    if profiler is not None:
+                        sname = 'strategy'
+                        if len(runstrats) > 1:
+                            sname += str(idx)
+                        profiler.add_strategy(strat, sname)
+
+                    strat._start()
+
+                    for writer in self.runwriters:
+                        if writer.p.csv:
+                            writer.addheaders(strat.getwriterheaders())
+
+                dochunks = (self._dochunks and
+                            all(s._oncechunkable() for s in runstrats))
+
+                if not predata and not dochunks:  # chunks are trimmed
+                    for strat in runstrats:
+                        strat.qbuffer(self._exactbars,
+                                      replaying=self._doreplay)
 
                 for writer in self.runwriters:
-                    if writer.p.csv:
-                        writer.addheaders(strat.getwriterheaders())
-
-            if not predata:
-                for strat in runstrats:
-                    strat.qbuffer(self._exactbars, replaying=self._doreplay)
+                    writer.start()
 
-            for writer in self.runwriters:
-                writer.start()
+                # Prepare timers
+                self._timers = []
+                self._timerscheat = []
+                for timer in self._pretimers:
+                    # preprocess tzdata if needed
+                    timer.start(self.datas[0])
 
-            # Prepare timers
-            self._timers = []
-            self._timerscheat = []
-            for timer in self._pretimers:
-                # preprocess tzdata if needed
-                timer.start(self.datas[0])
-
-                if timer.params.cheat:
-                    self._timerscheat.append(timer)
-                else:
-                    self._timers.append(timer)
-
-            if self._dopreload and self._dorunonce:
-                if self.p.oldsync:
-                    self._runonce_old(runstrats)
-                else:
-                    self._runonce(runstrats)
-            else:
-                if self.p.oldsync:
-                    self._runnext_old(runstrats)
+                    if timer.params.cheat:
+                        self._timerscheat.append(timer)
+                    else:
+                        self._timers.append(timer)
+
+                if profiler is not None:
+                    profiler.timeit(self._broker, 'next', 'broker.next')
+                    profiler.timeit(self, '_next_writers',
+                                    'cerebro._next_writers')
+                    profiler.timeit(self, '_check_timers',
+                                    'cerebro._check_timers')
+
+                if dochunks:
+                    self._runchunks(runstrats)
+                elif self._dopreload and self._dorunonce:
+                    if self.p.oldsync:
+                        self._runonce_old(runstrats)
+                    else:
+                        self._runonce(runstrats)
                 else:
-                    self._runnext(runstrats)
+                    if self.p.oldsync:
+                        self._runnext_old(runstrats)
+                    else:
+                        self._runnext(runstrats)
+        finally:
+            if profiler is not None:
+                # also if the run fails: the next run would time twice
+                profiler.remove()
 
+        if profiler is not None:
             for strat in runstrats:
-                strat._stop()
+                strat.profile = profiler.report()
+
+        for strat in runstrats:
+            strat._stop()
 
         self._broker.stop()
 
@@ -1330,7 +1687,11 @@ class Cerebro(with_metaclass(MetaParams, object)):
                         if attrname.startswith('data'):
                             setattr(a, attrname, None)
 
-                oreturn = OptReturn(strat.params, analyzers=strat.analyzers, strategycls=type(strat))
+                oreturn = OptReturn(strat.params, analyzers=strat.analyzers,
+                                    strategycls=type(strat))
+                if profiler is not None:
+                    oreturn.profile = strat.profile
+
                 results.append(oreturn)
 
             return results
@@ -1494,6 +1855,7 @@ class Cerebro(with_metaclass(MetaParams, object)):
     def _disable_runonce(self):
         '''API for lineiterators to disable runonce (see HeikinAshi)'''
         self._dorunonce = False
+        self._dochunks = False
 
     def _runnext(self, runstrats):
         '''
@@ -1518,14 +1880,22 @@ class Cerebro(with_metaclass(MetaParams, object)):
         ldatas_noclones = ldatas - clonecount
         lastqcheck = False
         dt0 = date2num(datetime.datetime.max) - 2  # default at max
+
+        # Preloaded datas which are not resampled/replayed only have to be
+        # moved to the next bar: use a clock heap to touch only those at dt0
+        clock = None
+        if self._dopreload and not (rs or rp):
+            clock = self._clockheap(datas)
+
         while d0ret or d0ret is None:
-            # if any has live data in the buffer, no data will wait anything
-            newqcheck = not any(d.haslivedata() for d in datas)
-            if not newqcheck:
-                # If no data has reached the live status or all, wait for
-                # the next incoming data
-                livecount = sum(d._laststatus == d.LIVE for d in datas)
-                newqcheck = not livecount or livecount == ldatas_noclones
+            if clock is None:
+                # if any has live data in the buffer, no data will wait
+                newqcheck = not any(d.haslivedata() for d in datas)
+                if not newqcheck:
+                    # If no data has reached the live status or all, wait for
+                    # the next incoming data
+                    livecount = sum(d._laststatus == d.LIVE for d in datas)
+                    newqcheck = not livecount or livecount == ldatas_noclones
 
             lastret = False
             # Notify anything from the store even before moving datas
@@ -1537,20 +1907,30 @@ class Cerebro(with_metaclass(MetaParams, object)):
             if self._event_stop:  # stop if requested
                 return
 
-            # record starting time and tell feeds to discount the elapsed time
-            # from the qcheck value
-            drets = []
-            qstart = datetime.datetime.utcnow()
-            for d in datas:
-                qlapse = datetime.datetime.utcnow() - qstart
-                d.do_qcheck(newqcheck, qlapse.total_seconds())
-                drets.append(d.next(ticks=False))
-
-            d0ret = any((dret for dret in drets))
-            if not d0ret and any((dret is None for dret in drets)):
-                d0ret = None
-
-            if d0ret:
+            if clock is not None:
+                d0ret = bool(clock)
+                if d0ret:
+                    dt0, dmaster = self._clockadvance(clock, self._clocknext)
+                    self._dtmaster = dmaster.num2date(dt0)
+                    self._udtmaster = num2date(dt0)
+            else:
+                # record starting time and tell feeds to discount the elapsed
+                # time from the qcheck value
+                drets = []
+                qstart = datetime.datetime.utcnow()
+                for d in datas:
+                    qlapse = datetime.datetime.utcnow() - qstart
+                    d.do_qcheck(newqcheck, qlapse.total_seconds())
+                    drets.append(d.next(ticks=False))
+
+                d0ret = any((dret for dret in drets))
+                if not d0ret and any((dret is None for dret in drets)):
+                    d0ret = None
+
+            if clock is not None and d0ret:
+                pass  # the clock has already delivered the bars
+
+            elif d0ret:
                 dts = []
                 for i, ret in enumerate(drets):
                     dts.append(datas[i].datetime[0] if ret else None)
@@ -1657,6 +2037,45 @@ class Cerebro(with_metaclass(MetaParams, object)):
             strat._once()
             strat.reset()  # strat called next by next - reset lines
 
+        if self.p.vecsignals and len(runstrats) == 1:
+            engine = VecSignal(runstrats[0])
+            if engine.supported():
+                engine.run()
+                return
+
+        self._runoncepost(runstrats)
+
+    def _runchunks(self, runstrats):
+        '''
+        Implementation of run in vector mode with chunks of ``chunkbars``
+        bars, to save memory (see ``chunkbars``)
+
+        The indicators are calculated for the bars of each chunk, which are
+        then delivered to the strategies as in ``_runonce``. Only the last
+        values needed to calculate the next chunk are kept in the buffers
+        '''
+        carry = max(strat._oncecarry() for strat in runstrats)
+        size = max(self.p.chunkbars, carry)
+        data = self.datas[0]
+
+        more = True
+        while more:
+            more = data.preloadchunk(size)
+            for strat in runstrats:
+                strat._oncechunk()
+
+            self._runoncepost(runstrats)
+            if self._event_stop:  # stop if requested
+                return
+
+            for strat in runstrats:
+                strat._oncetrim(carry)
+
+    def _runoncepost(self, runstrats):
+        '''
+        Delivers the preloaded (and already calculated) bars to the
+        strategies
+        '''
         # The default once for strategies does nothing and therefore
         # has not moved forward all datas/indicators/observers that
         # were homed before calling once, Hence no "need" to do it
@@ -1664,23 +2083,10 @@ class Cerebro(with_metaclass(MetaParams, object)):
         datas = sorted(self.datas,
                        key=lambda x: (x._timeframe, x._compression))
 
-        while True:
-            # Check next incoming date in the datas
-            dts = [d.advance_peek() for d in datas]
-            dt0 = min(dts)
-            if dt0 == float('inf'):
-                break  # no data delivers anything
-
-            # Timemaster if needed be
-            # dmaster = datas[dts.index(dt0)]  # and timemaster
-            slen = len(runstrats[0])
-            for i, dti in enumerate(dts):
-                if dti <= dt0:
-                    datas[i].advance()
-                    # self._plotfillers2[i].append(slen)  # mark as fill
-                else:
-                    # self._plotfillers[i].append(slen)
-                    pass
+        clock = self._clockheap(datas)
+        while clock:  # else no data delivers anything
+            # Move forward only the datas with the next incoming date
+            dt0, _ = self._clockadvance(clock, self._clockonce)
 
             self._check_timers(runstrats, dt0, cheat=True)
 
@@ -1703,6 +2109,49 @@ class Cerebro(with_metaclass(MetaParams, object)):
 
                 self._next_writers(runstrats)
 
+    def _clockheap(self, datas):
+        '''Returns a heap with the next datetime (see ``advance_peek``) of
+        each preloaded data in ``datas`` which can still deliver bars'''
+        clock = [(data.advance_peek(), i, data)
+                 for i, data in enumerate(datas)]
+        clock = [x for x in clock if x[0] != float('inf')]
+        heapq.heapify(clock)
+        return clock
+
+    def _clockadvance(self, clock, advance):
+        '''Calls ``advance`` for the datas in the ``clock`` heap which deliver
+        the next (minimum) datetime and puts them back in the heap with their
+        following datetime, unless they are exhausted.
+
+        Datas which do not deliver are not touched, for the cost to depend
+        only on the number of active datas
+
+        Returns the datetime and the first data delivering it'''
+        dt0, _, dmaster = clock[0]
+        # Take all datas at dt0 out before advancing them: a data whose next
+        # bar has also dt0 must only move once
+        delivering = list()
+        while clock and clock[0][0] == dt0:
+            delivering.append(heapq.heappop(clock))
+
+        for _, i, data in delivering:
+            advance(data)
+            dt = data.advance_peek()
+            if dt != float('inf'):
+                heapq.heappush(clock, (dt, i, data))
+
+        return dt0, dmaster
+
+    @staticmethod
+    def _clockonce(data):
+        data.advance()
+
+    @staticmethod
+    def _clocknext(data):
+        # deliver the preloaded bar as next (with rewind for the others) does
+        data.next(ticks=False)
+        data._tick_fill(force=True)
+
     def _check_timers(self, runstrats, dt0, cheat=False):
         timers = self._timers if not cheat else self._timerscheat
         for t in timers:
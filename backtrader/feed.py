@@ -21,18 +21,25 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
+import array
 import collections
 import datetime
+import hashlib
 import inspect
 import io
+import mmap
+import os
 import os.path
+import stat
+import struct
+import sys
 
 import backtrader as bt
 from backtrader import (date2num, num2date, time2num, TimeFrame, dataseries,
-                        metabase)
+                        mathsupport, metabase)
 
 from backtrader.utils.py3 import with_metaclass, zip, range, string_types
-from backtrader.utils import tzparse
+from backtrader.utils import nplocal2nums, tzparse
 from .dataseries import SimpleFilterWrapper
 from .resamplerfilter import Resampler, Replayer
 from .tradingcal import PandasMarketCalendar
@@ -136,6 +143,8 @@ class AbstractDataBase(with_metaclass(MetaAbstractDataBase,
         ('tzinput', None),
         ('qcheck', 0.0),  # timeout in seconds (float) to check for events
         ('calendar', None),
+        ('cachedir', None),  # directory to cache preloaded bars in
+        ('cachemap', False),  # memory map the cached bars instead of copying
     )
 
     (CONNECTED, DISCONNECTED, CONNBROKEN, DELAYED,
@@ -244,10 +253,7 @@ class AbstractDataBase(with_metaclass(MetaAbstractDataBase,
         return tzparse(self.p.tz)
 
     def date2num(self, dt):
-        if self._tz is not None:
-            return date2num(self._tz.localize(dt))
-
-        return date2num(dt)
+        return date2num(dt, tz=self._tz)
 
     def num2date(self, dt=None, tz=None, naive=True):
         if dt is None:
@@ -436,11 +442,230 @@ class AbstractDataBase(with_metaclass(MetaAbstractDataBase,
         return True
 
     def preload(self):
-        while self.load():
-            pass
+        starts = [len(line.array) for line in self.lines]
+        cachepath = self._cachepath()
+        if cachepath is None or not self._loadcache(cachepath):
+            self._preload()
+            if cachepath is not None:
+                self._savecache(cachepath, starts)
+
+        self.home()
+
+    def _preload(self):
+        if self._canbulkload():
+            self._bulkload()
+        else:
+            while self.load():
+                pass
 
         self._last()
+
+    # Names of the methods parsing a row and all rows (for _bulkload) in the
+    # subclasses which can load all bars at once during preload
+    _bulkmethods = None
+
+    def _canbulkload(self):
+        '''Returns ``True`` if ``_bulkload`` can deliver all remaining bars at
+        once during ``preload``: no filters and unbounded lines'''
+        if self._bulkmethods is None or self._filters:
+            return False
+
+        if any(line.mode != line.UnBounded for line in self.lines):
+            return False
+
+        # The class which implements the row parsing must also implement the
+        # bulk parsing. Else a subclass has changed the parsing logic
+        rowmethod, bulkmethod = self._bulkmethods
+        for cls in type(self).__mro__:
+            if rowmethod in cls.__dict__:
+                return bulkmethod in cls.__dict__
+
+        return False
+
+    def _bulkload(self):
+        raise NotImplementedError
+
+    def _bulkfill(self, columns):
+        '''Appends ``columns`` (the values of the bars, one column per line in
+        the order of ``self.lines``) to the lines, applying the input timezone
+        and ``fromdate``/``todate`` as ``load`` does bar by bar
+
+        Columns can be sequences of floats or numpy ``float64`` arrays
+        '''
+        dtidx = self.getlinealiases().index('datetime')
+        dts = columns[dtidx]
+        np = mathsupport.np
+        if self._tzinput:
+            # Input has been converted at face value but it's not UTC
+            tzinput = self._tzinput
+            if np is not None:
+                dts = nplocal2nums(dts, tzinput)
+            else:
+                dts = [date2num(num2date(dt), tz=tzinput) for dt in dts]
+
+            columns[dtidx] = dts
+
+        if np is not None and isinstance(dts, np.ndarray):
+            # Delivery stops with the 1st bar past todate (see load)
+            past = np.flatnonzero(dts > self.todate)
+            end = past[0] if len(past) else len(dts)
+            keep = np.flatnonzero(~(dts[:end] < self.fromdate))
+        else:
+            todate = self.todate
+            end = next((i for i, dt in enumerate(dts) if dt > todate),
+                       len(dts))
+            fromdate = self.fromdate
+            keep = [i for i in range(end) if not dts[i] < fromdate]
+
+        if len(keep) == len(dts):
+            keep = None  # nothing discarded, take the columns as they are
+        elif len(keep) and keep[-1] - keep[0] + 1 == len(keep):
+            keep = slice(keep[0], keep[-1] + 1)  # contiguous block
+
+        for line, column in zip(self.lines, columns):
+            isarray = np is not None and isinstance(column, np.ndarray)
+            if isinstance(keep, slice) or (keep is not None and isarray):
+                column = column[keep]
+            elif keep is not None:
+                column = [column[i] for i in keep]
+
+            if isarray:
+                # a single copy of the memory block of the values
+                column = np.ascontiguousarray(column, dtype=np.float64)
+                line.array.frombytes(column.tobytes())
+            else:
+                line.array.extend(column)
+
+    def preloadchunk(self, size):
+        '''Loads the next ``size`` bars (or those left) and rewinds to the
+        first of them, like ``preload`` does with all bars. Returns ``False``
+        if the data has been exhausted'''
+        start = self.buflen()
+        while self.buflen() - start < size:
+            if not self.load():
+                self._last()
+                self.home()
+                return False
+
         self.home()
+        return True
+
+    def _cachepath(self):
+        '''Returns the path of the cache file for the preloaded bars or
+        ``None`` if caching is not active/possible for this data feed'''
+        cachedir = self.p.cachedir
+        dataname = self.p.dataname
+        if not cachedir or not isinstance(dataname, string_types):
+            return None
+
+        if not os.path.isfile(dataname):
+            return None
+
+        if any(line.mode != line.UnBounded for line in self.lines):
+            return None
+
+        filters = list()
+        for f, fargs, fkwargs in self._filters:
+            fparams = getattr(f, 'p', None)
+            if fparams is not None:
+                fparams = list(fparams._getkwargs().items())
+
+            filters.append((f.__class__.__name__, getattr(f, '__name__', ''),
+                            fparams, fargs, sorted(fkwargs.items())))
+
+        params = [(k, v) for k, v in self.p._getkwargs().items()
+                  if k not in ('dataname', 'name', 'filters', 'cachedir',
+                               'cachemap')]
+
+        st = os.stat(dataname)
+        key = repr((self.__class__.__module__, self.__class__.__name__,
+                    os.path.abspath(dataname), st.st_mtime, st.st_size,
+                    params, filters, self.getlinealiases()))
+
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        basename = os.path.basename(dataname)
+        return os.path.join(cachedir, '%s.%s.btcache' % (basename, digest))
+
+    # Cache file: header (magic, number of lines, number of bars) followed
+    # by the values of each line as little endian float64 (line after line)
+    # The header is padded to keep the values 8 bytes aligned for mapping
+    _cachehdr = struct.Struct(str('<8sI4xQ'))
+    _cachemagic = b'BTCACHE1'
+
+    def _loadcache(self, path):
+        '''Loads the bars from the cache file in ``path`` into the lines'''
+        try:
+            f = io.open(path, 'rb')
+        except (IOError, OSError):
+            return False
+
+        with f:
+            hdr = f.read(self._cachehdr.size)
+            if len(hdr) != self._cachehdr.size:
+                return False
+
+            magic, nlines, nbars = self._cachehdr.unpack(hdr)
+            if magic != self._cachemagic or nlines != self.lines.fullsize():
+                return False
+
+            if not nbars:
+                return True
+
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                offset = self._cachehdr.size
+                size = nbars * 8
+                if len(mm) != offset + nlines * size:
+                    return False
+
+                if self._canmapcache():
+                    for line in self.lines:
+                        line.mapfile(path, offset, nbars)
+                        offset += size
+
+                    return True
+
+                for line in self.lines:
+                    values = array.array(str('d'))
+                    values.frombytes(mm[offset:offset + size])
+                    if sys.byteorder != 'little':
+                        values.byteswap()
+
+                    line.array.extend(values)
+                    offset += size
+            finally:
+                mm.close()
+
+        return True
+
+    def _canmapcache(self):
+        '''Returns ``True`` if the cached bars can be memory mapped into the
+        lines (nothing in the lines yet and native little endian floats)'''
+        if not self.p.cachemap or sys.byteorder != 'little':
+            return False
+
+        return not any(len(line.array) for line in self.lines)
+
+    def _savecache(self, path, starts):
+        '''Saves the bars (after ``starts``) in the lines to ``path``'''
+        nbars = len(self.lines[0].array) - starts[0]
+        dirname = os.path.dirname(path)
+        if dirname and not os.path.isdir(dirname):
+            os.makedirs(dirname)
+
+        tmppath = '%s.%d.tmp' % (path, os.getpid())
+        with io.open(tmppath, 'wb') as f:
+            nlines = self.lines.fullsize()
+            f.write(self._cachehdr.pack(self._cachemagic, nlines, nbars))
+
+            for line, start in zip(self.lines, starts):
+                values = array.array(str('d'), line.array[start:])
+                if sys.byteorder != 'little':
+                    values.byteswap()
+
+                f.write(values.tobytes())
+
+        getattr(os, 'replace', os.rename)(tmppath, path)
 
     def _last(self, datamaster=None):
         # Last chance for filters to deliver something
@@ -496,11 +721,10 @@ class AbstractDataBase(with_metaclass(MetaAbstractDataBase,
             # A bar has been loaded, adapt the time
             if self._tzinput:
                 # Input has been converted at face value but it's not UTC in
-                # the input stream
+                # the input stream. Localize it and keep the UTC value
                 dtime = num2date(dt)  # get it in a naive datetime
-                # localize it
-                dtime = self._tzinput.localize(dtime)  # pytz compatible-ized
-                self.lines.datetime[0] = dt = date2num(dtime)  # keep UTC val
+                dt = date2num(dtime, tz=self._tzinput)
+                self.lines.datetime[0] = dt
 
             # Check standard date from/to filters
             if dt < self.fromdate:
@@ -659,10 +883,42 @@ class CSVDataBase(with_metaclass(MetaCSVDataBase, DataBase)):
 
     The return value of ``_loadline`` (True/False) will be the return value
     of ``_load`` which has been overriden by this base class
+
+    Subclasses may additionally override:
+
+      - _loadlines(rows)
+
+    which receives the tokens of all remaining lines in the file and returns
+    one column of values per line (in the order of ``self.lines``). If
+    present, ``preload`` will parse the entire file in one pass and fill the
+    line buffers directly, applying ``fromdate``/``todate`` to the columns.
+
+    This bulk path is only taken if no filters have been added and the class
+    defining ``_loadline`` also defines ``_loadlines`` (a subclass overriding
+    only ``_loadline`` goes through the row by row path)
+
+    When the bars are loaded one by one (no ``preload``, as with replay, or a
+    ``preload`` with filters) a regular file (or an in-memory one) is read in
+    blocks of ``chunksize`` characters, which are split in lines in one go.
+    If the class can parse in bulk (see above) the lines of each block are
+    parsed with ``_loadlines`` and the bars are delivered from the resulting
+    columns. Only a block is kept in memory. Other sources (pipes, sockets
+    ...) are read line by line, to deliver each bar as soon as it arrives
+
+    Params:
+
+      - ``bulkload`` (default: ``True``): use the bulk path during ``preload``
+        and parse the blocks in bulk when loading bar by bar when possible
+
+      - ``chunksize`` (default: ``65536``): characters read from the file at
+        once when loading bar by bar
     '''
 
     f = None
-    params = (('headers', True), ('separator', ','),)
+    params = (('headers', True), ('separator', ','), ('bulkload', True),
+              ('chunksize', 65536),)
+
+    _bulkmethods = ('_loadline', '_loadlines')
 
     def start(self):
         super(CSVDataBase, self).start()
@@ -679,50 +935,138 @@ class CSVDataBase(with_metaclass(MetaCSVDataBase, DataBase)):
 
         self.separator = self.p.separator
 
+        self._tail = ''  # incomplete last line of the last block read
+        self._rows = collections.deque()  # tokens of the lines already read
+        self._batch = list()  # (line, column) of the block parsed in bulk
+        self._row = self._nrows = 0
+        self._chunked = self._isregular()
+        self._streambulk = self._chunked and self._canstreambulk()
+
     def stop(self):
         super(CSVDataBase, self).stop()
         if self.f is not None:
             self.f.close()
             self.f = None
 
-    def preload(self):
-        while self.load():
-            pass
+        self._rows.clear()
+        self._batch = list()
 
-        self._last()
-        self.home()
+    def preload(self):
+        super(CSVDataBase, self).preload()
 
         # preloaded - no need to keep the object around - breaks multip in 3.x
         self.f.close()
         self.f = None
 
-    def _load(self):
-        if self.f is None:
+    def _canbulkload(self):
+        if not self.p.bulkload or self.f is None:
             return False
 
-        # Let an exception propagate to let the caller know
-        line = self.f.readline()
+        return super(CSVDataBase, self)._canbulkload()
+
+    def _bulkload(self):
+        lines = self.f.read().split('\n')
+        if lines and not lines[-1]:
+            lines.pop()  # file ended with a newline
+
+        if not lines:
+            return
+
+        separator = self.separator
+        rows = [line.split(separator) for line in lines]
+
+        self._bulkfill(self._loadlines(rows))
+
+    def _loadlines(self, rows):
+        raise NotImplementedError
 
-        if not line:
+    def _canstreambulk(self):
+        # Like _canbulkload, but filters and bounded lines are no obstacle:
+        # the bars are still delivered one by one
+        if not self.p.bulkload:
             return False
 
-        line = line.rstrip('\n')
-        linetokens = line.split(self.separator)
-        return self._loadline(linetokens)
+        rowmethod, bulkmethod = self._bulkmethods
+        for cls in type(self).__mro__:
+            if rowmethod in cls.__dict__:
+                return bulkmethod in cls.__dict__
 
-    def _getnextline(self):
+        return False
+
+    def _isregular(self):
+        # Only a regular (or in-memory) file can be read in blocks without
+        # waiting for lines which have not yet been written
+        try:
+            return stat.S_ISREG(os.fstat(self.f.fileno()).st_mode)
+        except (AttributeError, OSError, ValueError):
+            pass  # no file descriptor (io.UnsupportedOperation is both)
+
+        try:
+            return self.f.seekable()
+        except (AttributeError, OSError, ValueError):
+            return False
+
+    def _readrows(self):
+        '''Reads the next block of the file (or line if it cannot be read in
+        blocks) and returns the tokens of the complete lines in it (an empty
+        list at the end of the file)'''
         if self.f is None:
-            return None
+            return []
 
-        # Let an exception propagate to let the caller know
-        line = self.f.readline()
+        if not self._chunked:
+            # Let an exception propagate to let the caller know
+            line = self.f.readline()
+            if not line:
+                return []
 
-        if not line:
-            return None
+            return [line.rstrip('\n').split(self.separator)]
+
+        while True:
+            # Let an exception propagate to let the caller know
+            block = self.f.read(self.p.chunksize)
+            if not block:  # end of file: deliver an incomplete last line
+                lines = [self._tail] if self._tail else []
+                self._tail = ''
+                break
+
+            lines = (self._tail + block).split('\n')
+            self._tail = lines.pop()
+            if lines:
+                break
+
+        separator = self.separator
+        return [line.split(separator) for line in lines]
+
+    def _load(self):
+        if not self._streambulk:
+            linetokens = self._getnextline()
+            if linetokens is None:
+                return False
+
+            return self._loadline(linetokens)
+
+        while self._row >= self._nrows:
+            rows = self._readrows()
+            if not rows:
+                return False
+
+            self._batch = list(zip(self.lines, self._loadlines(rows)))
+            self._row, self._nrows = 0, len(rows)
+
+        row = self._row
+        for line, values in self._batch:
+            line[0] = values[row]
+
+        self._row += 1
+        return True
+
+    def _getnextline(self):
+        if not self._rows:
+            self._rows.extend(self._readrows())
+            if not self._rows:
+                return None
 
-        line = line.rstrip('\n')
-        linetokens = line.split(self.separator)
-        return linetokens
+        return self._rows.popleft()
 
 
 class CSVFeedBase(FeedBase):
@@ -24,6 +24,7 @@ from __future__ import (absolute_import, division, print_function,
 
 from .csvgeneric import *
 from .btcsv import *
+from .btbinary import *
 from .vchartcsv import *
 from .vchart import *
 from .yahoo import *
@@ -31,7 +32,9 @@ from .quandl import *
 from .sierrachart import *
 from .mt4csv import *
 from .pandafeed import *
+from .parquetfeed import *
 from .influxfeed import *
+from .panel import *
 try:
     from .ibdata import *
 except ImportError:
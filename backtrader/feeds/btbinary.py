@@ -0,0 +1,261 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import io
+import mmap
+import os
+import struct
+
+from .. import feed, mathsupport
+from ..utils.py3 import zip
+
+
+__all__ = ['BacktraderBinaryData', 'writebinary']
+
+
+# Fields of each bar, in the order in which they are stored
+FIELDS = ('datetime', 'open', 'high', 'low', 'close', 'volume',
+          'openinterest')
+
+# Header: magic, size of the values (4/8), timeframe, compression, number of
+# bars, timezone and symbol (utf-8, NUL padded) and space reserved to have
+# 128 bytes. The bars are therefore 8 bytes aligned
+BINHEADER = struct.Struct(str('<8sB3xiiQ32s32s36x'))
+BINMAGIC = b'BTBARS01'
+
+
+def _barstruct(valuesize):
+    # datetime always as float64, the other fields as float32/float64
+    return struct.Struct(str('<d6%s' % ('f' if valuesize == 4 else 'd')))
+
+
+def _npbardtype(valuesize):
+    np = mathsupport.np
+    return np.dtype([(str(name), str('<f8' if not i else '<f%d' % valuesize))
+                     for i, name in enumerate(FIELDS)])
+
+
+def writebinary(path, columns, timeframe, compression, tz='', symbol='',
+                valuesize=8):
+    '''Writes bars to ``path`` in the format read by
+    ``BacktraderBinaryData``
+
+    ``columns`` is a ``dict`` with the values of the fields (``datetime`` as
+    returned by ``date2num``, ``open``, ``high``, ``low``, ``close``,
+    ``volume``, ``openinterest``). A missing field is stored as ``NaN``
+
+    ``valuesize`` is ``8`` (float64) or ``4`` (float32) for all fields but
+    the datetime, which is always float64
+    '''
+    if valuesize not in (4, 8):
+        raise ValueError('valuesize must be 4 or 8, not %s' % valuesize)
+
+    nbars = len(columns['datetime'])
+    nan = float('NaN')
+    values = [columns[name] if name in columns else [nan] * nbars
+              for name in FIELDS]
+
+    tz = tz.encode('utf-8')[:32] if tz else b''
+    symbol = symbol.encode('utf-8')[:32] if symbol else b''
+
+    with io.open(path, 'wb') as f:
+        f.write(BINHEADER.pack(BINMAGIC, valuesize, timeframe, compression,
+                               nbars, tz, symbol))
+
+        if mathsupport.npuse:
+            np = mathsupport.np
+            bars = np.empty(nbars, dtype=_npbardtype(valuesize))
+            for name, column in zip(FIELDS, values):
+                bars[name] = column
+
+            f.write(bars.tobytes())
+        else:
+            pack = _barstruct(valuesize).pack
+            for bar in zip(*values):
+                f.write(pack(*bar))
+
+
+class BacktraderBinaryData(feed.DataBase):
+    '''
+    Reads bars from a compact binary file, like the ones written by
+    ``writebinary`` (and by ``tools/rewrite-data.py --outformat btbin``)
+
+    The file is memory mapped and needs no parsing. The bars are fixed width
+    records and ``fromdate`` is found with a binary search over the datetime
+    of the records, as is the end of the bars (``todate``)
+
+    During ``preload`` all bars are converted at once (with
+    ``numpy.frombuffer`` if numpy is available and active, see
+    ``mathsupport.usenumpy``)
+
+    Format (little endian):
+
+      - Header of 128 bytes
+
+        - magic: ``BTBARS01`` (8 bytes)
+        - value size: 4 (float32) or 8 (float64) (uint8 and 3 bytes pad)
+        - timeframe (int32) and compression (int32)
+        - number of bars (uint64)
+        - timezone name: utf-8, NUL padded (32 bytes)
+        - symbol: utf-8, NUL padded (32 bytes)
+        - reserved (36 bytes)
+
+      - Bars: datetime (float64, as ``date2num`` in UTC) followed by open,
+        high, low, close, volume and openinterest (float32 or float64)
+
+    The ``timeframe`` and ``compression`` of the header are used for the
+    data feed (unless ``timeframe``/``compression`` are set), the symbol as
+    name (unless ``name`` is set) and the timezone name as ``tz`` (unless
+    ``tz`` is set)
+
+    Specific parameters:
+
+      - ``dataname``: the name of the file
+    '''
+
+    _bulkmethods = ('_load', '_bulkload')
+
+    def __init__(self):
+        super(BacktraderBinaryData, self).__init__()
+
+        with io.open(self.p.dataname, 'rb') as f:
+            hdr = f.read(BINHEADER.size)
+
+        if len(hdr) != BINHEADER.size or hdr[:len(BINMAGIC)] != BINMAGIC:
+            raise ValueError('%s is not a binary bars file' % self.p.dataname)
+
+        _, valuesize, timeframe, compression, _, tz, symbol = \
+            BINHEADER.unpack(hdr)
+
+        self._valuesize = valuesize
+        # the values of the header unless others are given
+        if self.p.isdefault('timeframe'):
+            self.p.timeframe = timeframe
+        if self.p.isdefault('compression'):
+            self.p.compression = compression
+
+        symbol = symbol.rstrip(b'\0').decode('utf-8')
+        if not self.p.name:
+            self._name = symbol
+
+        if self.p.tz is None:
+            self.p.tz = tz.rstrip(b'\0').decode('utf-8') or None
+
+    def start(self):
+        super(BacktraderBinaryData, self).start()
+
+        self._bar = _barstruct(self._valuesize)
+        self.f = io.open(self.p.dataname, 'rb')
+        size = os.fstat(self.f.fileno()).st_size
+        nbars = BINHEADER.unpack_from(self.f.read(BINHEADER.size))[4]
+        # a truncated file delivers the complete bars
+        self._nbars = min(nbars, (size - BINHEADER.size) // self._bar.size)
+        if size > BINHEADER.size:
+            self._mm = mmap.mmap(self.f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self._mm = b''
+
+        self._idx = None  # bars are located once fromdate/todate are known
+
+    def stop(self):
+        super(BacktraderBinaryData, self).stop()
+        self._close()
+
+    def preload(self):
+        super(BacktraderBinaryData, self).preload()
+        self._close()  # all bars are in the lines
+
+    def _close(self):
+        if isinstance(getattr(self, '_mm', None), mmap.mmap):
+            self._mm.close()
+
+        self._mm = b''
+        if getattr(self, 'f', None) is not None:
+            self.f.close()
+            self.f = None
+
+    def _dtat(self, i):
+        return struct.unpack_from(str('<d'), self._mm,
+                                  BINHEADER.size + i * self._bar.size)[0]
+
+    def _bisect(self, dt, right=False):
+        '''Returns the index of the first bar with a datetime greater than or
+        equal to ``dt`` (greater than with ``right``)'''
+        lo, hi = 0, self._nbars
+        while lo < hi:
+            mid = (lo + hi) // 2
+            middt = self._dtat(mid)
+            if middt < dt or (right and middt == dt):
+                lo = mid + 1
+            else:
+                hi = mid
+
+        return lo
+
+    def _locate(self):
+        # Index of the first bar and of the bar after the last. The stored
+        # datetimes are UTC: an input timezone discards the search (and load
+        # takes care of fromdate/todate)
+        self._idx, self._end = 0, self._nbars
+        if not self._tzinput:
+            self._idx = self._bisect(self.fromdate)
+            self._end = self._bisect(self.todate, right=True)
+
+    def _bulkload(self):
+        self._locate()
+        start, end = self._idx, self._end
+        self._idx = end
+        if start >= end:
+            return
+
+        if mathsupport.npuse:
+            np = mathsupport.np
+            bars = np.frombuffer(self._mm, dtype=_npbardtype(self._valuesize),
+                                 count=end - start,
+                                 offset=BINHEADER.size + start * self._bar.size)
+            columns = dict((name, bars[name].astype(np.float64))
+                           for name in FIELDS)
+            del bars  # release the mapped memory
+        else:
+            offset = BINHEADER.size + start * self._bar.size
+            barsdata = self._mm[offset:offset + (end - start) * self._bar.size]
+            columns = dict(zip(FIELDS, zip(*self._bar.iter_unpack(barsdata))))
+
+        self._bulkfill([columns[alias] for alias in self.getlinealiases()])
+
+    def _load(self):
+        if self._idx is None:
+            self._locate()
+
+        if self._idx >= self._end:
+            return False
+
+        bar = self._bar.unpack_from(
+            self._mm, BINHEADER.size + self._idx * self._bar.size)
+        self._idx += 1
+
+        lines = self.lines
+        lines.datetime[0], lines.open[0], lines.high[0], lines.low[0], \
+            lines.close[0], lines.volume[0], lines.openinterest[0] = bar
+
+        return True
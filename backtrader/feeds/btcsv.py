@@ -21,10 +21,12 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
+import array
 from datetime import date, datetime, time
 
 from .. import feed
-from ..utils import date2num
+from ..utils import date2num, date2nums
+from ..utils.py3 import map, zip
 
 
 class BacktraderCSVData(feed.CSVDataBase):
@@ -58,6 +60,40 @@ class BacktraderCSVData(feed.CSVDataBase):
 
         return True
 
+    def _loadlines(self, rows):
+        if len(set(map(len, rows))) != 1 or len(rows[0]) != 8:
+            # Bring rows to the 8 tokens format. None marks the usage of the
+            # end of the session as time
+            rows = [row if len(row) == 8 else row[0:1] + [None] + row[1:7]
+                    for row in rows]
+
+        dttxts, tmtxts, o, h, l, c, v, oi = zip(*rows)
+
+        # dates and times repeat themselves (intraday files) and are
+        # therefore converted once and then looked up
+        dts = dict()
+        for dttxt in set(dttxts):
+            dts[dttxt] = date(int(dttxt[0:4]), int(dttxt[5:7]),
+                              int(dttxt[8:10]))
+
+        tms = dict()
+        for tmtxt in set(tmtxts):
+            if tmtxt is None:
+                tms[tmtxt] = self.p.sessionend
+            else:
+                tms[tmtxt] = time(int(tmtxt[0:2]), int(tmtxt[3:5]),
+                                  int(tmtxt[6:8]))
+
+        dtnums = array.array(str('d'), date2nums(
+            map(dts.__getitem__, dttxts), map(tms.__getitem__, tmtxts)))
+
+        cols = dict(datetime=dtnums, open=o, high=h, low=l, close=c,
+                    volume=v, openinterest=oi)
+
+        return [cols[alias] if alias == 'datetime' else
+                array.array(str('d'), map(float, cols[alias]))
+                for alias in self.getlinealiases()]
+
 
 class BacktraderCSV(feed.CSVFeedBase):
     DataCls = BacktraderCSVData
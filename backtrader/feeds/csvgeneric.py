@@ -21,12 +21,13 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
+import array
 from datetime import datetime
 import itertools
 
 from .. import feed, TimeFrame
-from ..utils import date2num
-from ..utils.py3 import integer_types, string_types
+from ..utils import date2num, date2nums
+from ..utils.py3 import integer_types, string_types, map, zip
 
 
 class GenericCSVData(feed.CSVDataBase):
@@ -100,6 +101,25 @@ class GenericCSVData(feed.CSVDataBase):
         else:  # assume callable
             self._dtconvert = self.p.dtformat
 
+        # Bind once the lines (but datetime) to their CSV field index (None
+        # if not present, to assign the "nullvalue")
+        self._csvfields = list()
+        for linefield in self.getlinealiases():
+            if linefield == 'datetime':
+                continue
+
+            csvidx = getattr(self.params, linefield)
+            if csvidx is not None and csvidx < 0:
+                csvidx = None
+
+            self._csvfields.append(
+                (linefield, getattr(self.lines, linefield), csvidx))
+
+    # strptime directives which make a format not a pure date/time format
+    _TMDIRECTIVES = ('%H', '%I', '%M', '%S', '%f', '%p', '%X', '%c', '%z')
+    _DTDIRECTIVES = ('%Y', '%y', '%m', '%d', '%b', '%B', '%j', '%x', '%c',
+                     '%a', '%A', '%w', '%U', '%W', '%z')
+
     def _loadline(self, linetokens):
         # Datetime needs special treatment
         dtfield = linetokens[self.p.datetime]
@@ -115,6 +135,27 @@ class GenericCSVData(feed.CSVDataBase):
         else:
             dt = self._dtconvert(dtfield)
 
+        self.lines.datetime[0] = self._dt2num(dt)
+
+        # The rest of the fields can be done with the same procedure
+        nullvalue = self.p.nullvalue
+        for _, line, csvidx in self._csvfields:
+            if csvidx is None:
+                # the field will not be present, assignt the "nullvalue"
+                csvfield = nullvalue
+            else:
+                # get it from the token
+                csvfield = linetokens[csvidx]
+
+            if csvfield == '':
+                # if empty ... assign the "nullvalue"
+                csvfield = nullvalue
+
+            line[0] = float(csvfield)
+
+        return True
+
+    def _dt2num(self, dt):
         if self.p.timeframe >= TimeFrame.Days:
             # check if the expected end of session is larger than parsed
             if self._tzinput:
@@ -128,34 +169,73 @@ class GenericCSVData(feed.CSVDataBase):
             dteosnum = self.date2num(dteos)  # utc'ize
 
             if dteosnum > dtnum:
-                self.lines.datetime[0] = dteosnum
+                return dteosnum
+
+            # Avoid reconversion if already converted dtin == dt
+            return date2num(dt) if self._tzinput else dtnum
+
+        return date2num(dt)
+
+    def _loadlines(self, rows):
+        # zip stops at the shortest row, like _loadline would fail with it
+        columns = list(zip(*rows))
+        dtfields = columns[self.p.datetime]
+
+        dates, times = None, None
+        if self._dtstr:
+            dtformat = self.p.dtformat
+            if self.p.time < 0:
+                # Parse only the distinct timestamps
+                dtcache = dict((x, datetime.strptime(x, dtformat))
+                               for x in set(dtfields))
+                dts = list(map(dtcache.__getitem__, dtfields))
+
             else:
-                # Avoid reconversion if already converted dtin == dt
-                self.l.datetime[0] = date2num(dt) if self._tzinput else dtnum
+                tmfields = columns[self.p.time]
+                tmformat = self.p.tmformat
+                if any(x in dtformat for x in self._TMDIRECTIVES) or \
+                   any(x in tmformat for x in self._DTDIRECTIVES):
+                    dtformat += 'T' + tmformat
+                    dts = [datetime.strptime(d + 'T' + t, dtformat)
+                           for d, t in zip(dtfields, tmfields)]
+                else:
+                    # Dates and times can be parsed separately, only once
+                    dtcache = dict((x, datetime.strptime(x, dtformat).date())
+                                   for x in set(dtfields))
+                    tmcache = dict((x, datetime.strptime(x, tmformat).time())
+                                   for x in set(tmfields))
+
+                    dates = list(map(dtcache.__getitem__, dtfields))
+                    times = list(map(tmcache.__getitem__, tmfields))
+                    dts = list(map(datetime.combine, dates, times))
         else:
-            self.lines.datetime[0] = date2num(dt)
+            dts = list(map(self._dtconvert, dtfields))
 
-        # The rest of the fields can be done with the same procedure
-        for linefield in (x for x in self.getlinealiases() if x != 'datetime'):
-            # Get the index created from the passed params
-            csvidx = getattr(self.params, linefield)
+        if self.p.timeframe >= TimeFrame.Days or \
+           any(dt.tzinfo is not None for dt in dts):
+            dtnums = array.array(str('d'), map(self._dt2num, dts))
+        else:
+            if dates is None:
+                dates = [dt.date() for dt in dts]
+                times = [dt.time() for dt in dts]
+
+            dtnums = array.array(str('d'), date2nums(dates, times))
 
-            if csvidx is None or csvidx < 0:
+        nrows = len(dtnums)
+        nullvalue = self.p.nullvalue
+        lcolumns = dict(datetime=dtnums)
+        for linefield, _, csvidx in self._csvfields:
+            if csvidx is None:
                 # the field will not be present, assignt the "nullvalue"
-                csvfield = self.p.nullvalue
+                column = itertools.repeat(nullvalue, nrows)
             else:
-                # get it from the token
-                csvfield = linetokens[csvidx]
+                column = columns[csvidx]
+                if '' in column:
+                    column = [nullvalue if x == '' else x for x in column]
 
-            if csvfield == '':
-                # if empty ... assign the "nullvalue"
-                csvfield = self.p.nullvalue
+            lcolumns[linefield] = array.array(str('d'), map(float, column))
 
-            # get the corresponding line reference and set the value
-            line = getattr(self.lines, linefield)
-            line[0] = float(float(csvfield))
-
-        return True
+        return [lcolumns[alias] for alias in self.getlinealiases()]
 
 
 class GenericCSV(feed.CSVFeedBase):
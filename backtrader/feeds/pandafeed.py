@@ -24,10 +24,79 @@ from __future__ import (absolute_import, division, print_function,
 from backtrader.utils.py3 import filter, string_types, integer_types
 
 from backtrader import date2num
+from backtrader.utils import npdate2nums
 import backtrader.feed as feed
 
 
-class PandasDirectData(feed.DataBase):
+class _PandasDataBase(feed.DataBase):
+    '''Base class for the Pandas DataFrame feeds with a bulk ``preload``
+
+    During ``preload`` the columns mapped to lines are converted in one go
+    with ``to_numpy`` (no copy for numpy backed columns) and the datetime
+    values (a ``DatetimeIndex``, a ``datetime64`` column or an Arrow backed
+    timestamp column) are converted to numbers in a single vectorized pass.
+    Each line receives its values as a block
+
+    The path is only taken if no filters have been added and the class
+    defining ``_load`` also defines ``_bulkload``
+
+    Params:
+
+      - ``bulkload`` (default: ``True``): use the bulk path during ``preload``
+        when possible
+    '''
+    params = (('bulkload', True),)
+
+    _bulkmethods = ('_load', '_bulkload')
+
+    def _canbulkload(self):
+        if not self.p.bulkload:
+            return False
+
+        return super(_PandasDataBase, self)._canbulkload()
+
+    def _bulkcolumns(self, getcolumn):
+        '''Returns the columns of the remaining rows, one per line, with
+        ``getcolumn(datafield)`` returning the index/column of the DataFrame
+        for the field or ``None`` if not present'''
+        columns = list()
+        nan = float('NaN')
+        start = self._idx + 1
+        nrows = len(self.p.dataname) - start
+        for datafield in self.getlinealiases():
+            values = getcolumn(datafield)
+            if values is None:
+                # not in the DataFrame: the default value of the lines
+                values = [nan] * nrows
+            elif datafield == 'datetime':
+                values = self._bulkdtnums(values)[start:]
+            else:
+                values = self._bulkfloats(values)[start:]
+
+            columns.append(values)
+
+        self._idx += nrows
+        return columns
+
+    @staticmethod
+    def _bulkfloats(values):
+        try:
+            return values.to_numpy(dtype='float64', na_value=float('NaN'))
+        except TypeError:  # no na_value (pandas < 1.0)
+            return values.to_numpy(dtype='float64')
+
+    @staticmethod
+    def _bulkdtnums(values):
+        # tz-aware values are delivered as UTC, like date2num does
+        try:
+            dts = values.to_numpy(dtype='datetime64[ns]')
+        except (TypeError, ValueError):  # not timestamps: go value by value
+            return [date2num(x.to_pydatetime()) for x in values]
+
+        return npdate2nums(dts)
+
+
+class PandasDirectData(_PandasDataBase):
     '''
     Uses a Pandas DataFrame as the feed source, iterating directly over the
     tuples returned by "itertuples".
@@ -35,6 +104,9 @@ class PandasDirectData(feed.DataBase):
     This means that all parameters related to lines must have numeric
     values as indices into the tuples
 
+    During ``preload`` the columns are loaded in bulk (see the ``bulkload``
+    parameter)
+
     Note:
 
       - The ``dataname`` parameter is a Pandas DataFrame
@@ -63,6 +135,7 @@ class PandasDirectData(feed.DataBase):
 
         # reset the iterator on each start
         self._rows = self.p.dataname.itertuples()
+        self._idx = -1
 
     def _load(self):
         try:
@@ -70,6 +143,8 @@ class PandasDirectData(feed.DataBase):
         except StopIteration:
             return False
 
+        self._idx += 1
+
         # Set the standard datafields - except for datetime
         for datafield in self.getlinealiases():
             if datafield == 'datetime':
@@ -103,8 +178,22 @@ class PandasDirectData(feed.DataBase):
         # Done ... return
         return True
 
+    def _bulkload(self):
+        df = self.p.dataname
+
+        def getcolumn(datafield):
+            # index 0 of the tuples is the index, then the columns
+            colidx = getattr(self.params, datafield)
+            if colidx < 0:
+                return None
+
+            return df.index if not colidx else df.iloc[:, colidx - 1]
 
-class PandasData(feed.DataBase):
+        self._bulkfill(self._bulkcolumns(getcolumn))
+        self._rows = iter(())  # exhausted
+
+
+class PandasData(_PandasDataBase):
     '''
     Uses a Pandas DataFrame as the feed source, using indices into column
     names (which can be "numeric")
@@ -112,6 +201,9 @@ class PandasData(feed.DataBase):
     This means that all parameters related to lines must have numeric
     values as indices into the tuples
 
+    During ``preload`` the columns are loaded in bulk (see the ``bulkload``
+    parameter)
+
     Params:
 
       - ``nocase`` (default *True*) case insensitive match of column names
@@ -271,3 +363,16 @@ class PandasData(feed.DataBase):
 
         # Done ... return
         return True
+
+    def _bulkload(self):
+        df = self.p.dataname
+
+        def getcolumn(datafield):
+            colindex = self._colmapping[datafield]
+            if colindex is None:
+                # the index for the datetime, else missing in the stream
+                return df.index if datafield == 'datetime' else None
+
+            return df.iloc[:, colindex]
+
+        self._bulkfill(self._bulkcolumns(getcolumn))
@@ -0,0 +1,340 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import array
+import collections
+from itertools import repeat
+
+from backtrader.utils.py3 import integer_types
+from backtrader import mathsupport
+from backtrader.linebuffer import LineBuffer
+from backtrader.mathsupport import np
+import backtrader.feed as feed
+
+
+__all__ = ['PanelField', 'Panel', 'PanelData', 'PanelSymbol']
+
+
+NAN = float('NaN')
+
+
+class PanelField(object):
+    '''Values of a field (``close``, ``volume``, ...) of all the symbols of a
+    panel, held in a single array with the bars of each symbol stored
+    contiguously (a ``symbols x bars`` matrix)
+
+    ``field[ago]`` returns the values of all the symbols at the bar ``ago``
+    (``0`` is the current bar, ``-1`` the previous one, ...) in the order of
+    ``Panel.symbols``. The result is a numpy array (a view, which must not be
+    modified) if numpy is available and in use or else an ``array.array``
+    '''
+    def __init__(self, panel, values=None):
+        self._panel = panel
+        if values is None:
+            values = array.array(str('d'),
+                                 repeat(NAN, len(panel.symbols) * panel.nbars))
+
+        self.array = values
+
+    def __len__(self):
+        return len(self._panel)
+
+    def __getitem__(self, ago):
+        nbars = self._panel.nbars
+        i = self._panel._clock.idx + ago
+        if not 0 <= i < nbars:
+            raise IndexError('bar out of the panel')
+
+        if mathsupport.npuse and np is not None:
+            return self.matrix()[:, i]
+
+        return self.array[i::nbars]
+
+    def matrix(self):
+        '''Returns a numpy ``symbols x bars`` view of the values'''
+        return np.frombuffer(self.array).reshape(-1, self._panel.nbars)
+
+    def column(self, symbol):
+        '''Returns a copy of all the values of ``symbol`` (name or index)'''
+        nbars = self._panel.nbars
+        start = self._panel.index(symbol) * nbars
+        return self.array[start:start + nbars]
+
+
+class Panel(object):
+    '''Cross-sectional view of the symbols of a ``PanelData`` feed. Each
+    field of the feed is available as an attribute (``panel.close``, ...)
+    holding a ``PanelField``
+
+    The bars of the panel are the union of the datetimes of all the symbols
+    '''
+    def __init__(self, data, symbols, nbars):
+        self._data = data
+        self._clock = data.lines.datetime
+        self.symbols = list(symbols)
+        self._symidx = dict((s, i) for i, s in enumerate(self.symbols))
+        self.nbars = nbars
+        self.fields = collections.OrderedDict()
+        self._sdatas = dict()
+
+    def __len__(self):
+        return len(self._clock)
+
+    def _addfield(self, name, values):
+        self.fields[name] = field = PanelField(self, values)
+        setattr(self, name, field)
+
+    def index(self, symbol):
+        '''Returns the position of ``symbol`` (name or index) in the panel'''
+        if isinstance(symbol, integer_types):
+            return symbol
+
+        return self._symidx[symbol]
+
+    def getdata(self, symbol):
+        '''Returns the data feed of ``symbol`` (name or index), to be used
+        as the target of orders (``buy``, ``sell``, ``order_target_xxx``)
+        and to check positions (``getposition``)
+
+        The feed is created the first time it is requested and follows the
+        bars of the panel without being moved bar by bar
+        '''
+        i = self.index(symbol)
+        sdata = self._sdatas.get(i)
+        if sdata is None:
+            sdata = PanelSymbol(dataname=self._data, name=self.symbols[i])
+            sdata._start()
+            self._sdatas[i] = sdata
+
+        return sdata
+
+
+class PanelData(feed.DataBase):
+    '''Feed holding the bars of many symbols in one ``symbols x bars`` array
+    per field, to avoid the cost of a data feed object per symbol moved bar
+    by bar
+
+    The feed delivers a bar (only the ``datetime`` line is filled) for each
+    datetime present in any of the symbols. The values are reached with the
+    ``panel`` attribute (a ``Panel``), which is also set as the ``panel``
+    attribute of strategies::
+
+        closes = self.panel.close[0]  # current close of all symbols
+
+    Orders are routed to the broker per symbol with the feed returned by
+    ``panel.getdata(symbol)``
+
+    Note:
+
+      - The ``dataname`` parameter is a list of data feeds (each symbol
+        takes the name of the feed) or a dictionary with the symbols as keys
+        and the data feeds as values. The feeds are preloaded when the panel
+        starts
+
+      - The panel keeps all the bars in memory (``exactbars`` does not
+        apply to it)
+
+    Params:
+
+      - ``fields`` (default: ``('open', 'high', 'low', 'close', 'volume',
+        'openinterest')``): lines of the feeds which are kept in the panel
+
+      - ``symbols`` (default: ``None``): names of the symbols, if not taken
+        from ``dataname``
+
+      - ``fillgaps`` (default: ``True``): if a symbol has no bar at a
+        datetime after its first bar, the price fields take the previous
+        ``close``, ``volume`` is ``0`` and other fields keep the previous
+        value. If ``False`` the missing values are ``NaN``
+    '''
+
+    params = (
+        ('fields', ('open', 'high', 'low', 'close', 'volume',
+                    'openinterest')),
+        ('symbols', None),
+        ('fillgaps', True),
+    )
+
+    _PRICES = ('open', 'high', 'low', 'close')
+
+    plotinfo = dict(plot=False)
+
+    panel = None
+
+    def _start(self):
+        super(PanelData, self)._start()
+        self._loadpanel()  # fromdate/todate are known after _start_finish
+
+    def start(self):
+        super(PanelData, self).start()
+        self._pidx = 0
+
+    def qbuffer(self, savemem=0, replaying=False):
+        pass  # the bars of the symbols are reached by index
+
+    def _sources(self):
+        dataname = self.p.dataname
+        if isinstance(dataname, dict):
+            symbols, feeds = list(dataname.keys()), list(dataname.values())
+        else:
+            feeds = list(dataname)
+            symbols = [d._name or str(i) for i, d in enumerate(feeds)]
+
+        if self.p.symbols is not None:
+            symbols = list(self.p.symbols)
+
+        return symbols, feeds
+
+    def _loadpanel(self):
+        symbols, feeds = self._sources()
+
+        sbars = list()
+        for data in feeds:
+            data.setenvironment(self._env)
+            data.reset()
+            data._start()
+            data.preload()
+            sbars.append(
+                (list(data.lines.datetime.array),
+                 [list(getattr(data.lines, f).array)
+                  if hasattr(data.lines, f) else None
+                  for f in self.p.fields]))
+            data.stop()
+
+        self._dts = dts = sorted(
+            set(dt for sdts, _ in sbars for dt in sdts
+                if self.fromdate <= dt <= self.todate))
+
+        nbars = len(dts)
+        self.panel = panel = Panel(self, symbols, nbars)
+        values = [array.array(str('d'), repeat(NAN, len(symbols) * nbars))
+                  for f in self.p.fields]
+
+        for i, (sdts, svals) in enumerate(sbars):
+            self._fillsymbol(i * nbars, dts, sdts, svals, values)
+
+        for name, fvalues in zip(self.p.fields, values):
+            panel._addfield(name, fvalues)
+
+    def _fillsymbol(self, base, dts, sdts, svals, values):
+        if sdts == dts:  # aligned with the panel - plain copy
+            for fvalues, vals in zip(values, svals):
+                if vals is not None:
+                    fvalues[base:base + len(dts)] = array.array(str('d'),
+                                                                vals)
+            return
+
+        fields = self.p.fields
+        iclose = fields.index('close') if 'close' in fields else None
+
+        k, nsbars = 0, len(sdts)
+        started = False
+        for i, dt in enumerate(dts):
+            while k < nsbars and sdts[k] < dt:
+                k += 1  # bar out of fromdate/todate
+
+            if k < nsbars and sdts[k] == dt:
+                for fvalues, vals in zip(values, svals):
+                    if vals is not None:
+                        fvalues[base + i] = vals[k]
+                k += 1
+                started = True
+
+            elif started and self.p.fillgaps:
+                for name, fvalues in zip(fields, values):
+                    if name in self._PRICES and iclose is not None:
+                        fvalues[base + i] = values[iclose][base + i - 1]
+                    elif name == 'volume':
+                        fvalues[base + i] = 0.0
+                    else:
+                        fvalues[base + i] = fvalues[base + i - 1]
+
+    def _load(self):
+        if self._pidx >= len(self._dts):
+            return False
+
+        self.lines.datetime[0] = self._dts[self._pidx]
+        self._pidx += 1
+        return True
+
+
+class _PanelLine(LineBuffer):
+    '''Buffer holding the values of a symbol of a panel, with the index and
+    length taken from the clock of the panel'''
+    def __init__(self, clock, values):
+        super(_PanelLine, self).__init__()
+        self._clock = clock
+        self.array = values
+
+    def _noset(self, value):
+        pass  # the clock of the panel moves the buffer
+
+    idx = property(lambda self: self._clock.idx, _noset)
+    lencount = property(lambda self: self._clock.lencount, _noset)
+
+
+class PanelSymbol(feed.DataBase):
+    '''Data feed of a symbol of a ``PanelData`` feed (see
+    ``Panel.getdata``). The ``dataname`` parameter is the panel feed
+
+    The lines take the values from the panel and follow its bars without
+    being loaded or moved by cerebro
+    '''
+
+    def __init__(self):
+        pdata = self.p.dataname
+        panel = pdata.panel
+        clock = pdata.lines.datetime
+        isym = panel.index(self.p.name)
+
+        for i, alias in enumerate(self.getlinealiases()):
+            if alias == 'datetime':
+                line = clock
+            else:
+                field = panel.fields.get(alias)
+                if field is not None:
+                    values = field.column(isym)
+                else:
+                    values = array.array(str('d'), repeat(NAN, panel.nbars))
+
+                line = _PanelLine(clock, values)
+
+            self.lines.lines[i] = line
+            setattr(self, 'line_%d' % i, line)
+            setattr(self, 'line%d' % i, line)
+
+        self.line = self.lines[0]
+
+    def _start(self):
+        # take the time/date related bits from the panel (as DataClone does)
+        self.start()
+
+        pdata = self.p.dataname
+        self._id = pdata._id  # trades are reported on the panel
+        self._tz = pdata._tz
+        self._calendar = pdata._calendar
+        self._tzinput = None
+        self.fromdate = pdata.fromdate
+        self.todate = pdata.todate
+        self.sessionstart = pdata.sessionstart
+        self.sessionend = pdata.sessionend
@@ -0,0 +1,277 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import datetime
+import os.path
+
+from backtrader.utils.py3 import integer_types, string_types
+from backtrader.utils import num2date, npdate2nums, UTC
+import backtrader.feed as feed
+
+
+__all__ = ['ParquetData']
+
+
+class ParquetData(feed.DataBase):
+    '''
+    Reads the bars from Apache Parquet or Arrow IPC (Feather v2) files with
+    ``pyarrow``
+
+    ``dataname`` can be a file, a directory (with ``hive`` partitioning, like
+    ``symbol=XXX/date=YYYY-MM-DD/part-0.parquet``), a list of files or a
+    ``pyarrow.Table``. The rows have to be in chronological order
+
+    Only the columns mapped to lines are read. The datetime column is
+    pushed down as a filter with ``fromdate`` and ``todate`` (and with
+    ``where``), which lets ``pyarrow`` skip whole files and Parquet row
+    groups by their statistics
+
+      - During ``preload`` the selected rows are read as a table and each
+        column is converted in one go into its line
+
+      - Else the record batches (of ``batchsize`` rows) are streamed and
+        delivered bar by bar, keeping only a batch in memory
+
+    Params:
+
+      - ``fileformat`` (default: ``None``): ``'parquet'`` or ``'ipc'``
+        (also ``'arrow'`` and ``'feather'``). With ``None`` the extension of
+        ``dataname`` decides: ``.arrow``, ``.feather`` and ``.ipc`` are Arrow
+        IPC files and anything else is Parquet
+
+      - ``partitioning`` (default: ``'hive'``): partitioning scheme of a
+        directory, passed to ``pyarrow.dataset.dataset``
+
+      - ``where`` (default: ``None``): rows to read. Either a ``dict``
+        matching columns (partitioning ones included) to values, like
+        ``dict(symbol='AAPL')``, or a ``pyarrow.dataset.Expression``
+
+      - ``batchsize`` (default: ``65536``): rows per record batch when
+        streaming
+
+      - ``nocase`` (default: ``True``): case insensitive match of column
+        names
+
+      - Lines (``datetime``, ``open``, ...): column of each line
+
+        - ``None``: column not present
+        - ``-1``: autodetect a column with the name of the line
+        - ``>= 0`` or string: index or name of the column
+
+    The datetime column can be a timestamp (timezone aware columns are taken
+    as UTC), a date or a string which ``pyarrow`` can cast to a timestamp
+    '''
+    packages = (
+        ('pyarrow', 'pa'),
+        ('pyarrow.compute', 'pc'),
+        ('pyarrow.dataset', 'pads'),
+    )
+
+    params = (
+        ('fileformat', None),
+        ('partitioning', 'hive'),
+        ('where', None),
+        ('batchsize', 65536),
+        ('nocase', True),
+
+        ('datetime', -1),
+        ('open', -1),
+        ('high', -1),
+        ('low', -1),
+        ('close', -1),
+        ('volume', -1),
+        ('openinterest', -1),
+    )
+
+    _bulkmethods = ('_load', '_bulkload')
+
+    _ipcexts = ('.arrow', '.feather', '.ipc')
+
+    def start(self):
+        super(ParquetData, self).start()
+
+        self._dataset = dataset = self._getdataset()
+
+        # Find the column of each line
+        names = dataset.schema.names
+        if self.p.nocase:
+            lnames = [name.lower() for name in names]
+
+        self._colmapping = colmapping = list()  # (line alias, column)
+        for datafield in self.getlinealiases():
+            col = getattr(self.params, datafield)
+            if col is None:
+                continue
+
+            if isinstance(col, integer_types):
+                if col < 0:  # autodetect
+                    if self.p.nocase and datafield.lower() in lnames:
+                        col = names[lnames.index(datafield.lower())]
+                    elif datafield in names:
+                        col = datafield
+                    else:
+                        continue  # not found
+                else:
+                    col = names[col]
+            elif self.p.nocase:
+                col = names[lnames.index(col.lower())]  # ValueError if missing
+            elif col not in names:
+                raise ValueError('Column %s not found' % col)
+
+            colmapping.append((datafield, col))
+
+        if 'datetime' not in dict(colmapping):
+            raise ValueError('No datetime column in %s' % self.p.dataname)
+
+        self._batches = None  # the scan runs once fromdate/todate are known
+        self._batch = list()
+        self._row = self._nrows = 0
+
+    def stop(self):
+        super(ParquetData, self).stop()
+        self._batches = None
+        self._batch = list()
+
+    def _getdataset(self):
+        dataname = self.p.dataname
+        if isinstance(dataname, (pa.Table, pa.RecordBatch)):
+            return pads.dataset(dataname)
+
+        fileformat = self.p.fileformat
+        if fileformat is None:
+            first = dataname
+            if not isinstance(dataname, string_types):
+                first = dataname[0]  # list of files
+
+            ext = os.path.splitext(first)[1].lower()
+            fileformat = 'ipc' if ext in self._ipcexts else 'parquet'
+        elif fileformat in ('arrow', 'feather'):
+            fileformat = 'ipc'
+
+        return pads.dataset(dataname, format=fileformat,
+                            partitioning=self.p.partitioning)
+
+    def _getfilter(self):
+        '''Returns the expression selecting the rows to read or ``None``'''
+        where = self.p.where
+        if isinstance(where, dict):
+            expr = None
+            for name, value in where.items():
+                cond = pads.field(name) == value
+                expr = cond if expr is None else expr & cond
+
+            where = expr
+
+        dtcol = dict(self._colmapping)['datetime']
+        dttype = self._dataset.schema.field(dtcol).type
+        if self._tzinput or not pa.types.is_timestamp(dttype):
+            # the face values of the column are not UTC or are not comparable
+            # to a timestamp: fromdate/todate are only applied when loading
+            return where
+
+        # With some slack for the rounding errors of the conversions. The
+        # exact comparison is done when loading
+        slack = datetime.timedelta(milliseconds=1)
+        tstype = pa.timestamp('us', tz=dttype.tz)
+        bounds = list()
+        if self.p.fromdate is not None:
+            dt = num2date(self.fromdate, tz=UTC, naive=dttype.tz is None)
+            dt = pa.scalar(dt - slack, type=tstype)
+            bounds.append(pads.field(dtcol) >= dt)
+
+        if self.p.todate is not None:
+            dt = num2date(self.todate, tz=UTC, naive=dttype.tz is None)
+            dt = pa.scalar(dt + slack, type=tstype)
+            bounds.append(pads.field(dtcol) <= dt)
+
+        for cond in bounds:
+            where = cond if where is None else where & cond
+
+        return where
+
+    def _getcolumns(self, table):
+        '''Returns the values of the lines (in the order of the lines, with
+        ``None`` for the lines without column) of ``table`` as numpy arrays
+        '''
+        colmapping = dict(self._colmapping)
+        columns = list()
+        for datafield in self.getlinealiases():
+            col = colmapping.get(datafield)
+            if col is None:
+                columns.append(None)
+                continue
+
+            values = table.column(col)
+            if datafield != 'datetime':
+                # nulls are delivered as NaN
+                columns.append(pc.cast(values, pa.float64()).to_numpy())
+                continue
+
+            if not (pa.types.is_timestamp(values.type) or
+                    pa.types.is_date(values.type)):
+                values = pc.cast(values, pa.timestamp('us'))
+
+            # timezone aware timestamps are delivered as UTC (like date2num)
+            columns.append(npdate2nums(values.to_numpy()))
+
+        return columns
+
+    def _scancolumns(self):
+        return [col for _, col in self._colmapping]
+
+    def _bulkload(self):
+        table = self._dataset.to_table(columns=self._scancolumns(),
+                                       filter=self._getfilter())
+
+        nan = float('NaN')
+        columns = self._getcolumns(table)
+        columns = [[nan] * table.num_rows if column is None else column
+                   for column in columns]
+
+        self._bulkfill(columns)
+
+    def _load(self):
+        if self._batches is None:
+            self._batches = self._dataset.to_batches(
+                columns=self._scancolumns(), filter=self._getfilter(),
+                batch_size=self.p.batchsize)
+
+        while self._row >= self._nrows:
+            batch = next(self._batches, None)
+            if batch is None:
+                return False
+
+            table = pa.Table.from_batches([batch])
+            columns = self._getcolumns(table)
+            self._batch = [(line, column.tolist())
+                           for line, column in zip(self.lines, columns)
+                           if column is not None]
+
+            self._row, self._nrows = 0, table.num_rows
+
+        row = self._row
+        for line, values in self._batch:
+            line[0] = values[row]
+
+        self._row += 1
+        return True
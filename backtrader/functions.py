@@ -24,7 +24,9 @@ from __future__ import (absolute_import, division, print_function,
 import functools
 import math
 
+from . import mathsupport
 from .linebuffer import LineActions
+from .mathsupport import np
 from .utils.py3 import cmp, range
 
 
@@ -39,6 +41,23 @@ class Logic(LineActions):
         super(Logic, self).__init__()
         self.args = [self.arrayize(arg) for arg in args]
 
+    def _npargs(self, start, end, *args):
+        '''Returns numpy views of the [start, end) range of the buffer and of
+        the ``args`` (or their values if they are numbers) or ``None`` if the
+        calculation cannot be vectorized'''
+        if not mathsupport.npuse:
+            return None
+
+        dst = self._npview(self.array, end)
+        if dst is None:
+            return None
+
+        npargs = [self._npoperand(arg, start, end) for arg in args]
+        if any(arg is None for arg in npargs):
+            return None
+
+        return [dst[start:end]] + npargs
+
 
 class DivByZero(Logic):
     '''This operation is a Lines object and fills it values by executing a
@@ -62,6 +81,14 @@ class DivByZero(Logic):
         self[0] = self.a[0] / b if b else self.zero
 
     def once(self, start, end):
+        a, b = self.args  # a, b as lines
+        npargs = self._npargs(start, end, a, b, self.zero)
+        if npargs is not None:
+            dst, a, b, zero = npargs
+            with np.errstate(all='ignore'):
+                dst[:] = np.where(b != 0.0, np.true_divide(a, b), zero)
+            return
+
         # cache python dictionary lookups
         dst = self.array
         srca = self.a.array
@@ -101,6 +128,15 @@ class DivZeroByZero(Logic):
             self[0] = self.a[0] / b
 
     def once(self, start, end):
+        a, b = self.args  # a, b as lines
+        npargs = self._npargs(start, end, a, b, self.single, self.dual)
+        if npargs is not None:
+            dst, a, b, single, dual = npargs
+            with np.errstate(all='ignore'):
+                dst[:] = np.where(b == 0.0, np.where(a == 0.0, dual, single),
+                                  np.true_divide(a, b))
+            return
+
         # cache python dictionary lookups
         dst = self.array
         srca = self.a.array
@@ -127,6 +163,13 @@ class Cmp(Logic):
         self[0] = cmp(self.a[0], self.b[0])
 
     def once(self, start, end):
+        npargs = self._npargs(start, end, self.a, self.b)
+        if npargs is not None:
+            dst, a, b = npargs
+            # as cmp: 0 if any is nan (both comparisons are False)
+            dst[:] = np.greater(a, b).astype(np.float64) - np.less(a, b)
+            return
+
         # cache python dictionary lookups
         dst = self.array
         srca = self.a.array
@@ -149,6 +192,13 @@ class CmpEx(Logic):
         self[0] = cmp(self.a[0], self.b[0])
 
     def once(self, start, end):
+        npargs = self._npargs(start, end, self.a, self.b, self.r1, self.r2,
+                              self.r3)
+        if npargs is not None:
+            dst, a, b, r1, r2, r3 = npargs
+            dst[:] = np.where(a < b, r1, np.where(a > b, r3, r2))
+            return
+
         # cache python dictionary lookups
         dst = self.array
         srca = self.a.array
@@ -180,6 +230,12 @@ class If(Logic):
         self[0] = self.a[0] if self.cond[0] else self.b[0]
 
     def once(self, start, end):
+        npargs = self._npargs(start, end, self.cond, self.a, self.b)
+        if npargs is not None:
+            dst, cond, a, b = npargs
+            dst[:] = np.where(cond != 0.0, a, b)  # nan is also True
+            return
+
         # cache python dictionary lookups
         dst = self.array
         srca = self.a.array
@@ -191,10 +247,22 @@ class If(Logic):
 
 
 class MultiLogic(Logic):
+    # Subclasses can provide a vectorized version of flogic taking the list
+    # of operands (numpy arrays or numbers) and returning the results
+    nplogic = None
+
     def next(self):
         self[0] = self.flogic([arg[0] for arg in self.args])
 
     def once(self, start, end):
+        if self.nplogic is not None:
+            npargs = self._npargs(start, end, *self.args)
+            if npargs is not None:
+                dst = npargs[0]
+                with np.errstate(all='ignore'):
+                    dst[:] = self.nplogic(npargs[1:])
+                return
+
         # cache python dictionary lookups
         dst = self.array
         arrays = [arg.array for arg in self.args]
@@ -207,6 +275,10 @@ class MultiLogic(Logic):
 class MultiLogicReduce(MultiLogic):
     def __init__(self, *args, **kwargs):
         super(MultiLogicReduce, self).__init__(*args)
+        if len(args) < 2 or 'initializer' in kwargs:
+            # reduce returns the only/initializer value and not a bool
+            self.nplogic = None
+
         if 'initializer' not in kwargs:
             self.flogic = functools.partial(functools.reduce, self.flogic)
         else:
@@ -226,33 +298,81 @@ def _andlogic(x, y):
     return bool(x and y)
 
 
+def _npandlogic(args):
+    truths = [np.not_equal(x, 0.0) for x in args]  # nan is also True
+    return functools.reduce(np.logical_and, truths)
+
+
 class And(MultiLogicReduce):
     flogic = staticmethod(_andlogic)
+    nplogic = staticmethod(_npandlogic)
 
 
 def _orlogic(x, y):
     return bool(x or y)
 
 
+def _nporlogic(args):
+    truths = [np.not_equal(x, 0.0) for x in args]  # nan is also True
+    return functools.reduce(np.logical_or, truths)
+
+
 class Or(MultiLogicReduce):
     flogic = staticmethod(_orlogic)
+    nplogic = staticmethod(_nporlogic)
+
+
+def _npmaxlogic(args):
+    # as the built-in max: the 1st value is replaced only by greater values,
+    # which lets a leading nan win and skips later nans
+    ret = args[0]
+    for x in args[1:]:
+        ret = np.where(np.greater(x, ret), x, ret)
+
+    return ret
 
 
 class Max(MultiLogic):
     flogic = max
+    nplogic = staticmethod(_npmaxlogic)
+
+
+def _npminlogic(args):
+    # see _npmaxlogic
+    ret = args[0]
+    for x in args[1:]:
+        ret = np.where(np.less(x, ret), x, ret)
+
+    return ret
 
 
 class Min(MultiLogic):
     flogic = min
+    nplogic = staticmethod(_npminlogic)
 
 
 class Sum(MultiLogic):
     flogic = math.fsum
 
+    def once(self, start, end):
+        # Only 2 operands: a single addition is exactly rounded as fsum. The
+        # finite check keeps fsum behavior for inf/-inf (ValueError)
+        if len(self.args) == 2:
+            npargs = self._npargs(start, end, *self.args)
+            if npargs is not None:
+                dst, a, b = npargs
+                if np.isfinite(a).all() and np.isfinite(b).all():
+                    np.add(a, b, out=dst)
+                    return
+
+        super(Sum, self).once(start, end)
+
 
 class Any(MultiLogic):
     flogic = any
+    nplogic = staticmethod(_nporlogic)
 
 
 class All(MultiLogic):
     flogic = all
+    nplogic = staticmethod(_npandlogic)
@@ -22,6 +22,8 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
 
+import array
+
 from .utils.py3 import range, with_metaclass
 
 from .lineiterator import LineIterator, IndicatorBase
@@ -44,6 +46,31 @@ class MetaIndicator(IndicatorBase.__class__):
     def usecache(cls, onoff):
         cls._icacheuse = onoff
 
+    # Cache of the values calculated in runonce mode, which survives the
+    # executions (i.e.: combinations of an optimization) in a process.
+    # Indicators are keyed by class, params and the keys of the input lines
+    _ocache = dict()
+    _ocacheuse = False
+    _olinekeys = dict()  # id(line) -> key of the line (for the current run)
+
+    @classmethod
+    def cleanoncecache(cls):
+        cls._ocache = dict()
+        cls._olinekeys = dict()
+
+    @classmethod
+    def useoncecache(cls, onoff):
+        cls._ocacheuse = onoff
+
+    @classmethod
+    def startoncecache(cls, datas):
+        '''Called at the start of each execution to key the lines of the
+        ``datas``, the primary inputs of the indicators'''
+        cls._olinekeys = dict()
+        for i, data in enumerate(datas):
+            for j, line in enumerate(data.lines):
+                cls._olinekeys[id(line)] = ('data', i, j)
+
     # Object cache deactivated on 2016-08-17. If the object is being used
     # inside another object, the minperiod information carried over
     # influences the first usage when being modified during the 2nd usage
@@ -92,6 +119,61 @@ class Indicator(with_metaclass(MetaIndicator, IndicatorBase)):
 
     csv = False
 
+    def _once(self):
+        if not MetaIndicator._ocacheuse:
+            return super(Indicator, self)._once()
+
+        key = self._oncekey()
+        if key is None:  # inputs or params cannot be keyed
+            return super(Indicator, self)._once()
+
+        lines = list(self._oncelines(self))
+        values = MetaIndicator._ocache.get(key)
+        if values is None:
+            super(Indicator, self)._once()
+            MetaIndicator._ocache[key] = [array.array(str('d'), line.array)
+                                 for line in lines]
+        else:
+            # The values of the sub-indicators are also restored, to make
+            # them available should anything refer to them
+            for line, vals in zip(lines, values):
+                line.array = array.array(str('d'), vals)
+                line.home()
+
+        for i, line in enumerate(self.lines):
+            MetaIndicator._olinekeys[id(line)] = (key, i)
+
+    def _onceflat(self):
+        # the cache needs to see the complete recursive calculation and a
+        # subclass with its own _once keeps it
+        return (not MetaIndicator._ocacheuse and
+                type(self)._once == Indicator._once)
+
+    def _oncekey(self):
+        '''Returns the key of the values of the indicator (or None if the
+        indicator cannot be cached) for the cross-execution once cache'''
+        olinekeys = MetaIndicator._olinekeys
+        try:
+            dkeys = tuple(tuple(olinekeys[id(line)] for line in data.lines)
+                          for data in self.datas)
+            key = (self.__class__, tuple(self.p._getkwargs().items()), dkeys)
+            hash(key)
+        except (KeyError, TypeError):  # unkeyed input or unhashable param
+            return None
+
+        return key
+
+    @classmethod
+    def _oncelines(cls, obj):
+        # lines of obj and of the objects it contains (in a fixed order)
+        for line in obj.lines:
+            yield line
+
+        for child in getattr(obj, '_lineiterators', {}).get(
+                LineIterator.IndType, []):
+            for line in cls._oncelines(child):
+                yield line
+
     def advance(self, size=1):
         # Need intercepting this call to support datas with
         # different lengths (timeframes)
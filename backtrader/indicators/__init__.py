@@ -88,3 +88,6 @@ from .ichimoku import *
 from .hurst import *
 from .ols import *
 from .hadelta import *
+
+# cross-sectional indicators of panel feeds
+from .panel import *
@@ -25,11 +25,134 @@ import functools
 import math
 import operator
 
+from .. import mathsupport
+from ..mathsupport import np
 from ..utils.py3 import map, range
 
 from . import Indicator
 
 
+# numpy kernels for the "once" methods. They return False (and the caller
+# falls back to the pure python loop) if numpy is not available or disabled
+# (see mathsupport.usenumpy), the buffers cannot be viewed as float64 arrays
+# or the input holds non-finite values (whose propagation would differ from
+# the python version)
+
+
+def _npviews(dst, src, first, end):
+    '''Returns numpy views of ``dst`` and of ``src[first:end]`` or
+    ``(None, None)`` if not possible'''
+    if not mathsupport.npuse or first < 0 or end <= first:
+        return None, None
+
+    try:
+        dstnp = np.frombuffer(dst, dtype=np.float64)
+        srcnp = np.frombuffer(src, dtype=np.float64)[first:end]
+    except (TypeError, ValueError):  # no buffer (ex: deque) or wrong type
+        return None, None
+
+    if not np.isfinite(srcnp).all():
+        return None, None
+
+    return dstnp, srcnp
+
+
+def _npwindows(x, period):
+    # rolling windows of period values as a 2D view (no copy)
+    return np.lib.stride_tricks.as_strided(
+        x, shape=(len(x) - period + 1, period),
+        strides=(x.strides[0], x.strides[0]), writeable=False)
+
+
+def _npsums(dst, src, start, end, period, divisor=1):
+    '''dst[i] = sum(src[i - period + 1:i + 1]) / divisor for start <= i < end
+
+    The values of each window are added in double-double precision (the
+    rounding error of each addition is kept apart and added at the end),
+    for all windows at once. The sums are therefore the correctly rounded
+    ones delivered by ``math.fsum`` (unless the values of a window need more
+    than ~106 bits to be added exactly) and do not depend on the length of
+    the series
+    '''
+    dstnp, x = _npviews(dst, src, start - period + 1, end)
+    if x is None:
+        return False
+
+    nsums = len(x) - period + 1
+    sums = x[:nsums].copy()
+    errs = np.zeros(nsums)
+    for k in range(1, period):
+        xk = x[k:k + nsums]
+        t = sums + xk
+        # error of the addition (TwoSum): exact
+        tk = t - sums
+        errs += (sums - (t - tk)) + (xk - tk)
+        sums = t
+
+    sums += errs
+    if divisor != 1:
+        sums /= divisor
+
+    dstnp[start:end] = sums
+    return True
+
+
+def _npreduce(dst, src, start, end, period, func):
+    '''dst[i] = func(src[i - period + 1:i + 1], axis=1) for start <= i < end
+    '''
+    dstnp, x = _npviews(dst, src, start - period + 1, end)
+    if x is None:
+        return False
+
+    dstnp[start:end] = func(_npwindows(x, period), axis=1)
+    return True
+
+
+def _npaccum(dst, src, start, end, prev):
+    '''dst[i] = prev = prev + src[i] for start <= i < end'''
+    dstnp, x = _npviews(dst, src, start, end)
+    if x is None:
+        return False
+
+    # sequential additions as in the python version: same results
+    csum = np.empty(len(x) + 1)
+    csum[0] = prev
+    csum[1:] = x
+    dstnp[start:end] = np.cumsum(csum)[1:]
+    return True
+
+
+_NPBLOCK = 64  # block size for the vectorized recursive smoothing
+
+
+def _npsmooth(dst, src, start, end, prev, alpha, alpha1):
+    '''dst[i] = prev = prev * alpha1 + src[i] * alpha for start <= i < end
+
+    The recursion is solved in blocks: inside a block each value is the
+    (decayed) previous value plus a weighted sum of the inputs, calculated
+    with a lower triangular matrix of decay factors
+    '''
+    dstnp, x = _npviews(dst, src, start, end)
+    if x is None or not math.isfinite(prev):
+        return False
+
+    nblock = min(_NPBLOCK, len(x))
+    k = np.arange(nblock)
+    decay = alpha1 ** k  # alpha1^0 ... alpha1^(n-1)
+    lag = k[:, None] - k[None, :]
+    weights = np.where(lag >= 0, alpha * alpha1 ** np.maximum(lag, 0), 0.0)
+    pdecay = decay * alpha1  # decay of the value before the block
+
+    out = dstnp[start:end]
+    for i in range(0, len(x), nblock):
+        xb = x[i:i + nblock]
+        n = len(xb)
+        out[i:i + n] = weights[:n, :n].dot(xb) + pdecay[:n] * prev
+        prev = out[i + n - 1]
+
+    return True
+
+
 class PeriodN(Indicator):
     '''
     Base class for indicators which take a period (__init__ has to be called
@@ -113,6 +236,11 @@ class Highest(OperationN):
     lines = ('highest',)
     func = max
 
+    def once(self, start, end):
+        if not _npreduce(self.line.array, self.data.array, start, end,
+                         self.p.period, np and np.max):
+            super(Highest, self).once(start, end)
+
 
 class Lowest(OperationN):
     '''
@@ -127,6 +255,11 @@ class Lowest(OperationN):
     lines = ('lowest',)
     func = min
 
+    def once(self, start, end):
+        if not _npreduce(self.line.array, self.data.array, start, end,
+                         self.p.period, np and np.min):
+            super(Lowest, self).once(start, end)
+
 
 class ReduceN(OperationN):
     '''
@@ -171,6 +304,11 @@ class SumN(OperationN):
     lines = ('sumn',)
     func = math.fsum
 
+    def once(self, start, end):
+        if not _npsums(self.line.array, self.data.array, start, end,
+                       self.p.period):
+            super(SumN, self).once(start, end)
+
 
 class AnyN(OperationN):
     '''
@@ -200,6 +338,10 @@ class AllN(OperationN):
     func = all
 
 
+# numpy counterparts (first occurrence) of the _evalfunc of the FindXXXIndex
+_npargfuncs = dict() if np is None else {max: np.argmax, min: np.argmin}
+
+
 class FindFirstIndex(OperationN):
     '''
     Returns the index of the last data that satisfies equality with the
@@ -219,6 +361,13 @@ class FindFirstIndex(OperationN):
         m = self.p._evalfunc(iterable)
         return next(i for i, v in enumerate(reversed(iterable)) if v == m)
 
+    def once(self, start, end):
+        argfunc = _npargfuncs.get(self.p._evalfunc)
+        if argfunc is None or not _npreduce(
+                self.line.array, self.data.array, start, end, self.p.period,
+                lambda w, axis: argfunc(w[:, ::-1], axis=axis)):
+            super(FindFirstIndex, self).once(start, end)
+
 
 class FindFirstIndexHighest(FindFirstIndex):
     '''
@@ -271,6 +420,14 @@ class FindLastIndex(OperationN):
         # period - index = 1 ... and must be zero!
         return self.p.period - index - 1
 
+    def once(self, start, end):
+        argfunc = _npargfuncs.get(self.p._evalfunc)
+        period = self.p.period
+        if argfunc is None or not _npreduce(
+                self.line.array, self.data.array, start, end, period,
+                lambda w, axis: period - 1 - argfunc(w, axis=axis)):
+            super(FindLastIndex, self).once(start, end)
+
 
 class FindLastIndexHighest(FindLastIndex):
     '''
@@ -325,6 +482,8 @@ class Accum(Indicator):
         dst = self.line.array
         src = self.data.array
         prev = self.p.seed
+        if _npaccum(dst, src, start, end, prev):
+            return
 
         for i in range(start, end):
             dst[i] = prev = prev + src[i]
@@ -333,6 +492,8 @@ class Accum(Indicator):
         dst = self.line.array
         src = self.data.array
         prev = dst[start - 1]
+        if _npaccum(dst, src, start, end, prev):
+            return
 
         for i in range(start, end):
             dst[i] = prev = prev + src[i]
@@ -359,6 +520,8 @@ class Average(PeriodN):
         src = self.data.array
         dst = self.line.array
         period = self.p.period
+        if _npsums(dst, src, start, end, period, divisor=period):
+            return
 
         for i in range(start, end):
             dst[i] = math.fsum(src[i - period + 1:i + 1]) / period
@@ -408,6 +571,9 @@ class ExponentialSmoothing(Average):
 
         # Seed value from SMA calculated with the call to oncestart
         prev = larray[start - 1]
+        if _npsmooth(larray, darray, start, end, prev, alpha, alpha1):
+            return
+
         for i in range(start, end):
             larray[i] = prev = prev * alpha1 + darray[i] * alpha
 
@@ -488,6 +654,10 @@ class WeightedAverage(PeriodN):
         period = self.p.period
         coef = self.p.coef
         weights = self.p.weights
+        if len(weights) == period and _npreduce(
+                larray, darray, start, end, period,
+                lambda w, axis: coef * w.dot(np.asarray(weights, float))):
+            return
 
         for i in range(start, end):
             data = darray[i - period + 1: i + 1]
@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import math
+
+from backtrader.utils.py3 import range, with_metaclass
+from backtrader import mathsupport
+from backtrader.mathsupport import np
+from backtrader.metabase import MetaParams
+from backtrader.feeds.panel import PanelField
+
+
+__all__ = ['PanelIndicator', 'PanelSMA', 'PanelRank', 'PanelZScore']
+
+
+class PanelIndicator(with_metaclass(MetaParams, PanelField)):
+    '''Base class for indicators calculated on a ``PanelField`` (a field of
+    a ``PanelData`` feed or another panel indicator) for all symbols at
+    once. The result is itself a ``PanelField``::
+
+        rank = bt.ind.PanelRank(bt.ind.PanelSMA(self.panel.close, period=20))
+        ranks = rank[0]  # current rank of all symbols
+
+    The values of all bars are calculated when the indicator is created, as
+    the panel is fully loaded when the strategy is created. Only past and
+    current values are used for each bar
+
+    Subclasses implement ``calc(src, dst)`` with ``src`` and ``dst`` being
+    the ``array.array`` values (``symbols x bars``) of the input and the
+    output and can implement ``calc_np(src, dst)`` with numpy matrices
+    '''
+
+    def __init__(self, field):
+        super(PanelIndicator, self).__init__(field._panel)
+        self.field = field
+
+        if mathsupport.npuse and np is not None:
+            with np.errstate(all='ignore'):
+                self.calc_np(field.matrix(), self.matrix())
+        else:
+            self.calc(field.array, self.array)
+
+    def calc_np(self, src, dst):
+        self.calc(self.field.array, self.array)  # no numpy version
+
+
+class PanelSMA(PanelIndicator):
+    '''Simple moving average of each symbol over the last ``period`` bars.
+    The average of a symbol is ``NaN`` if any value in the period is
+    ``NaN``
+    '''
+    params = (('period', 30),)
+
+    def calc(self, src, dst):
+        nbars, period = self._panel.nbars, self.p.period
+        for base in range(0, len(src), nbars):
+            csums, cnans = [], []
+            csum, cnan = 0.0, 0
+            for i in range(nbars):
+                val = src[base + i]
+                if val != val:
+                    cnan += 1
+                else:
+                    csum += val
+
+                csums.append(csum)
+                cnans.append(cnan)
+
+                if i == period - 1:
+                    wsum, wnan = csum, cnan
+                elif i >= period:
+                    wsum = csum - csums[i - period]
+                    wnan = cnan - cnans[i - period]
+                else:
+                    continue
+
+                if not wnan:
+                    dst[base + i] = wsum / period
+
+    def calc_np(self, src, dst):
+        period = self.p.period
+        if period > src.shape[1]:
+            return
+
+        nans = np.isnan(src)
+        csums = np.cumsum(np.where(nans, 0.0, src), axis=1)
+        cnans = np.cumsum(nans, axis=1)
+
+        wsums = csums[:, period - 1:].copy()
+        wsums[:, 1:] -= csums[:, :-period]
+        wnans = cnans[:, period - 1:].copy()
+        wnans[:, 1:] -= cnans[:, :-period]
+
+        dst[:, period - 1:] = np.where(wnans == 0, wsums / period, np.nan)
+
+
+class PanelRank(PanelIndicator):
+    '''Rank of each symbol at each bar amongst the symbols with a value
+    (``1`` is the lowest value). Equal values are ranked in the order of the
+    symbols. Symbols without a value (``NaN``) have a ``NaN`` rank
+    '''
+
+    def calc(self, src, dst):
+        nbars = self._panel.nbars
+        for i in range(nbars):
+            vals = src[i::nbars]
+            valid = [j for j, val in enumerate(vals) if val == val]
+            valid.sort(key=vals.__getitem__)
+            for rank, j in enumerate(valid, 1):
+                dst[j * nbars + i] = rank
+
+    def calc_np(self, src, dst):
+        order = np.argsort(src, axis=0, kind='stable')  # nan at the end
+        ranks = np.arange(1.0, src.shape[0] + 1.0)[:, None]
+        np.put_along_axis(dst, order, ranks, axis=0)
+        dst[np.isnan(src)] = np.nan
+
+
+class PanelZScore(PanelIndicator):
+    '''Cross-sectional z-score of each symbol at each bar: distance to the
+    mean of the symbols with a value in population standard deviations. The
+    value is ``NaN`` if less than 2 symbols have a value or if all the values
+    are equal
+    '''
+
+    def calc(self, src, dst):
+        nbars = self._panel.nbars
+        for i in range(nbars):
+            vals = src[i::nbars]
+            valid = [val for val in vals if val == val]
+            count = len(valid)
+            if count < 2:
+                continue
+
+            mean = sum(valid) / count
+            std = math.sqrt(sum((val - mean) * (val - mean)
+                                for val in valid) / count)
+            if not std:
+                continue
+
+            for j, val in enumerate(vals):
+                dst[j * nbars + i] = (val - mean) / std
+
+    def calc_np(self, src, dst):
+        valid = ~np.isnan(src)
+        count = valid.sum(axis=0)
+        mean = np.where(valid, src, 0.0).sum(axis=0) / count
+        devs = np.where(valid, src - mean, 0.0)
+        std = np.sqrt((devs * devs).sum(axis=0) / count)
+
+        dst[:, :] = (src - mean) / std
+        dst[:, (count < 2) | (std == 0.0)] = np.nan
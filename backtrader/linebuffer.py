@@ -32,16 +32,38 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
 import array
-import collections
 import datetime
-from itertools import islice
+import io
+from itertools import repeat
 import math
-
-from .utils.py3 import range, with_metaclass, string_types
+import mmap
+import operator
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # Python < 3.8
+    shared_memory = None
+else:
+    class _SharedBlock(shared_memory.SharedMemory):
+        '''Shared memory block which can be closed (also when garbage
+        collected) while buffers still view the values'''
+        def close(self):
+            try:
+                super(_SharedBlock, self).close()
+            except BufferError:
+                pass  # unmapped when the last view goes away
+
+# Shared memory blocks created or attached by this process (keyed by name).
+# A block is attached only once, regardless of how many buffers view it
+_shmblocks = dict()
+
+from .utils.py3 import range, with_metaclass, string_types, integer_types
 
 from .lineroot import LineRoot, LineSingle, LineMultiple
+from . import mathsupport
+from .mathsupport import np
 from . import metabase
-from .utils import num2date, time2num
+from .utils import num2date, npnum2dates, time2num
 
 
 NAN = float('NaN')
@@ -68,10 +90,28 @@ class LineBuffer(LineSingle):
     The class can also hold "bindings" to other LineBuffers. When a value
     is set in this class
     it will also be set in the binding.
+
+    In ``QBuffer`` mode (see ``qbuffer``) only the last values are kept: the
+    buffer is a contiguous array, in which the oldest values are dropped in
+    blocks once twice the needed size (and at least ``QBLOCK`` values) has
+    been reached. Indexing and slicing cost the same as in ``UnBounded``
+    mode and the values dropped are counted in ``buflen``
+
+    The values can also be held in a read-only memory mapped region of a
+    file (see ``mapfile``), which is shared by all processes mapping the same
+    file and only paged in when accessed, or in a shared memory block (see
+    ``share`` and ``mapshared``)
     '''
 
     UnBounded, QBuffer = (0, 1)
 
+    QBLOCK = 64  # minimum number of values dropped at once in QBuffer mode
+
+    _mapsrc = None  # (method, args) to map the values again if mapped
+    _shmowner = False  # the shared memory block was created by this buffer
+    _base = 0  # values dropped from the start of the buffer with trim
+    _homeidx = -1  # index set by home
+
     def __init__(self):
         self.lines = [self]
         self.mode = self.UnBounded
@@ -83,48 +123,138 @@ class LineBuffer(LineSingle):
         return self._idx
 
     def set_idx(self, idx, force=False):
-        # if QBuffer and the last position of the buffer was reached, keep
-        # it (unless force) as index 0. This allows resampling
-        #  - forward adds a position, but the 1st one is discarded, the 0 is
-        #  invariant
-        # force supports replaying, which needs the extra bar to float
-        # forward/backwards, because the last input is read, and after a
-        # "backwards" is used to update the previous data. Unless the position
-        # 0 was moved to the previous index, it would fail
-        if self.mode == self.QBuffer:
-            if force or self._idx < self.lenmark:
-                self._idx = idx
-        else:  # default: UnBounded
-            self._idx = idx
+        # force is kept for compatibility. The values of a QBuffer are only
+        # dropped when forwarding, keeping the index as in UnBounded mode
+        self._idx = idx
 
     idx = property(get_idx, set_idx)
 
     def reset(self):
         ''' Resets the internal buffer structure and the indices
         '''
-        if self.mode == self.QBuffer:
-            # add extrasize to ensure resample/replay work because they will
-            # use backwards to erase the last bar/tick before delivering a new
-            # bar The previous forward would have discarded the bar "period"
-            # times ago and it will not come back. Having + 1 in the size
-            # allows the forward without removing that bar
-            self.array = collections.deque(maxlen=self.maxlen + self.extrasize)
-            self.useislice = True
-        else:
-            self.array = array.array(str('d'))
-            self.useislice = False
-
+        self.unmap(copy=False)
+        self.array = array.array(str('d'))
         self.lencount = 0
         self.idx = -1
         self.extension = 0
+        self._base = 0
+        self._homeidx = -1
+
+    def mapfile(self, path, offset=0, count=None):
+        '''Replaces the values of the buffer with ``count`` float64 values
+        (native byte order) found at ``offset`` in the file at ``path``,
+        which is memory mapped in read-only mode.
+
+        The values are not copied into private memory and pickling the
+        buffer (for example to send it to a worker process during
+        optimization) transfers only the mapping parameters.
+
+        Values cannot be set in a mapped buffer. Enlarging/reducing it (with
+        ``forward``/``backwards``/``extend``) moves the values to a regular
+        private buffer
+        '''
+        with io.open(path, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if count is None:
+            count = (len(mm) - offset) // 8
+
+        self.unmap(copy=False)
+        view = memoryview(mm)[offset:offset + count * 8].cast(str('d'))
+        self._setmap(view, 'mapfile', (path, offset, count))
+
+    def share(self):
+        '''Moves the values to a new shared memory block (which is released
+        with ``unmap`` or ``reset``), so that pickling the buffer transfers
+        only the name of the block, to which the unpickled buffer attaches
+        (see ``mapshared``)
+
+        Returns ``False`` if shared memory is not available or there is
+        nothing to share
+        '''
+        if shared_memory is None or not len(self.array):
+            return False
+
+        values = array.array(str('d'), self.array)
+        size = len(values) * 8
+        shm = _SharedBlock(create=True, size=size)
+        shm.buf[:size] = memoryview(values).cast(str('B'))
+        _shmblocks[shm.name] = shm
+
+        self.unmap(copy=False)
+        self._shmowner = True
+        view = shm.buf[:size].cast(str('d'))
+        self._setmap(view, 'mapshared', (shm.name, len(values)))
+        return True
+
+    def mapshared(self, name, count):
+        '''Replaces the values of the buffer with the ``count`` float64
+        values held in the existing shared memory block ``name``
+
+        The same rules as for ``mapfile`` apply
+        '''
+        shm = _shmblocks.get(name)
+        if shm is None:
+            shm = _shmblocks[name] = _SharedBlock(name=name)
+
+        self.unmap(copy=False)
+        view = shm.buf[:count * 8].cast(str('d'))
+        self._setmap(view, 'mapshared', (name, count))
+
+    def _setmap(self, view, method, args):
+        self.array = view
+        self._mapsrc = (method, args)
+
+    def unmap(self, copy=True):
+        '''Moves the values of a mapped buffer to private memory (or simply
+        drops them if ``copy`` is ``False``), releasing the mapping'''
+        if self._mapsrc is None:
+            return
+
+        if copy:
+            self.array = array.array(str('d'), self.array)
+        else:
+            self.array = array.array(str('d'))
+
+        method, args = self._mapsrc
+        self._mapsrc = None
+        if self._shmowner:  # the block is no longer needed by anyone
+            self._shmowner = False
+            shm = _shmblocks.pop(args[0])
+            shm.unlink()
+            shm.close()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if self._mapsrc is not None:
+            # the values will be mapped again from the source
+            for attr in ('array', '_shmowner'):
+                state.pop(attr, None)
+
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self._mapsrc is not None:
+            method, args = self._mapsrc
+            self._mapsrc = None
+            getattr(self, method)(*args)
 
     def qbuffer(self, savemem=0, extrasize=0):
         self.mode = self.QBuffer
         self.maxlen = self._minperiod
+        # add extrasize to ensure resample/replay work because they will use
+        # backwards to erase the last bar/tick before delivering a new bar
         self.extrasize = extrasize
-        self.lenmark = self.maxlen - (not self.extrasize)
+        self._setqlimit()
         self.reset()
 
+    def _setqlimit(self):
+        # size at which the oldest values are dropped, keeping maxlen +
+        # extrasize of them
+        self.qsize = self.maxlen + self.extrasize
+        self.qlimit = self.qsize + max(self.qsize, self.QBLOCK)
+
     def getindicators(self):
         return []
 
@@ -143,7 +273,7 @@ class LineBuffer(LineSingle):
             return
 
         self.maxlen = size
-        self.lenmark = self.maxlen - (not self.extrasize)
+        self._setqlimit()
         self.reset()
 
     def __len__(self):
@@ -156,8 +286,35 @@ class LineBuffer(LineSingle):
         allow for "lookahead" operations. The real amount of data that is
         held/can be held in the buffer
         is returned
+
+        The values dropped with ``trim`` are counted
+        '''
+        return len(self.array) - self.extension + self._base
+
+    def trim(self, size):
+        '''Drops the values of the buffer but the last ``size`` ones, to
+        bound the memory used when running in chunks (see the parameter
+        ``chunkbars`` of ``Cerebro``)
+
+        The length and the logical index are kept: the values dropped can no
+        longer be reached (``ago`` values up to ``size - 1`` can) and
+        ``home`` rewinds to the last value kept, after which the values of
+        the next chunk are added
         '''
-        return len(self.array) - self.extension
+        self._drop(len(self.array) - self.extension - size)
+        self._homeidx = len(self.array) - self.extension - 1
+
+    def _drop(self, size):
+        # drops the oldest size values (if any)
+        if size <= 0:
+            return
+
+        if self._mapsrc is not None:
+            self.unmap()
+
+        del self.array[:size]
+        self._idx -= size
+        self._base += size
 
     def __getitem__(self, ago):
         return self.array[self.idx + ago]
@@ -176,11 +333,6 @@ class LineBuffer(LineSingle):
         Returns:
             A slice of the underlying buffer
         '''
-        if self.useislice:
-            start = self.idx + ago - size + 1
-            end = self.idx + ago + 1
-            return list(islice(self.array, start, end))
-
         return self.array[self.idx + ago - size + 1:self.idx + ago + 1]
 
     def getzeroval(self, idx=0):
@@ -206,9 +358,6 @@ class LineBuffer(LineSingle):
         Returns:
             A slice of the underlying buffer
         '''
-        if self.useislice:
-            return list(islice(self.array, idx, idx + size))
-
         return self.array[idx:idx + size]
 
     def __setitem__(self, ago, value):
@@ -240,9 +389,11 @@ class LineBuffer(LineSingle):
 
         The underlying buffer remains untouched and the actual len can be found
         out with buflen
+
+        After a ``trim`` the index is rewound to the last value kept
         '''
-        self.idx = -1
-        self.lencount = 0
+        self.idx = self._homeidx
+        self.lencount = self._base + self._homeidx + 1
 
     def forward(self, value=NAN, size=1):
         ''' Moves the logical index foward and enlarges the buffer as much as needed
@@ -251,11 +402,21 @@ class LineBuffer(LineSingle):
             value (variable): value to be set in new positins
             size (int): How many extra positions to enlarge the buffer
         '''
+        if self._mapsrc is not None:
+            self.unmap()
+
         self.idx += size
         self.lencount += size
 
-        for i in range(size):
+        if size == 1:
             self.array.append(value)
+        else:  # runonce enlarges the buffers to the full size at once
+            self.array.extend(repeat(value, size))
+
+        if self.mode == self.QBuffer:
+            size = len(self.array) - self.extension
+            if size >= self.qlimit:
+                self._drop(size - self.qsize)
 
     def backwards(self, size=1, force=False):
         ''' Moves the logical index backwards and reduces the buffer as much as needed
@@ -264,6 +425,9 @@ class LineBuffer(LineSingle):
             size (int): How many extra positions to rewind and reduce the
             buffer
         '''
+        if self._mapsrc is not None:
+            self.unmap()
+
         # Go directly to property setter to support force
         self.set_idx(self._idx - size, force=force)
         self.lencount -= size
@@ -293,9 +457,11 @@ class LineBuffer(LineSingle):
         The purpose is to allow for lookahead operations or to be able to
         set values in the buffer "future"
         '''
+        if self._mapsrc is not None and size:
+            self.unmap()
+
         self.extension += size
-        for i in range(size):
-            self.array.append(value)
+        self.array.extend(repeat(value, size))
 
     def addbinding(self, binding):
         ''' Adds another line binding
@@ -326,19 +492,17 @@ class LineBuffer(LineSingle):
         return self.getzero(idx, size or len(self))
 
     def plotrange(self, start, end):
-        if self.useislice:
-            return list(islice(self.array, start, end))
-
         return self.array[start:end]
 
-    def oncebinding(self):
+    def oncebinding(self, start=0):
         '''
-        Executes the bindings when running in "once" mode
+        Executes the bindings when running in "once" mode, from position
+        ``start`` onwards
         '''
         larray = self.array
-        blen = self.buflen()
+        blen = self.buflen() - self._base
         for binding in self.bindings:
-            binding.array[0:blen] = larray[0:blen]
+            binding.array[start:blen] = larray[start:blen]
 
     def bind2lines(self, binding=0):
         '''
@@ -591,9 +755,74 @@ class LineActions(with_metaclass(MetaLineActions, LineBuffer)):
 
     _ltype = LineBuffer.IndType
 
+    # Fused operations (see LineIterator._oncefuse): the root of a fused
+    # expression holds the operations calculated in its "once" (which have
+    # no buffer of their own) and these point to the root
+    _fused = None
+    _fusedin = None
+
     def getindicators(self):
         return []
 
+    def _npfusable(self):
+        # can be calculated as part of a fused numpy expression
+        return False
+
+    def _operands(self):
+        return ()
+
+    def _oncefused(self, start, end):
+        '''Calculates [start, end) with the operations fused into this one
+        in a single numpy expression, without buffers for them. If not
+        possible, the fused operations get their buffers back, are
+        calculated and ``False`` is returned'''
+        if mathsupport.npuse:
+            dst = self._npview(self.array, end)
+            if dst is not None:
+                out = dst[start:end]
+                if _npfusedeval(self, start, end, self._fused, out=out) \
+                   is not None:
+                    return True
+
+        fused, self._fused = self._fused, None
+        for op in fused.values():  # operands before the operations
+            op._fusedin = None
+            op._once()
+
+        return False
+
+    # Support for the vectorized (numpy) once implementations
+
+    @staticmethod
+    def _npview(buf, end):
+        # float64 numpy view of buf (with at least end values) or None
+        try:
+            view = np.frombuffer(buf, dtype=np.float64)
+        except (TypeError, ValueError):  # no buffer (ex: deque), not float64
+            return None
+
+        return view if len(view) >= end else None
+
+    @classmethod
+    def _npoperand(cls, operand, start, end):
+        # view of the [start, end) values of a line or the value of a number
+        if isinstance(operand, LineBuffer):
+            view = cls._npview(operand.array, end)
+            return None if view is None else view[start:end]
+
+        if isinstance(operand, PseudoArray):
+            operand = operand.wrapped
+
+        if isinstance(operand, float):
+            return operand
+
+        # ints beyond the exact range of a float would overflow in numpy
+        if isinstance(operand, integer_types) and \
+           not isinstance(operand, bool) and abs(operand) <= 2 ** 53:
+            return float(operand)
+
+        return None
+
     def qbuffer(self, savemem=0):
         super(LineActions, self).qbuffer(savemem=savemem)
         for data in self._datas:
@@ -623,14 +852,15 @@ class LineActions(with_metaclass(MetaLineActions, LineBuffer)):
             self.prenext()
 
     def _once(self):
-        self.forward(size=self._clock.buflen())
+        # only the values added to the clock since the last call (if the
+        # buffers were trimmed) are calculated
+        self.forward(size=self._clock.buflen() - self.buflen())
         self.home()
 
-        self.preonce(0, self._minperiod - 1)
-        self.oncestart(self._minperiod - 1, self._minperiod)
-        self.once(self._minperiod, self.buflen())
+        start, base = self.idx + 1, self._base
+        self._oncerange(start, self.buflen() - base, base)
 
-        self.oncebinding()
+        self.oncebinding(start)
 
 
 def LineDelay(a, ago=0, **kwargs):
@@ -702,6 +932,64 @@ class _LineForward(LineActions):
             dst[i - ago] = src[i]
 
 
+# numpy counterparts of the operations of LinesOperation/LineOwnOperation
+if np is not None:
+    _NPOPS = {
+        operator.add: np.add,
+        operator.sub: np.subtract,
+        operator.mul: np.multiply,
+        operator.truediv: np.true_divide,
+        operator.floordiv: np.floor_divide,
+        operator.lt: np.less,
+        operator.gt: np.greater,
+        operator.le: np.less_equal,
+        operator.ge: np.greater_equal,
+        operator.eq: np.equal,
+        operator.ne: np.not_equal,
+        operator.abs: np.absolute,
+        operator.neg: np.negative,
+        abs: np.absolute,
+    }
+    _NPDIVOPS = (np.true_divide, np.floor_divide)
+else:
+    _NPOPS = dict()
+    _NPDIVOPS = tuple()
+
+
+def _npfusedeval(op, start, end, fused, out=None):
+    '''Returns the values of [start, end) of operation ``op`` (in ``out`` if
+    given), evaluating the operands in ``fused`` (ids to operations) instead
+    of reading their buffers, or ``None`` if not possible'''
+    npop = _NPOPS.get(op.operation)
+    if npop is None or not op._npfusable():
+        return None
+
+    if out is None:
+        out = np.empty(end - start)
+
+    # the 1st fused operand is calculated in out (ufuncs can work in place)
+    values, spare = list(), out
+    for operand in op._operands():
+        if id(operand) in fused:
+            value = _npfusedeval(operand, start, end, fused, out=spare)
+            spare = None
+        else:
+            value = LineActions._npoperand(operand, start, end)
+
+        if value is None:
+            return None
+
+        values.append(value)
+
+    if npop in _NPDIVOPS and np.any(values[1] == 0):
+        return None  # python would raise ZeroDivisionError
+
+    with np.errstate(all='ignore'):
+        npop(*values, out=out)
+
+    return out
+
+
 class LinesOperation(LineActions):
 
     '''
@@ -750,7 +1038,19 @@ class LinesOperation(LineActions):
         else:
             self[0] = self.operation(self.a, self.b[0])
 
+    def _npfusable(self):
+        return self.operation in _NPOPS and not self.btime
+
+    def _operands(self):
+        return (self.a, self.b)
+
     def once(self, start, end):
+        if self._fused is not None and self._oncefused(start, end):
+            return
+
+        if self._once_np(start, end):
+            return
+
         if self.bline:
             self._once_op(start, end)
         elif not self.r:
@@ -761,6 +1061,28 @@ class LinesOperation(LineActions):
         else:
             self._once_val_op_r(start, end)
 
+    def _once_np(self, start, end):
+        '''Vectorized once: applies the numpy counterpart of the operation to
+        the whole [start, end) range, writing the results directly into the
+        buffer. Returns ``False`` if not possible'''
+        npop = _NPOPS.get(self.operation) if mathsupport.npuse else None
+        if npop is None or self.btime:
+            return False
+
+        dst = self._npview(self.array, end)
+        a = self._npoperand(self.a, start, end)
+        b = self._npoperand(self.b, start, end)
+        if dst is None or a is None or b is None:
+            return False
+
+        if npop in _NPDIVOPS and np.any(b == 0):
+            return False  # let python raise ZeroDivisionError
+
+        with np.errstate(all='ignore'):
+            npop(a, b, out=dst[start:end])
+
+        return True
+
     def _once_op(self, start, end):
         # cache python dictionary lookups
         dst = self.array
@@ -779,6 +1101,14 @@ class LinesOperation(LineActions):
         op = self.operation
         tz = self._tz
 
+        if mathsupport.npuse and start < end:
+            # the datetimes are converted in a single batch
+            dts = npnum2dates(srca[start:end], tz=tz).tolist()
+            for i, dt in enumerate(dts, start):
+                dst[i] = op(dt.time(), srcb)
+
+            return
+
         for i in range(start, end):
             dst[i] = op(num2date(srca[i], tz=tz).time(), srcb)
 
@@ -819,7 +1149,24 @@ class LineOwnOperation(LineActions):
     def next(self):
         self[0] = self.operation(self.a[0])
 
+    def _npfusable(self):
+        return self.operation in _NPOPS
+
+    def _operands(self):
+        return (self.a,)
+
     def once(self, start, end):
+        if self._fused is not None and self._oncefused(start, end):
+            return
+
+        npop = _NPOPS.get(self.operation) if mathsupport.npuse else None
+        if npop is not None:
+            dst = self._npview(self.array, end)
+            a = self._npoperand(self.a, start, end)
+            if dst is not None and a is not None:
+                npop(a, out=dst[start:end])
+                return
+
         # cache python dictionary lookups
         dst = self.array
         srca = self.a.array
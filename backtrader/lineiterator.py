@@ -22,20 +22,46 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
 import collections
+import gc
 import operator
 import sys
+import types
 
 from .utils.py3 import map, range, zip, with_metaclass, string_types
-from .utils import DotDict
+from .utils import DotDict, OrderedDict
 
 from .lineroot import LineRoot, LineSingle
 from .linebuffer import LineActions, LineNum
 from .lineseries import LineSeries, LineSeriesMaker
 from .dataseries import DataSeries
+from . import mathsupport
 from . import metabase
 
 
 class MetaLineIterator(LineSeries.__class__):
+    _datanames = dict()
+
+    @classmethod
+    def _getdatanames(meta, data, d, nlines):
+        '''Returns the (name, index) pairs of the aliases to the lines of the
+        data at position ``d``, cached by the class of the data'''
+        key = (data.__class__, d, nlines)
+        try:
+            return meta._datanames[key]
+        except KeyError:
+            pass
+
+        names = list()
+        for prefix in (['data_'] if not d else []) + ['data%d_' % d]:
+            for l in range(nlines):
+                linealias = data._getlinealias(l)
+                if linealias:
+                    names.append((prefix + linealias, l))
+                names.append(('%s%d' % (prefix, l), l))
+
+        meta._datanames[key] = names = tuple(names)
+        return names
+
     def donew(cls, *args, **kwargs):
         _obj, args, kwargs = \
             super(MetaLineIterator, cls).donew(*args, **kwargs)
@@ -80,22 +106,15 @@ class MetaLineIterator(LineSeries.__class__):
         # For each found data add access member -
         # for the first data 2 (data and data0)
         if _obj.datas:
-            _obj.data = data = _obj.datas[0]
-
-            for l, line in enumerate(data.lines):
-                linealias = data._getlinealias(l)
-                if linealias:
-                    setattr(_obj, 'data_%s' % linealias, line)
-                setattr(_obj, 'data_%d' % l, line)
+            _obj.data = _obj.datas[0]
 
+            objdict = _obj.__dict__
             for d, data in enumerate(_obj.datas):
-                setattr(_obj, 'data%d' % d, data)
+                objdict['data%d' % d] = data
 
-                for l, line in enumerate(data.lines):
-                    linealias = data._getlinealias(l)
-                    if linealias:
-                        setattr(_obj, 'data%d_%s' % (d, linealias), line)
-                    setattr(_obj, 'data%d_%d' % (d, l), line)
+                lines = data.lines.lines
+                for name, l in cls._getdatanames(data, d, len(lines)):
+                    objdict[name] = lines[l]
 
         # Parameter values have now been set before __init__
         _obj.dnames = DotDict([(d._name, d)
@@ -291,11 +310,19 @@ class LineIterator(with_metaclass(MetaLineIterator, LineSeries)):
         return clock_len
 
     def _once(self):
-        self.forward(size=self._clock.buflen())
+        self._onceforward()
 
         for indicator in self._lineiterators[LineIterator.IndType]:
             indicator._once()
 
+        self._oncecalc()
+
+    def _onceforward(self):
+        # only the values added to the clock since the last call
+        self.forward(size=self._clock.buflen() - self.buflen())
+
+    def _oncecalc(self):
+        # the sub-indicators have already been calculated
         for observer in self._lineiterators[LineIterator.ObsType]:
             observer.forward(size=self.buflen())
 
@@ -313,12 +340,118 @@ class LineIterator(with_metaclass(MetaLineIterator, LineSeries)):
         # These 3 remain empty for a strategy and therefore play no role
         # because a strategy will always be executed on a next basis
         # indicators are each called with its min period
-        self.preonce(0, self._minperiod - 1)
-        self.oncestart(self._minperiod - 1, self._minperiod)
-        self.once(self._minperiod, self.buflen())
+        line = self.lines[0]
+        start, base = line.idx + 1, line._base
+        self._oncerange(start, self.buflen() - base, base)
 
         for line in self.lines:
-            line.oncebinding()
+            line.oncebinding(start)
+
+    def _onceflat(self):
+        # _once can be replaced by the _onceforward/_oncecalc pair unless a
+        # subclass has its own _once
+        return type(self)._once == LineIterator._once
+
+    def _oncecompile(self, steps=None):
+        '''Returns a flat list of the calls which the recursive ``_once``
+        makes to calculate the sub-indicators, children before parents'''
+        if steps is None:
+            steps = list()
+
+        for indicator in self._lineiterators[LineIterator.IndType]:
+            if getattr(indicator, '_fusedin', None) is not None:
+                continue  # calculated by the operation it is fused into
+
+            if isinstance(indicator, LineIterator) and indicator._onceflat():
+                steps.append(indicator._onceforward)
+                indicator._oncecompile(steps)
+                steps.append(indicator._oncecalc)
+            else:
+                steps.append(indicator._once)
+
+        return steps
+
+    def _oncefuse(self):
+        '''Fuses the chains of operations of this object and of its
+        sub-indicators (ex: ``(a - b) / (a + b)``) into single numpy
+        expressions. An operation used only as operand of another one has no
+        buffer and is calculated in the "once" of the last operation of the
+        chain, with no intermediate buffers.
+
+        Returns the operations which calculate others'''
+        if not mathsupport.npuse:
+            return []
+
+        # by id, because LineRoot overloads the comparison operators
+        ops, owners = OrderedDict(), dict()
+        pending = [self]
+        while pending:
+            obj = pending.pop()
+            children = obj._lineiterators[LineIterator.IndType]
+            for child in children:
+                if isinstance(child, LineIterator):
+                    pending.append(child)
+                elif isinstance(child, LineActions) and child._npfusable():
+                    ops[id(child)] = child
+                    owners[id(child)] = children
+
+        consumers = collections.defaultdict(list)
+        for op in ops.values():
+            for operand in op._operands():
+                if id(operand) in ops:
+                    consumers[id(operand)].append(op)
+
+        # candidates: the only operand of a single operation and not bound
+        allowed = dict()
+        for opid, users in consumers.items():
+            op = ops[opid]
+            if len(users) == 1 and not op.bindings:
+                user = users[0]
+                allowed[opid] = set(map(id, (
+                    owners[opid], op.lines, user, vars(user), user._datas)))
+
+        # a reference from anywhere else (ex: an attribute of the strategy or
+        # the cache of operations) may read the buffer
+        cands = [ops[opid] for opid in allowed]
+        ours = set(map(id, (ops, cands, owners)))
+        ours.update(map(id, consumers.values()))
+        for referrer in gc.get_referrers(*cands):
+            if id(referrer) in ours or isinstance(referrer, types.FrameType):
+                continue
+
+            for referent in gc.get_referents(referrer):
+                ids = allowed.get(id(referent))
+                if ids is not None and id(referrer) not in ids:
+                    allowed[id(referent)] = None
+
+        private = set(opid for opid, ids in allowed.items() if ids is not None)
+
+        def fuse(op, fused):
+            for operand in op._operands():
+                if id(operand) in private:
+                    fuse(operand, fused)  # operands first
+                    fused[id(operand)] = operand
+
+            return fused
+
+        roots = list()
+        for opid, op in ops.items():
+            if opid in private:
+                continue
+
+            fused = fuse(op, OrderedDict())
+            if fused:
+                op._fused = fused
+                for operand in fused.values():
+                    operand._fusedin = op
+
+                # the clock (the 1st operand) may have been fused: take its own
+                while id(op._clock) in fused:
+                    op._clock = op._clock._clock
+
+                roots.append(op)
+
+        return roots
 
     def preonce(self, start, end):
         pass
@@ -170,6 +170,19 @@ class LineRoot(with_metaclass(MetaLineRoot, object)):
         '''
         pass
 
+    def _oncerange(self, start, end, base=0):
+        '''
+        Calls preonce, oncestart and once for the positions [start, end) of
+        the buffers, which hold the value number ``base`` at position 0 (the
+        previous values may have been dropped)
+        '''
+        minperiod = self._minperiod - base
+        self.preonce(start, max(start, minperiod - 1))
+        if start < minperiod:
+            self.oncestart(minperiod - 1, minperiod)
+
+        self.once(max(start, minperiod), end)
+
     # Arithmetic operators
     def _makeoperation(self, other, operation, r=False, _ownerskip=None):
         raise NotImplementedError
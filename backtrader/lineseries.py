@@ -33,7 +33,7 @@ from __future__ import (absolute_import, division, print_function,
 
 import sys
 
-from .utils.py3 import map, range, string_types, with_metaclass
+from .utils.py3 import map, range, string_types, with_metaclass, zip
 
 from .linebuffer import LineBuffer, LineActions, LinesOperation, LineDelay, NAN
 from .lineroot import LineRoot, LineSingle, LineMultiple
@@ -302,6 +302,10 @@ class Lines(object):
         return self.lines[line].buflen()
 
 
+# Names of the per instance aliases of the lines of each LineSeries class
+_linenames = dict()
+
+
 class MetaLineSeries(LineMultiple.__class__):
     '''
     Dirty job manager for a LineSeries
@@ -410,10 +414,13 @@ class MetaLineSeries(LineMultiple.__class__):
         aliases for "lines" and the "lines" held within it
         '''
         # _obj.plotinfo shadows the plotinfo (class) definition in the class
+        # (defaults are reached in the class and only given values are set)
         plotinfo = cls.plotinfo()
 
-        for pname, pdef in cls.plotinfo._getitems():
-            setattr(plotinfo, pname, kwargs.pop(pname, pdef))
+        if kwargs:
+            for pname in cls.plotinfo._getkeys():
+                if pname in kwargs:
+                    setattr(plotinfo, pname, kwargs.pop(pname))
 
         # Create the object and set the params in place
         _obj, args, kwargs = super(MetaLineSeries, cls).donew(*args, **kwargs)
@@ -432,10 +439,16 @@ class MetaLineSeries(LineMultiple.__class__):
         if _obj.lines.fullsize():
             _obj.line = _obj.lines[0]
 
-        for l, line in enumerate(_obj.lines):
-            setattr(_obj, 'line_%s' % l, _obj._getlinealias(l))
-            setattr(_obj, 'line_%d' % l, line)
-            setattr(_obj, 'line%d' % l, line)
+        lines = _obj.lines.lines
+        try:
+            lnames = _linenames[cls]
+        except KeyError:  # 1st instance of the class
+            lnames = _linenames[cls] = tuple(
+                ('line_%d' % l, 'line%d' % l) for l in range(len(lines)))
+
+        objdict = _obj.__dict__
+        for (lname_, lname), line in zip(lnames, lines):
+            objdict[lname_] = objdict[lname] = line
 
         # Parameter values have now been set before __init__
         return _obj, args, kwargs
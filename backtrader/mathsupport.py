@@ -23,6 +23,20 @@ from __future__ import (absolute_import, division, print_function,
 
 import math
 
+try:
+    import numpy as np
+except ImportError:
+    np = None  # vectorized calculations are not available
+
+npuse = np is not None  # use numpy for the vectorized (runonce) calculations
+
+
+def usenumpy(onoff):
+    '''Activates/deactivates the usage of numpy (if available) for the
+    vectorized calculations done in ``runonce`` mode'''
+    global npuse
+    npuse = bool(onoff) and np is not None
+
 
 def average(x, bessel=False):
     '''
@@ -22,8 +22,8 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
 from collections import OrderedDict
-import itertools
 import sys
+import threading
 
 import backtrader as bt
 from .utils.py3 import zip, string_types, with_metaclass
@@ -39,28 +39,79 @@ def findbases(kls, topclass):
     return retval
 
 
+# Objects whose construction (MetaBase.__call__) is in progress in each
+# thread, innermost last, and the objects whose code created them
+_construction = threading.local()
+
+
+def _constructing():
+    try:
+        return _construction.stack
+    except AttributeError:
+        _construction.stack = stack = list()
+        return stack
+
+
+def _creators():
+    try:
+        return _construction.creators
+    except AttributeError:
+        _construction.creators = creators = list()
+        return creators
+
+
+def _creator(frame):
+    # "self" (or "_obj" in the metaclasses) of the code calling a class,
+    # skipping the __call__ of the metaclasses (caches, singletons)
+    while frame is not None:
+        code = frame.f_code
+        names = code.co_varnames + code.co_cellvars
+        if code.co_name != '__call__' or names[:1] != ('cls',):
+            if 'self' in names or '_obj' in names:
+                f_locals = frame.f_locals
+                creator = f_locals.get('self', None)
+                if creator is None:
+                    creator = f_locals.get('_obj', None)
+
+                return creator
+
+            return None
+
+        frame = frame.f_back
+
+    return None
+
+
 def findowner(owned, cls, startlevel=2, skip=None):
-    # skip this frame and the caller's -> start at 2
-    for framelevel in itertools.count(startlevel):
-        try:
-            frame = sys._getframe(framelevel)
-        except ValueError:
-            # Frame depth exceeded ... no owner ... break away
+    # The owner is the object whose code created "owned" or, if not an
+    # instance of cls, the object being constructed by which that code was
+    # called, its creator and so on down the construction stack. Ex: an
+    # indicator created in a method of another indicator, called from the
+    # __init__ of a strategy, is owned by the indicator and one created by
+    # an operator of a line (not a LineMultiple) by the strategy
+    # (startlevel is only kept for compatibility)
+    stack = _constructing()
+    creators = _creators()
+
+    for i in range(len(stack) - 1, -1, -1):
+        if stack[i] is owned:
             break
+    else:
+        return None  # not being constructed
 
-        # 'self' in regular code
-        self_ = frame.f_locals.get('self', None)
-        if skip is not self_:
-            if self_ is not owned and isinstance(self_, cls):
-                return self_
+    while True:
+        creator = creators[i]
+        if creator is not owned and creator is not skip and \
+           isinstance(creator, cls):
+            return creator
 
-        # '_obj' in metaclasses
-        obj_ = frame.f_locals.get('_obj', None)
-        if skip is not obj_:
-            if obj_ is not owned and isinstance(obj_, cls):
-                return obj_
+        if not i:
+            return None
 
-    return None
+        i -= 1
+        obj = stack[i]
+        if obj is not creator and obj is not skip and isinstance(obj, cls):
+            return obj
 
 
 class MetaBase(type):
@@ -69,6 +120,7 @@ class MetaBase(type):
 
     def donew(cls, *args, **kwargs):
         _obj = cls.__new__(cls, *args, **kwargs)
+        _constructing().append(_obj)  # removed by __call__
         return _obj, args, kwargs
 
     def dopreinit(cls, _obj, *args, **kwargs):
@@ -82,11 +134,20 @@ class MetaBase(type):
         return _obj, args, kwargs
 
     def __call__(cls, *args, **kwargs):
-        cls, args, kwargs = cls.doprenew(*args, **kwargs)
-        _obj, args, kwargs = cls.donew(*args, **kwargs)
-        _obj, args, kwargs = cls.dopreinit(_obj, *args, **kwargs)
-        _obj, args, kwargs = cls.doinit(_obj, *args, **kwargs)
-        _obj, args, kwargs = cls.dopostinit(_obj, *args, **kwargs)
+        constructing = _constructing()
+        creators = _creators()
+        depth = len(constructing)
+        creators.append(_creator(sys._getframe(1)))  # matched in donew
+        try:
+            cls, args, kwargs = cls.doprenew(*args, **kwargs)
+            _obj, args, kwargs = cls.donew(*args, **kwargs)
+            _obj, args, kwargs = cls.dopreinit(_obj, *args, **kwargs)
+            _obj, args, kwargs = cls.doinit(_obj, *args, **kwargs)
+            _obj, args, kwargs = cls.dopostinit(_obj, *args, **kwargs)
+        finally:
+            del constructing[depth:]
+            del creators[depth:]
+
         return _obj
 
 
@@ -94,6 +155,8 @@ class AutoInfoClass(object):
     _getpairsbase = classmethod(lambda cls: OrderedDict())
     _getpairs = classmethod(lambda cls: OrderedDict())
     _getrecurse = classmethod(lambda cls: False)
+    _getkeys = classmethod(lambda cls: ())
+    _getitems = classmethod(lambda cls: ())
 
     @classmethod
     def _derive(cls, name, info, otherbases, recurse=False):
@@ -140,6 +203,12 @@ class AutoInfoClass(object):
         setattr(newcls, '_getpairs', classmethod(lambda cls: clsinfo.copy()))
         setattr(newcls, '_getrecurse', classmethod(lambda cls: recurse))
 
+        # fixed views of the pairs, to avoid a copy for each instance
+        clskeys = tuple(clsinfo.keys())
+        clsitems = tuple(clsinfo.items())
+        setattr(newcls, '_getkeys', classmethod(lambda cls: clskeys))
+        setattr(newcls, '_getitems', classmethod(lambda cls: clsitems))
+
         for infoname, infoval in info2add.items():
             if recurse:
                 recursecls = getattr(newcls, infoname, AutoInfoClass)
@@ -164,18 +233,10 @@ class AutoInfoClass(object):
     def _getkwargsdefault(cls):
         return cls._getpairs()
 
-    @classmethod
-    def _getkeys(cls):
-        return cls._getpairs().keys()
-
     @classmethod
     def _getdefaults(cls):
         return list(cls._getpairs().values())
 
-    @classmethod
-    def _getitems(cls):
-        return cls._getpairs().items()
-
     @classmethod
     def _gettuple(cls):
         return tuple(cls._getpairs().items())
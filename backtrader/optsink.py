@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import collections
+import csv
+import hashlib
+import io
+import os
+import sys
+
+from .metabase import MetaParams
+from .utils.py3 import string_types, with_metaclass
+
+
+__all__ = ['optkey', 'OptSinkBase', 'OptSinkCSV']
+
+
+def optkey(iterstrat):
+    '''Returns a key which identifies the combination of strategies and
+    parameters ``iterstrat`` across runs, to resume optimizations'''
+    key = repr([('%s.%s' % (stcls.__module__, stcls.__name__),
+                 tuple(args), sorted(kwargs.items()))
+                for stcls, args, kwargs in iterstrat])
+
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+class OptSinkBase(with_metaclass(MetaParams, object)):
+    '''Base class for the sinks which receive the results of an optimization
+    as they are produced (see ``Cerebro.addoptsink``)
+
+    Subclasses override:
+
+      - ``start``: called before the optimization starts
+      - ``finished``: returns the keys (see ``optkey``) of the combinations
+        already stored by the sink (from a previous run) which will not be
+        run again
+      - ``add(key, iterstrat, result)``: called for each executed
+        combination with its ``optkey``, the ``(strategy, args, kwargs)``
+        tuples which were run and the list of strategies (or ``OptReturn``
+        instances) returned by the run
+      - ``stop``: called when the optimization is over
+    '''
+
+    def start(self):
+        pass
+
+    def finished(self):
+        return set()
+
+    def add(self, key, iterstrat, result):
+        pass
+
+    def stop(self):
+        pass
+
+
+class OptSinkCSV(OptSinkBase):
+    '''Writes a row for each executed combination to a csv file, with the
+    columns:
+
+      - ``optkey``: the key of the combination (see ``optkey``)
+      - the keyword arguments passed to the strategy (prefixed with ``sX.``,
+        with ``X`` being the index of the strategy, if several strategies are
+        run together)
+      - the (flattened) values returned by ``get_analysis`` of each analyzer
+        in the form ``name.key.subkey`` (also prefixed if several strategies
+        are run)
+
+    The columns are set by the first row written to the file. Values
+    delivered later with other keys are not written
+
+    If the file already exists, the rows are appended to it and the
+    combinations present in it are reported as finished, to let the
+    optimization resume where it stopped
+
+    Params:
+
+      - ``out`` (default: ``None``): name of the output file. If ``None``
+        the rows are written to ``sys.stdout`` and any other object is taken
+        as a stream to write to (neither is closed and nothing is resumed)
+    '''
+    params = (
+        ('out', None),
+    )
+
+    def start(self):
+        self._headers = None
+        self._finished = set()
+
+        out = self.p.out
+        if out is None:
+            self._f, self._close = sys.stdout, False
+        elif not isinstance(out, string_types):
+            self._f, self._close = out, False
+        else:
+            if os.path.isfile(out) and os.path.getsize(out):
+                with io.open(out, 'r', newline='') as f:
+                    rows = csv.reader(f)
+                    self._headers = next(rows)
+                    idx = self._headers.index('optkey')
+                    self._finished.update(row[idx] for row in rows if row)
+
+            self._f, self._close = io.open(out, 'a', newline=''), True
+
+        self._writer = csv.writer(self._f)
+
+    def finished(self):
+        return self._finished
+
+    def stop(self):
+        if self._close:
+            self._f.close()
+
+    def add(self, key, iterstrat, result):
+        multi = len(iterstrat) > 1
+        values = collections.OrderedDict(optkey=key)
+
+        for i, (stcls, args, kwargs) in enumerate(iterstrat):
+            prefix = 's%d.' % i if multi else ''
+            for name, value in kwargs.items():
+                values[prefix + name] = value
+
+        for i, strat in enumerate(result):
+            prefix = 's%d.' % i if multi else ''
+            for name, analyzer in strat.analyzers.getitems():
+                self._flatten(values, prefix + name, analyzer.get_analysis())
+
+        if self._headers is None:
+            self._headers = list(values.keys())
+            self._writer.writerow(self._headers)
+
+        self._writer.writerow([values.get(h, '') for h in self._headers])
+        self._f.flush()  # a crash keeps the results delivered so far
+
+    def _flatten(self, values, name, analysis):
+        if not isinstance(analysis, dict):
+            values[name] = analysis
+            return
+
+        for key, val in analysis.items():
+            self._flatten(values, '%s.%s' % (name, key), val)
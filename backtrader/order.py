@@ -21,8 +21,6 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
-import collections
-from copy import copy
 import datetime
 import itertools
 
@@ -58,6 +56,11 @@ class OrderExecutionBit(object):
       - pprice: current open position price
 
     '''
+    __slots__ = ('dt', 'size', 'price',
+                 'closed', 'opened', 'closedvalue', 'openedvalue',
+                 'closedcomm', 'openedcomm',
+                 'value', 'comm', 'pnl',
+                 'psize', 'pprice')
 
     def __init__(self,
                  dt=None, size=0, price=0.0,
@@ -114,24 +117,28 @@ class OrderData(object):
       - pprice: current open position price
 
     '''
-    # According to the docs, collections.deque is thread-safe with appends at
-    # both ends, there will be no pop (nowhere) and therefore to know which the
-    # new exbits are two indices are needed. At time of cloning (__copy__) the
-    # indices can be updated to match the previous end, and the new end
-    # (len(exbits)
+    # exbits only grows (appends are atomic and there will be no pop) and
+    # therefore to know which the new exbits are two indices are needed. At
+    # time of cloning the indices can be updated to match the previous end,
+    # and the new end (len(exbits)
     # Example: start 0, 0 -> islice(exbits, 0, 0) -> []
     # One added -> copy -> updated 0, 1 -> islice(exbits, 0, 1) -> [1 elem]
     # Other added -> copy -> updated 1, 2 -> islice(exbits, 1, 2) -> [1 elem]
-    # "add" and "__copy__" happen always in the same thread (with all current
+    # "add" and "clone" happen always in the same thread (with all current
     # implementations) and therefore no append will happen during a copy and
     # the len of the exbits can be queried with no concerns about another
     # thread making an append and with no need for a lock
+    __slots__ = ('pclose', 'exbits', 'p1', 'p2',
+                 'dt', 'size', 'remsize', 'price', 'pricelimit',
+                 'trailamount', 'trailpercent', '_plimit',
+                 'value', 'comm', 'margin', 'pnl',
+                 'psize', 'pprice')
 
     def __init__(self, dt=None, size=0, price=0.0, pricelimit=0.0, remsize=0,
                  pclose=0.0, trailamount=0.0, trailpercent=0.0):
 
         self.pclose = pclose
-        self.exbits = collections.deque()  # for historical purposes
+        self.exbits = list()  # for historical purposes
         self.p1, self.p2 = 0, 0  # indices to pending notifications
 
         self.dt = dt
@@ -215,7 +222,10 @@ class OrderData(object):
 
     def clone(self):
         self.markpending()
-        obj = copy(self)
+        obj = OrderData.__new__(self.__class__)
+        for name in self.__slots__:
+            setattr(obj, name, getattr(self, name))
+
         return obj
 
 
@@ -231,6 +241,14 @@ class OrderBase(with_metaclass(MetaParams, object)):
         ('histnotify', False),
     )
 
+    # The moving parts of the order live in slots. The params (and any other
+    # attribute set on the order by brokers or users) go to the __dict__
+    __slots__ = ('ref', 'broker', '_info', 'comminfo', 'triggered',
+                 '_active', 'status', '_plimit', 'exectype', 'size', 'valid',
+                 'created', '_limitoffset', 'executed', 'position', 'dteos',
+                 'plen', 'pannotated',
+                 '__dict__')
+
     DAY = datetime.timedelta()  # constant for DAY order identification
 
     # Time Restrictions for orders
@@ -267,6 +285,17 @@ class OrderBase(with_metaclass(MetaParams, object)):
 
     plimit = property(_getplimit, _setplimit)
 
+    def _getinfo(self):
+        if self._info is None:  # created when first used
+            self._info = AutoOrderedDict()
+
+        return self._info
+
+    def _setinfo(self, info):
+        self._info = info
+
+    info = property(_getinfo, _setinfo)
+
     def __getattr__(self, name):
         # Return attr from params if not found in order
         return getattr(self.params, name)
@@ -302,21 +331,28 @@ class OrderBase(with_metaclass(MetaParams, object)):
     def __init__(self):
         self.ref = next(self.refbasis)
         self.broker = None
-        self.info = AutoOrderedDict()
+        self._info = None
         self.comminfo = None
         self.triggered = False
+        self.plen = 0
+        self.pannotated = None
 
         self._active = self.parent is None
         self.status = Order.Created
 
         self.plimit = self.p.pricelimit  # alias via property
 
+        # exectype, size and valid may be modified: take them from the params
+        self.exectype = self.p.exectype
         if self.exectype is None:
             self.exectype = Order.Market
 
+        self.size = self.p.size
         if not self.isbuy():
             self.size = -self.size
 
+        self.valid = self.p.valid
+
         # Set a reference price if price is not set using
         # the close price
         pclose = self.data.close[0] if not self.p.simulated else self.price
@@ -383,9 +419,13 @@ class OrderBase(with_metaclass(MetaParams, object)):
 
     def clone(self):
         # status, triggered and executed are the only moving parts in order
-        # status and triggered are covered by copy
+        # status and triggered are covered by copying the slots
         # executed has to be replaced with an intelligent clone of itself
-        obj = copy(self)
+        obj = self.__class__.__new__(self.__class__)
+        for name in self._slotnames:
+            setattr(obj, name, getattr(self, name))
+
+        obj.__dict__.update(self.__dict__)
         obj.executed = self.executed.clone()
         return obj  # status could change in next to completed
 
@@ -525,6 +565,9 @@ class OrderBase(with_metaclass(MetaParams, object)):
         pass  # generic interface
 
 
+OrderBase._slotnames = OrderBase.__slots__[:-1]  # without __dict__
+
+
 class Order(OrderBase):
     '''
     Class which holds creation/execution data and type of oder.
@@ -22,9 +22,6 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
 
-from copy import copy
-
-
 class Position(object):
     '''
     Keeps and updates the size and price of a position. The object has no
@@ -37,6 +34,8 @@ class Position(object):
     The Position instances can be tested using len(position) to see if size
     is not null
     '''
+    __slots__ = ('size', 'price', 'price_orig', 'adjbase',
+                 'upopened', 'upclosed', 'updt', 'datetime')
 
     def __str__(self):
         items = list()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import time
+
+from .lineiterator import LineIterator
+from .utils import OrderedDict
+
+
+__all__ = ['Profiler']
+
+# wall clock with the best available resolution
+_timer = getattr(time, 'perf_counter', time.time)
+
+
+class _TimedFilter(object):
+    '''Stands in for a filter in the list of filters of a data feed and
+    times its calls. Other attributes (``check``, ``last``, ...) are taken
+    from the filter'''
+    def __init__(self, ff, stat):
+        self._ff = ff
+        self._stat = stat
+
+    def __getattr__(self, name):
+        return getattr(self._ff, name)
+
+    def __call__(self, *args, **kwargs):
+        stat = self._stat
+        t0 = _timer()
+        try:
+            return self._ff(*args, **kwargs)
+        finally:
+            stat[0] += 1
+            stat[1] += _timer() - t0
+
+
+class Profiler(object):
+    '''Records the wall time and the number of calls of the stages of the
+    event loop of ``Cerebro``
+
+    The methods of the stages are replaced by timed versions in the
+    instances taking part in a run (never in the classes) and restored with
+    ``remove``. Nothing is timed if no profiler is installed.
+
+    The time of a stage includes that of the stages it calls: the ``next``
+    of a data includes its ``load``, which includes the filters, and the
+    ``_next``/``_once`` of an indicator includes its sub-indicators
+
+    ``report`` returns an ``OrderedDict`` with an entry per stage, in the
+    order in which they were installed::
+
+      'data.<name>.next': {'calls': 500, 'time': 0.0123}
+
+    Stages which have not been called are not reported
+    '''
+    def __init__(self):
+        self.stats = OrderedDict()  # name -> [calls, time]
+        self._methods = list()  # (obj, attr, overridden method or None)
+        self._filters = list()  # (data, original list of filters)
+
+    def _stat(self, name):
+        return self.stats.setdefault(name, [0, 0.0])
+
+    def timeit(self, obj, attr, name):
+        '''Replaces method ``attr`` of the instance ``obj`` by a version which
+        times its calls under ``name``'''
+        method = getattr(obj, attr)
+        stat = self._stat(name)
+
+        def timed(*args, **kwargs):
+            t0 = _timer()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                stat[0] += 1
+                stat[1] += _timer() - t0
+
+        self._methods.append((obj, attr, obj.__dict__.get(attr)))
+        setattr(obj, attr, timed)
+
+    def add_data(self, data, name):
+        '''Times ``preload``, ``next``, ``advance`` and ``load`` of a data
+        feed and each of its filters'''
+        prefix = 'data.%s.' % name
+        for attr in ('preload', 'next', 'advance', 'load'):
+            self.timeit(data, attr, prefix + attr)
+
+        self._filters.append((data, data._filters))
+        names = dict()
+        filters = list()
+        for ff, fargs, fkwargs in data._filters:
+            fname = getattr(ff, '__name__', None) or ff.__class__.__name__
+            fname = self._uniquename(names, prefix + 'filter.' + fname)
+            filters.append((_TimedFilter(ff, self._stat(fname)),
+                            fargs, fkwargs))
+
+        data._filters = filters
+
+    def add_strategy(self, strategy, name):
+        '''Times ``next`` and the calls to the observers and analyzers of a
+        strategy and ``_next``/``_once`` of each of its indicators (and their
+        sub-indicators)'''
+        prefix = name + '.'
+        self.timeit(strategy, 'next', prefix + 'next')
+        self.timeit(strategy, '_next_observers', prefix + '_next_observers')
+        self.timeit(strategy, '_next_analyzers', prefix + '_next_analyzers')
+        self._add_indicators(strategy, prefix + 'indicators.')
+
+    def _add_indicators(self, owner, prefix):
+        names = dict()
+        for ind in owner._lineiterators[LineIterator.IndType]:
+            iname = self._uniquename(names, prefix + ind.__class__.__name__)
+            self.timeit(ind, '_next', iname + '._next')
+            self.timeit(ind, '_once', iname + '._once')
+            if isinstance(ind, LineIterator):
+                self._add_indicators(ind, iname + '.')
+
+    def _uniquename(self, names, name):
+        # numbers the repeated names: SMA, SMA#2, SMA#3 ...
+        count = names[name] = names.get(name, 0) + 1
+        return name if count == 1 else '%s#%d' % (name, count)
+
+    def remove(self):
+        '''Restores the original methods and filters'''
+        for obj, attr, method in reversed(self._methods):
+            if method is None:
+                delattr(obj, attr)
+            else:
+                setattr(obj, attr, method)
+
+        for data, filters in self._filters:
+            data._filters = filters
+
+        self._methods = list()
+        self._filters = list()
+
+    def report(self):
+        '''Returns the calls and wall time (seconds) of each stage'''
+        report = OrderedDict()
+        for name, (calls, elapsed) in self.stats.items():
+            if calls:
+                report[name] = OrderedDict([('calls', calls), ('time', elapsed)])
+
+        return report
@@ -22,7 +22,6 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
 import collections
-import copy
 import datetime
 import inspect
 import itertools
@@ -32,6 +31,7 @@ from .utils.py3 import (filter, keys, integer_types, iteritems, itervalues,
                         map, MAXINT, string_types, with_metaclass)
 
 import backtrader as bt
+from .linebuffer import _LineForward
 from .lineiterator import LineIterator, StrategyBase
 from .lineroot import LineSingle
 from .lineseries import LineSeriesStub
@@ -93,6 +93,10 @@ class MetaStrategy(StrategyBase.__class__):
 
         _obj._tradehistoryon = False
 
+        # cross-sectional view of the first panel feed (see PanelData)
+        _obj.panel = next((data.panel for data in _obj.datas
+                           if getattr(data, 'panel', None) is not None), None)
+
         return _obj, args, kwargs
 
     def dopostinit(cls, _obj, *args, **kwargs):
@@ -113,6 +117,10 @@ class Strategy(with_metaclass(MetaStrategy, StrategyBase)):
 
     csv = True
     _oldsync = False  # update clock using old methodology : data 0
+    _oncegraph = False  # run the indicators from a flat schedule in runonce
+    _oncegraphfuse = False  # fuse the chains of operations in the schedule
+    _oncesteps = None
+    _onceadvance = None
 
     # keep the latest delivered data date in the line
     lines = ('datetime',)
@@ -289,10 +297,98 @@ class Strategy(with_metaclass(MetaStrategy, StrategyBase)):
         else:
             self.prenext_open()
 
-    def _oncepost(self, dt):
+    def _once(self):
+        if self._oncesteps is None:
+            return super(Strategy, self)._once()
+
+        self._onceforward()
+        for step in self._oncesteps:
+            step()
+
+        self._oncecalc()
+
+    def _oncegraphcompile(self):
+        # flat schedule for _once and, for _oncepost, the clock and lines of
+        # each indicator to skip the chain of advance calls for each bar
+        if self._oncegraphfuse:
+            self._oncefuse()
+
+        self._oncesteps = self._oncecompile()
+
+        self._onceadvance = advance = list()
         for indicator in self._lineiterators[LineIterator.IndType]:
-            if len(indicator._clock) > len(indicator):
-                indicator.advance()
+            if getattr(indicator, '_fusedin', None) is not None:
+                continue  # no buffer, calculated in another operation
+
+            lines = list(indicator.lines)
+            if isinstance(indicator, bt.Indicator) and lines:
+                advance.append((indicator._clock, lines[0], lines))
+            else:  # LineActions are buffers, others keep their own logic
+                advance.append((indicator._clock, indicator, [indicator]))
+
+    def _oncechunk(self):
+        # calculates the bars added to the datas since the last chunk (see
+        # the parameter chunkbars of cerebro). The strategy and observers
+        # are run bar by bar in _oncepost and their lines are not forwarded
+        if self._oncesteps is None:
+            for indicator in self._lineiterators[LineIterator.IndType]:
+                indicator._once()
+        else:
+            for step in self._oncesteps:
+                step()
+
+        for data in self.datas:
+            data.home()
+
+        for indicator in self._lineiterators[LineIterator.IndType]:
+            indicator.home()
+
+    def _oncebuffers(self):
+        # the buffers of the datas, indicators (with the sub-indicators and
+        # operations), observers and of the strategy itself
+        for data in self.datas:
+            for line in data.lines:
+                yield line
+
+        pending = [self]
+        while pending:
+            obj = pending.pop()
+            if not isinstance(obj, LineIterator):
+                yield obj  # operations are buffers
+                continue
+
+            for line in obj.lines:
+                yield line
+
+            pending.extend(obj._lineiterators[LineIterator.IndType])
+            pending.extend(obj._lineiterators[LineIterator.ObsType])
+
+    def _oncecarry(self):
+        '''Returns how many values each buffer has to keep between chunks:
+        the largest minimum period of the datas, indicators and strategy'''
+        return max(line._minperiod for line in self._oncebuffers())
+
+    def _oncechunkable(self):
+        # lines which look ahead are calculated with values of the future,
+        # which are not in the current chunk
+        return not any(isinstance(line, _LineForward)
+                       for line in self._oncebuffers())
+
+    def _oncetrim(self, size):
+        # drop all values but the last size ones of all buffers
+        for line in self._oncebuffers():
+            line.trim(size)
+
+    def _oncepost(self, dt):
+        if self._onceadvance is None:
+            for indicator in self._lineiterators[LineIterator.IndType]:
+                if len(indicator._clock) > len(indicator):
+                    indicator.advance()
+        else:
+            for clock, first, lines in self._onceadvance:
+                if len(clock) > len(first):
+                    for line in lines:
+                        line.advance()
 
         if self._oldsync:
             # Strategy has not been reset, the line is there
@@ -406,6 +502,9 @@ class Strategy(with_metaclass(MetaStrategy, StrategyBase)):
         # change operators to stage 2
         self._stage2()
 
+        if self._oncegraph:
+            self._oncegraphcompile()
+
         self._dlens = [len(data) for data in self.datas]
 
         self._minperstatus = MAXINT  # start in prenext
@@ -477,6 +576,10 @@ class Strategy(with_metaclass(MetaStrategy, StrategyBase)):
             ainfo[aname].Params = analyzer.p._getkwargs() or None
             ainfo[aname].Analysis = analyzer.get_analysis()
 
+        profile = getattr(self, 'profile', None)
+        if profile is not None:  # set by cerebro if run with profile=True
+            wrinfo['Profile'] = profile
+
         return wrinfo
 
     def _stop(self):
@@ -539,9 +642,9 @@ class Strategy(with_metaclass(MetaStrategy, StrategyBase)):
                              comminfo=order.comminfo)
 
                 if trade.isclosed:
-                    self._tradespending.append(copy.copy(trade))
+                    self._tradespending.append(trade.clone())
                     if quicknotify:
-                        qtrades.append(copy.copy(trade))
+                        qtrades.append(trade.clone())
 
             # Update it if needed
             if exbit.opened:
@@ -562,14 +665,14 @@ class Strategy(with_metaclass(MetaStrategy, StrategyBase)):
                 # orders have put the position down to 0 and the next order
                 # "opens" a position but "closes" the trade
                 if trade.isclosed:
-                    self._tradespending.append(copy.copy(trade))
+                    self._tradespending.append(trade.clone())
                     if quicknotify:
-                        qtrades.append(copy.copy(trade))
+                        qtrades.append(trade.clone())
 
             if trade.justopened:
-                self._tradespending.append(copy.copy(trade))
+                self._tradespending.append(trade.clone())
                 if quicknotify:
-                    qtrades.append(copy.copy(trade))
+                    qtrades.append(trade.clone())
 
         if quicknotify:
             self._notify(qorders=qorders, qtrades=qtrades)
@@ -1636,31 +1739,60 @@ class SignalStrategy(with_metaclass(MetaSigStrategy, Strategy)):
         if self._sentinel is not None and not self.p._concurrent:
             return  # order active and more than 1 not allowed
 
-        sigs = self._signals
-        nosig = [[0.0]]
+        sigvals = dict((sigtype, [x[0] for x in sigs])
+                       for sigtype, sigs in self._signals.items())
 
-        # Calculate current status of the signals
-        ls_long = all(x[0] > 0.0 for x in sigs[bt.SIGNAL_LONGSHORT] or nosig)
-        ls_short = all(x[0] < 0.0 for x in sigs[bt.SIGNAL_LONGSHORT] or nosig)
+        # Take size and start logic
+        size = self.getposition(self._dtarget).size
+        for action in self._signal_actions(size, sigvals):
+            if not action:
+                # closing position - not relevant for concurrency
+                self.close(self._dtarget)
+            elif action > 0:
+                self._sentinel = self.buy(self._dtarget)
+            else:
+                self._sentinel = self.sell(self._dtarget)
 
-        l_enter0 = all(x[0] > 0.0 for x in sigs[bt.SIGNAL_LONG] or nosig)
-        l_enter1 = all(x[0] < 0.0 for x in sigs[bt.SIGNAL_LONG_INV] or nosig)
-        l_enter2 = all(x[0] for x in sigs[bt.SIGNAL_LONG_ANY] or nosig)
+    def _signal_actions(self, size, sigvals):
+        '''Returns the actions (in order) to take for a position of ``size``
+        given the current values of the signals (``sigvals`` holds a list of
+        values per signal type): ``0`` close, ``1`` buy and ``-1`` sell
+        '''
+        nosig = [0.0]
+
+        # Calculate current status of the signals
+        ls = sigvals.get(bt.SIGNAL_LONGSHORT) or nosig
+        ls_long = all(x > 0.0 for x in ls)
+        ls_short = all(x < 0.0 for x in ls)
+
+        sigs = sigvals.get(bt.SIGNAL_LONG) or nosig
+        l_enter0 = all(x > 0.0 for x in sigs)
+        l_leav0 = all(x < 0.0 for x in sigs)
+        sigs = sigvals.get(bt.SIGNAL_LONG_INV) or nosig
+        l_enter1 = all(x < 0.0 for x in sigs)
+        l_leav1 = all(x > 0.0 for x in sigs)
+        l_enter2 = l_leav2 = all(sigvals.get(bt.SIGNAL_LONG_ANY) or nosig)
         l_enter = l_enter0 or l_enter1 or l_enter2
 
-        s_enter0 = all(x[0] < 0.0 for x in sigs[bt.SIGNAL_SHORT] or nosig)
-        s_enter1 = all(x[0] > 0.0 for x in sigs[bt.SIGNAL_SHORT_INV] or nosig)
-        s_enter2 = all(x[0] for x in sigs[bt.SIGNAL_SHORT_ANY] or nosig)
+        sigs = sigvals.get(bt.SIGNAL_SHORT) or nosig
+        s_enter0 = all(x < 0.0 for x in sigs)
+        s_leav0 = all(x > 0.0 for x in sigs)
+        sigs = sigvals.get(bt.SIGNAL_SHORT_INV) or nosig
+        s_enter1 = all(x > 0.0 for x in sigs)
+        s_leav1 = all(x < 0.0 for x in sigs)
+        s_enter2 = s_leav2 = all(sigvals.get(bt.SIGNAL_SHORT_ANY) or nosig)
         s_enter = s_enter0 or s_enter1 or s_enter2
 
-        l_ex0 = all(x[0] < 0.0 for x in sigs[bt.SIGNAL_LONGEXIT] or nosig)
-        l_ex1 = all(x[0] > 0.0 for x in sigs[bt.SIGNAL_LONGEXIT_INV] or nosig)
-        l_ex2 = all(x[0] for x in sigs[bt.SIGNAL_LONGEXIT_ANY] or nosig)
+        l_ex0 = all(x < 0.0 for x in sigvals.get(bt.SIGNAL_LONGEXIT) or nosig)
+        l_ex1 = all(x > 0.0
+                    for x in sigvals.get(bt.SIGNAL_LONGEXIT_INV) or nosig)
+        l_ex2 = all(sigvals.get(bt.SIGNAL_LONGEXIT_ANY) or nosig)
         l_exit = l_ex0 or l_ex1 or l_ex2
 
-        s_ex0 = all(x[0] > 0.0 for x in sigs[bt.SIGNAL_SHORTEXIT] or nosig)
-        s_ex1 = all(x[0] < 0.0 for x in sigs[bt.SIGNAL_SHORTEXIT_INV] or nosig)
-        s_ex2 = all(x[0] for x in sigs[bt.SIGNAL_SHORTEXIT_ANY] or nosig)
+        s_ex0 = all(x > 0.0 for x in sigvals.get(bt.SIGNAL_SHORTEXIT) or nosig)
+        s_ex1 = all(x < 0.0
+                    for x in sigvals.get(bt.SIGNAL_SHORTEXIT_INV) or nosig)
+        s_ex2 = all(sigvals.get(bt.SIGNAL_SHORTEXIT_ANY) or nosig)
         s_exit = s_ex0 or s_ex1 or s_ex2
 
         # Use oppossite signales to start reversal (by closing)
@@ -1669,14 +1801,7 @@ class SignalStrategy(with_metaclass(MetaSigStrategy, Strategy)):
         s_rev = not self._shortexit and l_enter
 
         # Opposite of individual long and short
-        l_leav0 = all(x[0] < 0.0 for x in sigs[bt.SIGNAL_LONG] or nosig)
-        l_leav1 = all(x[0] > 0.0 for x in sigs[bt.SIGNAL_LONG_INV] or nosig)
-        l_leav2 = all(x[0] for x in sigs[bt.SIGNAL_LONG_ANY] or nosig)
         l_leave = l_leav0 or l_leav1 or l_leav2
-
-        s_leav0 = all(x[0] > 0.0 for x in sigs[bt.SIGNAL_SHORT] or nosig)
-        s_leav1 = all(x[0] < 0.0 for x in sigs[bt.SIGNAL_SHORT_INV] or nosig)
-        s_leav2 = all(x[0] for x in sigs[bt.SIGNAL_SHORT_ANY] or nosig)
         s_leave = s_leav0 or s_leav1 or s_leav2
 
         # Invalidate long leave if longexit signals are available
@@ -1684,35 +1809,34 @@ class SignalStrategy(with_metaclass(MetaSigStrategy, Strategy)):
         # Invalidate short leave if shortexit signals are available
         s_leave = not self._shortexit and s_leave
 
-        # Take size and start logic
-        size = self.getposition(self._dtarget).size
+        actions = list()
         if not size:
             if ls_long or l_enter:
-                self._sentinel = self.buy(self._dtarget)
+                actions.append(1)
 
             elif ls_short or s_enter:
-                self._sentinel = self.sell(self._dtarget)
+                actions.append(-1)
 
         elif size > 0:  # current long position
             if ls_short or l_exit or l_rev or l_leave:
-                # closing position - not relevant for concurrency
-                self.close(self._dtarget)
+                actions.append(0)
 
             if ls_short or l_rev:
-                self._sentinel = self.sell(self._dtarget)
+                actions.append(-1)
 
             if ls_long or l_enter:
                 if self.p._accumulate:
-                    self._sentinel = self.buy(self._dtarget)
+                    actions.append(1)
 
         elif size < 0:  # current short position
             if ls_long or s_exit or s_rev or s_leave:
-                # closing position - not relevant for concurrency
-                self.close(self._dtarget)
+                actions.append(0)
 
             if ls_long or s_rev:
-                self._sentinel = self.buy(self._dtarget)
+                actions.append(1)
 
             if ls_short or s_enter:
                 if self.p._accumulate:
-                    self._sentinel = self.sell(self._dtarget)
+                    actions.append(-1)
+
+        return actions
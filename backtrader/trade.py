@@ -144,6 +144,12 @@ class Trade(object):
         The last entry in the history is the Closing Event
 
     '''
+    __slots__ = ('ref', 'data', 'tradeid', 'size', 'price', 'value',
+                 'commission', 'pnl', 'pnlcomm',
+                 'justopened', 'isopen', 'isclosed', 'long',
+                 'baropen', 'dtopen', 'barclose', 'dtclose', 'barlen',
+                 'historyon', 'history', 'status')
+
     refbasis = itertools.count(1)
 
     status_names = ['Created', 'Open', 'Closed']
@@ -201,6 +207,18 @@ class Trade(object):
 
     __nonzero__ = __bool__
 
+    def clone(self):
+        '''Returns a copy of the trade with the current values, which shares
+        the ``history`` with the trade'''
+        obj = self.__class__.__new__(self.__class__)
+        for name in self.__slots__:
+            try:
+                setattr(obj, name, getattr(self, name))
+            except AttributeError:
+                pass  # long is only set when the trade is opened
+
+        return obj
+
     def getdataname(self):
         '''Shortcut to retrieve the name of the data this trade references'''
         return self.data._name
@@ -22,8 +22,12 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
 
-from .dateintern import (num2date, num2dt, date2num, time2num, num2time,
-                         UTC, TZLocal, Localizer, tzparse, TIME_MAX, TIME_MIN)
+from .dateintern import (num2date, num2dt, date2num, date2nums, npdate2nums,
+                         npepoch2nums, npnum2dates, nplocal2nums, tzoffset,
+                         time2num, num2time, UTC, TZLocal, Localizer, tzparse,
+                         TIME_MAX, TIME_MIN)
 
-__all__ = ('num2date', 'num2dt', 'date2num', 'time2num', 'num2time',
-           'UTC', 'TZLocal', 'Localizer', 'tzparse', 'TIME_MAX', 'TIME_MIN')
+__all__ = ('num2date', 'num2dt', 'date2num', 'date2nums', 'npdate2nums',
+           'npepoch2nums', 'npnum2dates', 'nplocal2nums', 'tzoffset',
+           'time2num', 'num2time', 'UTC', 'TZLocal', 'Localizer', 'tzparse',
+           'TIME_MAX', 'TIME_MIN')
@@ -23,6 +23,7 @@ from __future__ import (absolute_import, division, print_function,
 
 import datetime
 import math
+import operator
 import time as _time
 
 from .py3 import string_types
@@ -146,6 +147,12 @@ SECONDS_PER_DAY = SECONDS_PER_MINUTE * MINUTES_PER_DAY
 MUSECONDS_PER_DAY = MUSECONDS_PER_SECOND * SECONDS_PER_DAY
 
 
+# Conversions of num2date, reused when the same timestamp is converted again
+# (the datetime of a bar is usually converted several times)
+_num2datecache = dict()
+NUM2DATE_CACHESIZE = 4096
+
+
 def num2date(x, tz=None, naive=True):
     # Same as matplotlib except if tz is None a naive datetime object
     # will be returned.
@@ -160,8 +167,25 @@ def num2date(x, tz=None, naive=True):
     rcparams TZ value).
     If *x* is a sequence, a sequence of :class:`datetime` objects will
     be returned.
+
+    The results are memoized (see ``NUM2DATE_CACHESIZE``)
     """
+    key = (x, tz, naive)
+    try:
+        return _num2datecache[key]
+    except KeyError:
+        pass
+    except TypeError:  # unhashable tz
+        return _num2date(x, tz, naive)
+
+    if len(_num2datecache) >= NUM2DATE_CACHESIZE:
+        _num2datecache.clear()
 
+    dt = _num2datecache[key] = _num2date(x, tz, naive)
+    return dt
+
+
+def _num2date(x, tz=None, naive=True):
     ix = int(x)
     dt = datetime.datetime.fromordinal(ix)
     remainder = float(x) - ix
@@ -172,13 +196,16 @@ def num2date(x, tz=None, naive=True):
     if microsecond < 10:
         microsecond = 0  # compensate for rounding errors
 
-    if True and tz is not None:
+    if tz is not None and naive:
+        dt = datetime.datetime(
+            dt.year, dt.month, dt.day, int(hour), int(minute), int(second),
+            microsecond)
+        dt += tzoffset(tz, dt)  # cached version of astimezone
+    elif tz is not None:
         dt = datetime.datetime(
             dt.year, dt.month, dt.day, int(hour), int(minute), int(second),
             microsecond, tzinfo=UTC)
         dt = dt.astimezone(tz)
-        if naive:
-            dt = dt.replace(tzinfo=None)
     else:
         # If not tz has been passed return a non-timezoned dt
         dt = datetime.datetime(
@@ -191,6 +218,61 @@ def num2date(x, tz=None, naive=True):
     return dt
 
 
+# Per timezone (and kind of input time) the offset of the days in which it
+# does not change (None for the days with a DST transition)
+_tzoffsets = dict()
+
+
+def _tzoffset(tz, dt, local):
+    if local:
+        return tz.localize(dt).utcoffset()
+
+    # the difference of the wall clocks is the one applied by astimezone
+    return dt.replace(tzinfo=UTC).astimezone(tz).replace(tzinfo=None) - dt
+
+
+def _tzdayoffset(tz, day, local):
+    # Returns the offset of tz during the day (ordinal) or None if it changes
+    try:
+        days = _tzoffsets[tz, local]
+    except KeyError:
+        days = _tzoffsets[tz, local] = dict()
+
+    try:
+        return days[day]
+    except KeyError:
+        pass
+
+    start = datetime.datetime.fromordinal(day)
+    offset = _tzoffset(tz, start, local)
+    if offset != _tzoffset(tz, datetime.datetime.combine(start, TIME_MAX),
+                           local):
+        offset = None  # DST transition in the day
+
+    days[day] = offset
+    return offset
+
+
+def tzoffset(tz, dt, local=False):
+    """
+    Returns the UTC offset (:class:`timedelta`) of *tz* for the naive
+    :class:`datetime` *dt*, which is taken as UTC or, with *local*, as a
+    local time in *tz* (which must then support ``localize``)
+
+    The offsets are cached per day. Only in the days with a DST transition
+    is *tz* looked up for each *dt*
+    """
+    try:
+        offset = _tzdayoffset(tz, dt.toordinal(), local)
+    except TypeError:  # unhashable tz
+        offset = None
+
+    if offset is None:
+        return _tzoffset(tz, dt, local)
+
+    return offset
+
+
 def num2dt(num, tz=None, naive=True):
     return num2date(num, tz=tz, naive=naive).date()
 
@@ -206,7 +288,11 @@ def date2num(dt, tz=None):
     is a :func:`float`.
     """
     if tz is not None:
-        dt = tz.localize(dt)
+        if getattr(dt, 'tzinfo', None) is None:
+            # cached version of tz.localize + utcoffset
+            dt -= tzoffset(tz, dt, local=True)
+        else:
+            dt = tz.localize(dt)
 
     if hasattr(dt, 'tzinfo') and dt.tzinfo is not None:
         delta = dt.tzinfo.utcoffset(dt)
@@ -227,6 +313,173 @@ def date2num(dt, tz=None):
     return base
 
 
+def date2nums(dates, times):
+    """
+    Batch version of :func:`date2num` for naive inputs. Each item of *dates*
+    (:class:`date`) is combined with the corresponding item of *times*
+    (:class:`time`) and converted to a float, which is bit for bit the same
+    value :func:`date2num` delivers for the combined :class:`datetime`.
+
+    Repeated dates and times are converted only once. Return value is a
+    :class:`list` of :func:`float`.
+    """
+    dates, times = list(dates), list(times)
+    if not dates:
+        return []
+
+    bases = dict((d, float(d.toordinal())) for d in set(dates))
+    fracs = dict(
+        (tm, (tm.hour / HOURS_PER_DAY, tm.minute / MINUTES_PER_DAY,
+              tm.second / SECONDS_PER_DAY, tm.microsecond / MUSECONDS_PER_DAY))
+        for tm in set(times))
+
+    exps = set(math.frexp(base)[1] for base in bases.values())
+    if len(exps) != 1:
+        hours, minutes, seconds, museconds = zip(*map(fracs.__getitem__, times))
+        return list(map(math.fsum, zip(map(bases.__getitem__, dates),
+                                       hours, minutes, seconds, museconds)))
+
+    # All ordinals (integers) are in the same binade [2**(e-1), 2**e) and are
+    # multiples of the spacing of the floats in it. The correctly rounded sum
+    # (fsum) of ordinal + fractions is therefore the ordinal plus the
+    # fractions rounded to that spacing, which is the same for any ordinal in
+    # the binade and can be calculated once per time with the lowest one
+    lowest = math.ldexp(0.5, exps.pop())
+    offsets = dict((tm, math.fsum((lowest,) + frac) - lowest)
+                   for tm, frac in fracs.items())
+
+    return list(map(operator.add, map(bases.__getitem__, dates),
+                    map(offsets.__getitem__, times)))
+
+
+EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+
+def npdate2nums(values):
+    """
+    Batch version of :func:`date2num` for a numpy ``datetime64`` array, whose
+    (naive) values are taken as UTC. The values are truncated to microseconds
+    (like ``to_pydatetime`` does) and converted to the floats which
+    :func:`date2num` delivers bit for bit.
+
+    Return value is a numpy ``float64`` array. Requires numpy.
+    """
+    import numpy as np  # keep the import very local
+
+    museconds = np.asarray(values).astype('datetime64[us]').astype('int64')
+    days, tms = np.divmod(museconds, int(MUSECONDS_PER_DAY))
+    bases = (days + EPOCH_ORDINAL).astype('float64')
+    if not len(bases):
+        return bases
+
+    # See date2nums: within a binade the offset of a time is the same for all
+    # ordinals. It is calculated per distinct time and binade
+    tms, tmidx = np.unique(tms, return_inverse=True)
+    fracs = []
+    for tm in tms.tolist():
+        second, museconds = divmod(tm, int(MUSECONDS_PER_SECOND))
+        minute, second = divmod(second, int(SECONDS_PER_MINUTE))
+        hour, minute = divmod(minute, int(MINUTES_PER_HOUR))
+        fracs.append((hour / HOURS_PER_DAY, minute / MINUTES_PER_DAY,
+                      second / SECONDS_PER_DAY, museconds / MUSECONDS_PER_DAY))
+
+    exps = np.frexp(bases)[1]
+    for exp in np.unique(exps).tolist():
+        lowest = math.ldexp(0.5, exp)
+        offsets = np.array([math.fsum((lowest,) + frac) - lowest
+                            for frac in fracs])
+        inbinade = exps == exp
+        bases[inbinade] += offsets[tmidx.reshape(-1)[inbinade]]
+
+    return bases
+
+
+def npepoch2nums(values, unit='s'):
+    """
+    Batch version of :func:`date2num` for an array of UTC epoch timestamps
+    in *unit* (``s``, ``ms``, ``us`` or ``ns``), integers or floats. Return
+    value is a numpy ``float64`` array. Requires numpy.
+    """
+    import numpy as np  # keep the import very local
+
+    values = np.asarray(values)
+    if values.dtype.kind in 'iu':
+        return npdate2nums(values.astype('datetime64[%s]' % unit))
+
+    tomuseconds = dict(s=1e6, ms=1e3, us=1.0, ns=1e-3)[unit]
+    museconds = np.floor(values * tomuseconds + 0.5).astype('int64')
+    return npdate2nums(museconds.astype('datetime64[us]'))
+
+
+def npnum2dates(nums, tz=None):
+    """
+    Batch version of :func:`num2date` for a sequence of floats. Return value
+    is a numpy ``datetime64[us]`` array with the (naive) datetimes which
+    :func:`num2date` delivers, in UTC or in the local time of *tz*. Requires
+    numpy.
+    """
+    import numpy as np  # keep the import very local
+
+    x = np.asarray(nums, dtype=np.float64)
+    ix = np.trunc(x)
+    remainder = x - ix
+    hour, remainder = np.divmod(HOURS_PER_DAY * remainder, 1)
+    minute, remainder = np.divmod(MINUTES_PER_HOUR * remainder, 1)
+    second, remainder = np.divmod(SECONDS_PER_MINUTE * remainder, 1)
+    museconds = np.trunc(MUSECONDS_PER_SECOND * remainder).astype('int64')
+    museconds[museconds < 10] = 0  # compensate for rounding errors
+    museconds[museconds > 999990] = int(MUSECONDS_PER_SECOND)  # idem
+
+    seconds = ((ix.astype('int64') - EPOCH_ORDINAL) * int(SECONDS_PER_DAY) +
+               (hour * MINUTES_PER_HOUR + minute).astype('int64') *
+               int(SECONDS_PER_MINUTE) + second.astype('int64'))
+
+    dts = (seconds * int(MUSECONDS_PER_SECOND) +
+           museconds).astype('datetime64[us]')
+    if tz is not None:
+        dts = dts + _npoffsets(tz, dts, local=False)
+
+    return dts
+
+
+def nplocal2nums(nums, tz):
+    """
+    Takes the floats in *nums* as local times of *tz* (like the face values
+    delivered by a data feed with ``tzinput``) and returns them as UTC
+    floats: bit for bit the values of ``date2num(num2date(x), tz=tz)``.
+    Return value is a numpy ``float64`` array. Requires numpy.
+    """
+    dts = npnum2dates(nums)
+    return npdate2nums(dts - _npoffsets(tz, dts, local=True))
+
+
+def _npoffsets(tz, dts, local):
+    # Returns the offsets (timedelta64[us]) of tz for the datetime64[us] dts
+    # using the offsets cached per day (see tzoffset)
+    import numpy as np  # keep the import very local
+
+    days, dayidx = np.unique(dts.astype('datetime64[D]'), return_inverse=True)
+    dayidx = dayidx.reshape(-1)
+    oneus = datetime.timedelta(microseconds=1)
+
+    dayoffsets = np.zeros(len(days), dtype='int64')
+    changing = list()
+    for i, day in enumerate(days.tolist()):
+        offset = _tzdayoffset(tz, day.toordinal(), local)
+        if offset is None:
+            changing.append(i)  # DST transition: looked up per datetime
+        else:
+            dayoffsets[i] = offset // oneus
+
+    offsets = dayoffsets[dayidx]
+    for i in changing:
+        inday = np.flatnonzero(dayidx == i)
+        offsets[inday] = [_tzoffset(tz, dt, local) // oneus
+                          for dt in dts[inday].tolist()]
+
+    return offsets.astype('timedelta64[us]')
+
+
 def time2num(tm):
     """
     Converts the hour/minute/second/microsecond part of tm (datetime.datetime
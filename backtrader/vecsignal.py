@@ -0,0 +1,505 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import backtrader as bt
+from backtrader import TimeFrame
+from backtrader.utils.py3 import range
+from backtrader import mathsupport
+from backtrader.mathsupport import np
+from backtrader.brokers import BackBroker
+from backtrader.comminfo import CommInfoBase
+from backtrader.sizers import FixedSize
+from backtrader.strategy import SignalStrategy
+from backtrader.trade import Trade
+from backtrader.utils import num2date
+
+
+__all__ = ['VecSignal']
+
+
+class VecSignal(object):
+    '''Vectorized execution of a ``SignalStrategy`` (see the parameter
+    ``vecsignals`` of ``Cerebro``)
+
+    The indicators and signals are calculated in ``runonce`` mode as usual.
+    Instead of moving the strategy, the broker and the analyzers bar by bar,
+    the market orders issued by the signals are filled at the ``open`` of the
+    next bar (or at the ``close`` of the bar of creation with
+    ``cheat-on-close``) in a single loop which only keeps the cash and the
+    position, using the ``CommInfoBase`` of the data for commissions,
+    margins and profit and loss. The value of the portfolio for each bar (the
+    equity curve) is calculated afterwards over the whole history and
+    delivered to the analyzers
+
+    The results are the same as those of ``BackBroker``, which is why the
+    engine is only used when the run can be reproduced (see ``supported``):
+
+      - A single data and a ``SignalStrategy`` which does not override
+        ``next`` (or ``prenext``, ``nextstart``) or the notification methods
+
+      - A ``FixedSize`` sizer and no observers (``stdstats=False``)
+
+      - Only the analyzers ``TimeReturn`` (with no ``data``), ``DrawDown``
+        and ``TradeAnalyzer``
+
+      - A ``BackBroker`` without filler, slippage, cheat-on-open, fund mode,
+        order/fund history or credit interest
+
+      - No timers, writers, trade history or ``cheat_on_open`` in cerebro
+
+    After the run the strategy has a ``vecsignal`` attribute with the engine,
+    which holds the ``value``, ``cash`` and position ``size`` for each bar
+    and the list of ``trades``. No ``Order`` instances are created
+    '''
+
+    # methods which would have to be called in the event loop
+    _STRATMETHODS = ('next', 'prenext', 'nextstart',
+                     'notify_order', 'notify_trade', 'notify_cashvalue',
+                     'notify_fund', 'notify_data', 'notify_store',
+                     'notify_timer')
+
+    # value of a signal for each of the states coded by _actions
+    _SIGSTATES = (0.0, 1.0, -1.0, float('NaN'))
+
+    # methods for which the value is calculated with array operations
+    _VECMETHODS = ('getvaluesize', 'profitandloss', 'cashadjust',
+                   'get_leverage')
+
+    def __init__(self, strategy):
+        self.strategy = strategy
+        self.broker = strategy.broker
+        self.data = strategy._dtarget
+        self.comminfo = self.broker.getcommissioninfo(self.data)
+
+        self.value = self.cash = self.size = None
+        self.trades = list()
+
+    def supported(self):
+        '''Returns ``True`` if the engine can reproduce the run of the
+        strategy'''
+        strat, broker, data = self.strategy, self.broker, self.data
+        cerebro = strat.cerebro
+
+        if (not isinstance(strat, SignalStrategy) or len(strat.datas) != 1 or
+                not data.buflen()):
+            return False
+
+        if hasattr(strat, '_next_custom') or any(
+                getattr(type(strat), name) is not getattr(SignalStrategy, name)
+                for name in self._STRATMETHODS):
+            return False
+
+        if (cerebro.p.cheat_on_open or cerebro._timers or
+                cerebro._timerscheat or cerebro.runwriters or
+                strat._tradehistoryon or strat.observers or
+                strat._slave_analyzers or data._compensate is not None or
+                type(strat.getsizer()) is not FixedSize):
+            return False
+
+        ans = bt.analyzers
+        for analyzer in strat.analyzers:
+            atype = type(analyzer)
+            if analyzer._children:
+                return False
+            elif atype is ans.TimeReturn:
+                if (analyzer.p.data is not None or analyzer.p.fund or
+                        not analyzer.p._doprenext):
+                    return False
+            elif atype is ans.DrawDown:
+                if analyzer.p.fund:
+                    return False
+            elif atype is not ans.TradeAnalyzer:
+                return False
+
+        p = broker.p
+        if (type(broker) is not BackBroker or p.filler is not None or
+                p.slip_perc or p.slip_fixed or p.coo or p.fundmode or
+                broker._fundhist or broker._userhist or
+                broker._cash_addition or broker.submitted or broker.pending):
+            return False
+
+        comminfo = self.comminfo
+        return not comminfo.p.interest and all(
+            getattr(type(comminfo), name) is getattr(CommInfoBase, name)
+            for name in ('get_credit_interest', '_get_credit_interest'))
+
+    def run(self):
+        '''Runs the strategy over all the bars of the data'''
+        strat, broker, data = self.strategy, self.broker, self.data
+        comminfo = self.comminfo
+        self.position = position = broker.positions[data]
+        self._cash = broker.cash
+        self._trade = None
+        self._tradeans = [a for a in strat.analyzers
+                          if isinstance(a, bt.analyzers.TradeAnalyzer)]
+
+        n = data.buflen()
+        opens, closes = data.open.array, data.close.array
+        self._dts = data.datetime.array
+        self._tz = data.lines.datetime._tz
+
+        actions = self._actions(n)
+        first = max(strat._minperiods) - 1
+        buysize = strat.getsizing(data, isbuy=True)
+        sellsize = strat.getsizing(data, isbuy=False)
+        coc, checksubmit = broker.p.coc, broker.p.checksubmit
+
+        vector = (mathsupport.npuse and np is not None and
+                  comminfo.stocklike and broker.p.shortcash and
+                  all(getattr(type(comminfo), name) is
+                      getattr(CommInfoBase, name)
+                      for name in self._VECMETHODS))
+
+        # state after the bars with executions (vector) or after each bar
+        states = [(0, self._cash, position.size, position.price)]
+        values = list()
+        sizes = list()  # (size) of the orders issued in the previous bar
+        for i in range(n):
+            if sizes:
+                if checksubmit:
+                    sizes = self._checksubmit(sizes, closes[i - 1])
+
+                price = closes[i - 1] if coc else opens[i]
+                for size in sizes:
+                    self._execute(size, price, i)
+
+                sizes = list()
+                if vector:
+                    states.append((i, self._cash, position.size,
+                                   position.price))
+
+            if not vector:
+                if position:  # futures change cash every bar
+                    self._cash += comminfo.cashadjust(position.size,
+                                                      position.adjbase,
+                                                      closes[i])
+                    position.adjbase = closes[i]
+
+                states.append((i, self._cash, position.size, position.price))
+                values.append(self._getvalue(closes[i]))
+
+            if i < first:
+                continue
+
+            for action in actions(i, position.size):
+                if not action:
+                    sizes.append(-position.size)
+                elif action > 0:
+                    if buysize:
+                        sizes.append(buysize)
+                elif sellsize:
+                    sizes.append(-sellsize)
+
+        if vector:
+            self._vecvalues(states, closes, n)
+        else:
+            self.value = values
+            self.cash = [state[1] for state in states[1:]]
+            self.size = [state[2] for state in states[1:]]
+
+        self._analyze(n)
+
+        # leave the data, the position and the broker where the run ends
+        data.advance(size=n - len(data), ticks=False)
+        if position:
+            position.adjbase = closes[n - 1]
+            position.datetime = data.datetime.datetime()
+
+        broker.cash = self._cash
+        broker._get_value()
+        strat._trades[data][0].extend(self.trades)
+        strat.vecsignal = self
+
+    def _actions(self, n):
+        # Returns a callable which gives the actions of the strategy (see
+        # SignalStrategy._signal_actions) for the bar i and the position size
+        strat = self.strategy
+        signals = [(sigtype, [sig.lines[0].array for sig in sigs])
+                   for sigtype, sigs in strat._signals.items() if sigs]
+
+        nsigs = sum(len(arrays) for _, arrays in signals)
+        if not mathsupport.npuse or np is None or nsigs > 30:
+            def actions(i, size):
+                sigvals = dict((sigtype, [array[i] for array in arrays])
+                               for sigtype, arrays in signals)
+                return strat._signal_actions(size, sigvals)
+
+            return actions
+
+        # The actions only depend on the sign of the size and on the state of
+        # each signal (0.0, > 0.0, < 0.0, NaN). The states of all the signals
+        # are coded in an integer per bar and the actions of each code and
+        # sign are calculated once
+        codes = np.zeros(n, dtype=np.int64)
+        base = 1
+        for _, arrays in signals:
+            for array in arrays:
+                vals = np.array(array[:n], dtype=float)
+                codes += base * np.select(
+                    [vals > 0.0, vals < 0.0, np.isnan(vals)], [1, 2, 3])
+                base *= 4
+
+        codes = codes.tolist()
+        memo = dict()
+
+        def actions(i, size):
+            key = (codes[i], (size > 0) - (size < 0))
+            acts = memo.get(key)
+            if acts is None:
+                code, sigvals = codes[i], dict()
+                for sigtype, arrays in signals:
+                    sigvals[sigtype] = vals = list()
+                    for _ in arrays:
+                        code, state = divmod(code, 4)
+                        vals.append(self._SIGSTATES[state])
+
+                acts = memo[key] = strat._signal_actions(size, sigvals)
+
+            return acts
+
+        return actions
+
+    def _checksubmit(self, sizes, price):
+        # As BackBroker.check_submitted: pseudo-execute the orders one after
+        # the other at the creation price to accept/reject them (margin)
+        cash = self._cash
+        position = self.position.clone()
+        accepted = list()
+        for size in sizes:
+            cash = self._execute(size, price, cash=cash, position=position)
+            if cash >= 0.0:
+                accepted.append(size)
+
+        return accepted
+
+    def _execute(self, size, price, bar=None, cash=None, position=None):
+        # Follows BackBroker._execute. bar = None is a pseudo-execution
+        comminfo = self.comminfo
+        shortcash = self.broker.p.shortcash
+
+        if bar is not None:
+            position = self.position
+            pprice_orig = position.price
+            psize, pprice, opened, closed = position.pseudoupdate(size, price)
+            pnl = comminfo.profitandloss(-closed, pprice_orig, price)
+            cash = self._cash
+        else:
+            pnl = 0
+            pprice_orig = price
+            psize, pprice, opened, closed = position.update(size, price)
+
+        if closed:
+            if shortcash:
+                closedvalue = comminfo.getvaluesize(-closed, pprice_orig)
+            else:
+                closedvalue = comminfo.getoperationcost(closed, pprice_orig)
+
+            closecash = closedvalue
+            if closedvalue > 0:  # long position closed
+                closecash /= comminfo.get_leverage()
+
+            cash += closecash + pnl * comminfo.stocklike
+            closedcomm = comminfo.getcommission(closed, price)
+            cash -= closedcomm
+
+            if bar is not None:
+                cash += comminfo.cashadjust(-closed, position.adjbase, price)
+                self._cash = cash
+        else:
+            closedcomm = 0.0
+
+        if opened:
+            if shortcash:
+                openedvalue = comminfo.getvaluesize(opened, price)
+            else:
+                openedvalue = comminfo.getoperationcost(opened, price)
+
+            opencash = openedvalue
+            if openedvalue > 0:  # long position being opened
+                opencash /= comminfo.get_leverage()
+
+            cash -= opencash
+            openedcomm = comminfo.getcommission(opened, price)
+            cash -= openedcomm
+
+            if cash < 0.0:  # not enough cash (margin)
+                opened = 0
+                openedcomm = 0.0
+
+            elif bar is not None:
+                if abs(psize) > abs(opened):
+                    cash += comminfo.cashadjust(psize - opened,
+                                                position.adjbase, price)
+
+                position.adjbase = price
+                self._cash = cash
+        else:
+            openedcomm = 0.0
+
+        if bar is None:
+            return cash
+
+        execsize = closed + opened
+        if execsize:
+            comminfo.confirmexec(execsize, price)
+            position.update(execsize, price,
+                            num2date(self._dts[bar], tz=self._tz))
+
+            if closed:
+                self._tradeupdate(closed, price, closedcomm, bar)
+            if opened:
+                self._tradeupdate(opened, price, openedcomm, bar, opening=True)
+
+    def _tradeupdate(self, size, price, commission, bar, opening=False):
+        # Follows Strategy._addnotification and Trade.update for an execution
+        # in the bar with index bar (the length of the data is bar + 1)
+        trade = self._trade
+        if trade is None or (opening and trade.isclosed):
+            self._trade = trade = Trade(data=self.data)
+            self.trades.append(trade)
+
+        trade.commission += commission
+
+        oldsize = trade.size
+        trade.size += size
+
+        trade.justopened = bool(not oldsize and size)
+        if trade.justopened:
+            trade.baropen = bar + 1
+            trade.dtopen = self._dts[bar]
+            trade.long = trade.size > 0
+
+        trade.isopen = bool(trade.size)
+        trade.barlen = bar + 1 - trade.baropen
+        trade.isclosed = bool(oldsize and not trade.size)
+
+        if trade.isclosed:
+            trade.isopen = False
+            trade.barclose = bar + 1
+            trade.dtclose = self._dts[bar]
+            trade.status = trade.Closed
+        elif trade.isopen:
+            trade.status = trade.Open
+
+        if abs(trade.size) > abs(oldsize):
+            trade.price = (oldsize * trade.price + size * price) / trade.size
+            pnl = 0.0
+        else:
+            pnl = self.comminfo.profitandloss(-size, trade.price, price)
+
+        trade.pnl += pnl
+        trade.pnlcomm = trade.pnl - trade.commission
+        trade.value = self.comminfo.getvaluesize(trade.size, trade.price)
+
+        if trade.isclosed or trade.justopened:
+            for analyzer in self._tradeans:
+                analyzer._notify_trade(trade)
+
+    def _getvalue(self, close):
+        # Follows BackBroker._get_value for a single data
+        comminfo, position = self.comminfo, self.position
+        if not self.broker.p.shortcash:
+            dvalue = abs(comminfo.getvalue(position, close))
+        else:
+            dvalue = comminfo.getvaluesize(position.size, close)
+
+        dunrealized = comminfo.profitandloss(position.size, position.price,
+                                             close)
+        if dvalue > 0:  # long position - unlever
+            dvalue -= dunrealized
+            return self._cash + (0.0 + dvalue / comminfo.get_leverage() +
+                                 dunrealized)
+
+        return self._cash + (0.0 + dvalue)
+
+    def _vecvalues(self, states, closes, n):
+        # The cash, size and price are constant between the bars with
+        # executions. Same operations as _getvalue over all the bars
+        bars, cash, size, price = zip(*states)
+        counts = np.diff(np.append(bars, n))
+        cash = np.repeat(cash, counts)
+        size = np.repeat(np.array(size, dtype=float), counts)
+        price = np.repeat(price, counts)
+        close = np.array(closes[:n], dtype=float)
+
+        dvalue = size * close
+        dunrealized = size * (close - price) * self.comminfo.p.mult
+        unlever = np.where(
+            dvalue > 0,
+            (dvalue - dunrealized) / self.comminfo.get_leverage() +
+            dunrealized,
+            dvalue)
+
+        self.value = cash + unlever
+        self.cash, self.size = cash, size
+
+    def _analyze(self, n):
+        strat = self.strategy
+        ans = bt.analyzers
+        values = self.value
+        if np is not None and isinstance(values, np.ndarray):
+            values = values.tolist()
+
+        for analyzer in strat.analyzers:
+            if isinstance(analyzer, ans.TimeReturn):
+                tz = strat.lines.datetime._tz
+                notf = analyzer.timeframe == TimeFrame.NoTimeFrame
+                for dt, value in zip(self._dts[:n], values):
+                    if analyzer._dt_over(None if notf else
+                                         num2date(dt, tz=tz)):
+                        analyzer.on_dt_over()
+
+                    analyzer._value = value
+                    analyzer.next()
+
+            elif isinstance(analyzer, ans.DrawDown):
+                if mathsupport.npuse and np is not None:
+                    self._drawdown(analyzer)
+                    continue
+
+                shares = self.broker._fundshares
+                for cash, value in zip(self.cash, values):
+                    analyzer.notify_fund(cash, value, value / shares, shares)
+                    analyzer.next()
+
+    def _drawdown(self, analyzer):
+        # DrawDown.next over all the values
+        values = np.asarray(self.value, dtype=float)
+        peaks = np.maximum.accumulate(values)
+        moneydown = peaks - values
+        drawdown = 100.0 * moneydown / peaks
+
+        # lengths of the streaks of bars in drawdown
+        flat = np.flatnonzero(drawdown == 0.0)
+        streaks = np.diff(np.concatenate(([-1], flat, [len(values)]))) - 1
+
+        r = analyzer.rets
+        r.moneydown = float(moneydown[-1])
+        r.drawdown = float(drawdown[-1])
+        r.max.moneydown = max(r.max.moneydown, float(moneydown.max()))
+        r.max.drawdown = max(r.max.drawdown, float(drawdown.max()))
+        r.len = int(streaks[-1])
+        r.max.len = max(r.max.len, int(streaks.max()))
+
+        analyzer._value = float(values[-1])
+        analyzer._maxvalue = float(peaks[-1])
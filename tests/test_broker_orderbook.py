@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import testcommon
+
+import backtrader as bt
+from backtrader.brokers.orderbook import OrderBook
+
+
+class LadderStrategy(bt.Strategy):
+    '''Rests buy limits and sell stops below the price (and the opposite
+    above) and records the bar in which each one is completed'''
+    offsets = (0.97, 0.95, 0.92, 0.90)
+
+    def __init__(self):
+        self.done = dict()
+        self.orders = list()
+
+    def notify_order(self, order):
+        if order.status == order.Completed:
+            self.done[order.ref] = len(self)
+
+    def next(self):
+        if len(self) != 1:
+            return
+
+        c = self.data.close[0]
+        for off in self.offsets:
+            self.orders.append(
+                self.buy(exectype=bt.Order.Limit, price=c * off))
+            self.orders.append(
+                self.sell(exectype=bt.Order.Stop, price=c * off))
+            self.orders.append(
+                self.sell(exectype=bt.Order.Limit, price=c * (2 - off)))
+            self.orders.append(
+                self.buy(exectype=bt.Order.Stop, price=c * (2 - off)))
+
+        # cancelled with a copy, the order is found by ref
+        self.cancel(self.orders[-1].clone())
+        self.opened = [o.ref for o in self.broker.get_orders_open()]
+
+
+def _expiry_check():
+    # An order removed and added again (its price is reached but it does not
+    # execute) has a single expiry entry and still expires
+    data = testcommon.getdata(0)
+    data.setenvironment(bt.Cerebro())
+    data._start()
+    data.preload()
+    data.home()
+    data.advance()
+
+    dt = data.datetime[0]
+    order = bt.BuyOrder(owner=None, data=data, size=1, price=1.0,
+                        exectype=bt.Order.Limit, valid=dt + 5,
+                        simulated=True)
+
+    book = OrderBook()
+    book.add(order)
+    for _ in range(10):
+        assert book.candidates(lambda d: (dt, 0.5, 2.0)) == [order]
+        book.add(order, book.remove(order))  # like the broker does
+
+    assert len(book._books[data][2]) == 1
+    assert book.candidates(lambda d: (dt + 6, 10.0, 20.0)) == [order]
+    assert not book._books[data][2]
+
+
+def test_run(main=False):
+    _expiry_check()
+
+    cerebro = bt.Cerebro(stdstats=False)
+    cerebro.broker.set_cash(1000000.0)
+    cerebro.broker.set_checksubmit(False)  # orders pending when issued
+    data = testcommon.getdata(0)
+    cerebro.adddata(data)
+    cerebro.addstrategy(LadderStrategy)
+    strat = cerebro.run()[0]
+
+    # first bar after the creation whose range reaches the price of the order
+    lows, highs = data.low.array, data.high.array
+    expected = dict()
+    for o in strat.orders[:-1]:
+        down = o.isbuy() == (o.exectype == bt.Order.Limit)
+        for i in range(1, len(lows)):
+            if (lows[i] <= o.created.price if down
+                    else highs[i] >= o.created.price):
+                expected[o.ref] = i + 1
+                break
+
+    if main:
+        print(sorted(strat.done.items()))
+
+    assert strat.opened == [o.ref for o in strat.orders[:-1]]
+    assert strat.done == expected
+    assert len(strat.broker.pending) == len(strat.orders) - 1 - len(expected)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
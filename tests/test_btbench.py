@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import json
+import os
+import tempfile
+
+import testcommon
+
+import backtrader as bt
+from backtrader.btbench.btbench import compare
+
+
+def test_run(main=False):
+    fd, path = tempfile.mkstemp(suffix='.json')
+    os.close(fd)
+    try:
+        ret = bt.btbench.btbench(
+            ['--bars', '500', '--repeat', '1', '--inprocess', '--quiet',
+             '--only', 'preload-csv', '--only', 'runonce-*',
+             '--output', path])
+        with open(path) as f:
+            current = json.load(f)
+    finally:
+        os.remove(path)
+
+    results = current['results']
+    if main:
+        print(json.dumps(results, indent=2))
+
+    assert ret == 0
+    assert list(results) == ['preload-csv', 'runonce-indicators']
+    for res in results.values():
+        assert res['bars'] == 500
+        assert res['bars_per_sec'] > 0.0
+
+    # a baseline twice as fast shows up as a regression
+    baseline = json.loads(json.dumps(current))
+    baseline['results']['preload-csv']['bars_per_sec'] *= 2.0
+    comparison = compare(baseline, current)
+    assert comparison['preload-csv']['status'] == 'regression'
+    assert comparison['runonce-indicators']['status'] == 'same'
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+
+import testcommon
+
+import backtrader as bt
+
+
+class ChunkedStrategy(bt.Strategy):
+    def __init__(self):
+        sma1, sma2 = bt.ind.SMA(period=10), bt.ind.SMA(period=30)
+        self.cross = bt.ind.CrossOver(sma1, sma2)
+        self.inds = [sma1, sma2, bt.ind.MACD(), bt.ind.RSI(), bt.ind.ZLInd(),
+                     self.data.close - self.data.open]
+        self.values = list()
+
+    def next(self):
+        self.values.append([len(self), self.data.datetime[0]] +
+                           [line[0] for ind in self.inds for line in ind.lines])
+
+        if self.cross[0] > 0:
+            self.buy()
+        elif self.cross[0] < 0:
+            self.close()
+
+
+def runchunks(ndatas=1, **kwargs):
+    cerebro = bt.Cerebro(**kwargs)
+    for i in range(ndatas):
+        cerebro.adddata(testcommon.getdata(0))
+
+    cerebro.addstrategy(ChunkedStrategy)
+    cerebro.addanalyzer(bt.analyzers.TradeAnalyzer)
+    strat = cerebro.run()[0]
+    return cerebro, strat
+
+
+def test_run(main=False):
+    # exact comparisons: the numpy calculations depend on the chunk limits
+    npuse = bt.mathsupport.npuse
+    bt.mathsupport.usenumpy(False)
+    try:
+        _, strat = runchunks()
+        for chunkbars in (1, 40, 100):
+            cerebro, cstrat = runchunks(exactbars=1, chunkbars=chunkbars)
+            if main:
+                print(chunkbars, cstrat._oncecarry(), cerebro.broker.getvalue())
+
+            assert cerebro._dochunks
+            assert str(cstrat.values) == str(strat.values)  # nan == nan
+            assert (cstrat.analyzers[0].get_analysis() ==
+                    strat.analyzers[0].get_analysis())
+
+            # only the values of the largest minimum period are kept
+            carry = cstrat._oncecarry()
+            assert carry == 34  # MACD
+            assert len(cstrat.data.close.array) == carry
+            assert len(cstrat.inds[0].lines[0].array) == carry
+            assert len(cstrat.data) == len(strat.data)
+    finally:
+        bt.mathsupport.usenumpy(npuse)
+
+    # several datas run with the standard exactbars scheme
+    cerebro, _ = runchunks(ndatas=2, exactbars=1, chunkbars=40)
+    assert not cerebro._dochunks
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import datetime
+import io
+import os.path
+
+import testcommon
+
+import backtrader as bt
+
+
+class ClockStrategy(bt.Strategy):
+    def __init__(self):
+        self.bars = list()
+
+    def next(self):
+        self.bars.append(
+            (self.datetime[0],) +
+            tuple((len(d), d.datetime[0], d.close[0]) for d in self.datas))
+
+
+def _run(runonce, preload):
+    cerebro = bt.Cerebro(stdstats=False, runonce=runonce, preload=preload)
+    # datas of different timeframes, starting and ending at different dates
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.adddata(testcommon.getdata(1))
+    cerebro.adddata(testcommon.getdata(
+        0, fromdate=datetime.datetime(2006, 3, 1)))
+    cerebro.adddata(testcommon.getdata(
+        0, todate=datetime.datetime(2006, 6, 30)))
+    cerebro.addstrategy(ClockStrategy)
+    return cerebro.run()[0].bars
+
+
+def _rundup(runonce, preload):
+    # every bar appears twice: equal timestamps in one data
+    datapath = os.path.join(testcommon.modpath, testcommon.dataspath,
+                            testcommon.datafiles[0])
+    with io.open(datapath, 'r') as f:
+        lines = f.readlines()
+
+    text = lines[0] + ''.join(line for line in lines[1:] for _ in range(2))
+    cerebro = bt.Cerebro(stdstats=False, runonce=runonce, preload=preload)
+    cerebro.adddata(bt.feeds.BacktraderCSVData(dataname=io.StringIO(text),
+                                               name='dup'))
+    cerebro.addstrategy(ClockStrategy)
+    return cerebro.run()[0].bars
+
+
+def test_run(main=False):
+    # preload=False fetches the bars from all datas and rewinds those
+    # which cannot deliver, as the reference for the clock heap
+    bars = _run(runonce=False, preload=False)
+    assert bars == _run(runonce=False, preload=True)
+    assert bars == _run(runonce=True, preload=True)
+    if main:
+        print(len(bars))
+
+    # no bar is skipped when a data repeats its datetime
+    bars = _rundup(runonce=False, preload=False)
+    assert len(bars) == 510
+    assert bars == _rundup(runonce=False, preload=True)
+    assert bars == _rundup(runonce=True, preload=True)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
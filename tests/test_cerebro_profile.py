@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+
+import testcommon
+
+import backtrader as bt
+
+
+class ProfiledStrategy(bt.Strategy):
+    def __init__(self):
+        bt.ind.CrossOver(bt.ind.SMA(period=10), bt.ind.SMA(period=30))
+
+    def next(self):
+        if not self.position:
+            self.buy()
+
+
+class FailingStrategy(bt.Strategy):
+    def next(self):
+        if len(self) == 5:
+            raise ValueError('failed')
+
+
+def test_run(main=False):
+    for runonce in (True, False):
+        cerebro = bt.Cerebro(runonce=runonce, profile=True)
+        data = testcommon.getdata(0)
+        cerebro.adddata(data)
+        cerebro.addstrategy(ProfiledStrategy)
+        strat = cerebro.run()[0]
+        profile = strat.profile
+
+        if main:
+            for name, stats in profile.items():
+                print(name, stats['calls'], stats['time'])
+
+        nbars = len(data)
+        assert profile['broker.next']['calls'] == nbars
+        assert profile['strategy._next_observers']['calls'] == nbars
+        assert profile['strategy._next_analyzers']['calls'] == nbars
+        assert profile['strategy.next']['calls'] == nbars - 30
+        stage = '_once' if runonce else '_next'
+        sma = profile['strategy.indicators.SMA#2.' + stage]
+        assert sma['calls'] == (1 if runonce else nbars)
+        assert sma['time'] > 0.0
+        assert 'strategy.indicators.CrossOver.CrossUp.' + stage in profile
+
+        # the instances are left untouched and a run without profile has
+        # no report
+        assert 'next' not in vars(data) and 'next' not in vars(strat)
+        cerebro = bt.Cerebro(runonce=runonce)
+        cerebro.adddata(data)
+        cerebro.addstrategy(ProfiledStrategy)
+        assert not hasattr(cerebro.run()[0], 'profile')
+
+        # a failed run does not leave the timed methods behind
+        cerebro = bt.Cerebro(runonce=runonce, profile=True)
+        cerebro.adddata(data)
+        cerebro.addstrategy(FailingStrategy)
+        try:
+            cerebro.run()
+        except ValueError:
+            pass
+        else:
+            assert False, 'the run should have failed'
+
+        assert 'next' not in vars(data)
+        assert 'next' not in vars(cerebro.getbroker())
+        assert '_next_writers' not in vars(cerebro)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import array
+import datetime
+import os
+import tempfile
+
+import testcommon
+
+import backtrader as bt
+from backtrader import mathsupport
+
+
+def _load(data, preload):
+    data.setenvironment(bt.Cerebro())
+    data._start()
+    if preload:
+        data.preload()
+    else:
+        while data.load():
+            pass
+
+        data.home()
+        data.stop()
+
+    return dict((alias, list(line.array))
+                for alias, line in zip(data.getlinealiases(), data.lines))
+
+
+def test_run(main=False):
+    kwargs = dict(fromdate=datetime.datetime(2006, 3, 1),
+                  todate=datetime.datetime(2006, 6, 30))
+    bars = _load(testcommon.getdata(0), True)
+    expected = _load(testcommon.getdata(0, **kwargs), True)
+
+    fd, path = tempfile.mkstemp(suffix='.btbin')
+    os.close(fd)
+    try:
+        for valuesize in (8, 4):
+            bt.feeds.writebinary(path, bars, bt.TimeFrame.Days, 1,
+                                 symbol='2006-day-001', valuesize=valuesize)
+
+            for npuse, preload in ((True, True), (False, True), (True, False)):
+                mathsupport.usenumpy(npuse)
+                try:
+                    data = bt.feeds.BacktraderBinaryData(dataname=path,
+                                                         **kwargs)
+                    lines = _load(data, preload)
+                finally:
+                    mathsupport.usenumpy(True)
+
+                if main:
+                    print(valuesize, npuse, preload, len(lines['datetime']))
+
+                assert data._name == '2006-day-001'
+                assert data._timeframe == bt.TimeFrame.Days
+                for alias, values in expected.items():
+                    if valuesize == 4 and alias != 'datetime':
+                        values = list(array.array(str('f'), values))
+
+                    assert lines[alias] == values
+
+        # given timeframe/compression prevail over those of the header
+        data = bt.feeds.BacktraderBinaryData(
+            dataname=path, timeframe=bt.TimeFrame.Minutes, compression=5)
+        _load(data, True)
+        assert data._timeframe == bt.TimeFrame.Minutes
+        assert data._compression == 5
+    finally:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
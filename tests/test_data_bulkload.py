@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import os.path
+
+import testcommon
+
+import backtrader as bt
+
+
+def test_run(main=False):
+    daypath = os.path.join(testcommon.modpath, testcommon.dataspath,
+                           '2006-day-001.txt')
+    minpath = os.path.join(testcommon.modpath, testcommon.dataspath,
+                           '2006-min-005.txt')
+
+    check = testcommon.checkbulkload
+    check(bt.feeds.BacktraderCSVData, main=main, dataname=daypath,
+          fromdate=testcommon.FROMDATE, todate=testcommon.TODATE)
+
+    check(bt.feeds.BacktraderCSVData, main=main, dataname=minpath,
+          fromdate=testcommon.FROMDATE.replace(month=1, day=3),
+          todate=testcommon.TODATE.replace(month=1, day=5))
+
+    check(bt.feeds.GenericCSVData, main=main, dataname=daypath,
+          dtformat='%Y-%m-%d')
+
+    check(bt.feeds.GenericCSVData, main=main, dataname=minpath,
+          dtformat='%Y-%m-%d', tmformat='%H:%M:%S', time=1,
+          open=2, high=3, low=4, close=5, volume=6, openinterest=-1,
+          timeframe=bt.TimeFrame.Minutes, nullvalue=0.0)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import os
+import shutil
+import tempfile
+
+import testcommon
+
+import backtrader as bt
+
+
+def _noparsing():
+    raise AssertionError('bars should have come from the cache')
+
+
+def _preload(cachedir, cached=False, **kwargs):
+    data = testcommon.getdata(0, **kwargs)
+    data.p.cachedir = cachedir
+    if cached:
+        data._preload = _noparsing
+
+    data.setenvironment(bt.Cerebro())
+    data._start()
+    data.preload()
+    return [list(line.array) for line in data.lines]
+
+
+def test_run(main=False):
+    cachedir = tempfile.mkdtemp()
+    try:
+        nocache = _preload(None)
+        first = _preload(cachedir)
+        files = os.listdir(cachedir)
+        assert len(files) == 1
+
+        second = _preload(cachedir, cached=True)
+        assert len(os.listdir(cachedir)) == 1
+        assert nocache == first == second
+
+        if main:
+            print('cache files', files, 'bars', len(second[0]))
+
+        # different params ... different cache entry
+        fromdate = testcommon.FROMDATE.replace(month=6)
+        other = _preload(cachedir, fromdate=fromdate)
+        assert len(os.listdir(cachedir)) == 2
+        assert other == _preload(None, fromdate=fromdate)
+        assert other != second
+
+    finally:
+        shutil.rmtree(cachedir)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import pickle
+import shutil
+import sys
+import tempfile
+
+import testcommon
+
+import backtrader as bt
+
+
+class RunStrategy(bt.Strategy):
+    def __init__(self):
+        self.sma = bt.indicators.SMA(self.data, period=15)
+        self.mapped = self.data.close._mapsrc is not None
+        self.values = list()
+
+    def next(self):
+        self.values.append((self.data.close[0], self.sma[0]))
+
+
+def _run(cachedir, runonce):
+    cerebro = bt.Cerebro(runonce=runonce)
+    data = testcommon.getdata(0)
+    data.p.cachedir = cachedir
+    data.p.cachemap = cachedir is not None
+    cerebro.adddata(data)
+    cerebro.addstrategy(RunStrategy)
+    strat = cerebro.run()[0]
+    return strat.mapped, strat.values
+
+
+def test_run(main=False):
+    cachedir = tempfile.mkdtemp()
+    try:
+        _run(cachedir, True)  # create the cache file
+        domap = sys.byteorder == 'little'
+        for runonce in [True, False]:
+            mapped, values = _run(cachedir, runonce)
+            assert mapped == domap
+            assert values == _run(None, runonce)[1]
+
+            if main:
+                print('runonce', runonce, 'mapped', mapped,
+                      'bars', len(values))
+
+        # pickling a mapped line transfers the mapping and not the values
+        data = testcommon.getdata(0)
+        data.p.cachedir = cachedir
+        data.p.cachemap = True
+        data.setenvironment(bt.Cerebro())
+        data._start()
+        data.preload()
+
+        close = data.close
+        line = bt.LineBuffer()
+        line.mapfile(*close._mapsrc[1])
+        pickled = pickle.dumps(line)
+        assert len(pickled) < len(close.array) * 8
+        unpickled = pickle.loads(pickled)
+        assert unpickled._mapsrc == close._mapsrc
+        assert list(unpickled.array) == list(close.array)
+
+        # enlarging the buffer moves the values to private memory
+        unpickled.forward()
+        assert unpickled._mapsrc is None
+        assert list(unpickled.array[:-1]) == list(close.array)
+
+    finally:
+        shutil.rmtree(cachedir)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
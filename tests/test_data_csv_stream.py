@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import io
+import os
+import os.path
+import threading
+
+import testcommon
+
+import backtrader as bt
+
+
+def _load(data, preload):
+    data.setenvironment(bt.Cerebro())
+    data._start()
+    if preload:
+        data.preload()
+    else:
+        while data.load():
+            pass
+
+        data.home()
+        data.stop()
+
+    return [list(line.array) for line in data.lines]
+
+
+def _pipeload(text):
+    # The writer delivers the headers and a line and waits for the bar before
+    # writing the rest: reading in blocks would wait for the rest
+    lines = text.splitlines(True)
+    rfd, wfd = os.pipe()
+    loaded = threading.Event()
+    waited = list()
+
+    def writer():
+        with io.open(wfd, 'w') as f:
+            f.writelines(lines[:2])
+            f.flush()
+            waited.append(loaded.wait(10))
+            f.writelines(lines[2:])
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    try:
+        data = bt.feeds.BacktraderCSVData(dataname=io.open(rfd, 'r'),
+                                          name='pipe')
+        data.setenvironment(bt.Cerebro())
+        data._start()
+        assert data.load()
+        loaded.set()
+        while data.load():
+            pass
+
+        data.home()
+        data.stop()
+    finally:
+        loaded.set()
+        thread.join()
+
+    assert waited == [True]  # the 1st bar was delivered before the rest
+    return [list(line.array) for line in data.lines]
+
+
+def test_run(main=False):
+    datapath = os.path.join(testcommon.modpath, testcommon.dataspath,
+                            testcommon.datafiles[0])
+    with io.open(datapath, 'r') as f:
+        text = f.read().rstrip('\n')  # an incomplete last line
+
+    feeds = (
+        (bt.feeds.BacktraderCSVData, dict()),
+        (bt.feeds.GenericCSVData, dict(dtformat='%Y-%m-%d')),
+    )
+
+    for datacls, kwargs in feeds:
+        expected = _load(datacls(dataname=datapath, **kwargs), True)
+
+        # row by row, bulk parsed blocks and blocks cut amid the lines
+        for streamkw in (dict(bulkload=False), dict(),
+                         dict(chunksize=37), dict(bulkload=False,
+                                                  chunksize=37)):
+            for dataname in (datapath, io.StringIO(text)):
+                data = datacls(dataname=dataname, name='stream',
+                               **dict(kwargs, **streamkw))
+                lines = _load(data, False)
+                if main:
+                    print(datacls.__name__, streamkw, len(lines[0]))
+
+                assert lines == expected
+
+    expected = _load(bt.feeds.BacktraderCSVData(dataname=datapath), True)
+    assert _pipeload(text) == expected
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import datetime
+
+import testcommon
+
+import backtrader as bt
+from backtrader import mathsupport
+
+try:
+    import pandas
+except ImportError:
+    pandas = None
+
+
+def test_run(main=False):
+    np = mathsupport.np
+    if np is None:
+        testcommon.skiptest('numpy (and pandas) not available')
+
+    # the vectorized conversion delivers the values of date2num
+    dts = [datetime.datetime(2006, 1, 2) +
+           datetime.timedelta(minutes=5 * i, microseconds=i)
+           for i in range(5000)]
+    dts.append(datetime.datetime(1, 1, 1, 23, 59, 59, 999999))
+    dtnums = bt.utils.npdate2nums(np.array(dts, dtype='datetime64[us]'))
+    assert dtnums.tolist() == [bt.date2num(dt) for dt in dts]
+
+    if pandas is None:
+        testcommon.skiptest('pandas not available')
+
+    data = testcommon.getdata(0)
+    data.setenvironment(bt.Cerebro())
+    data._start()
+    data.preload()
+
+    fields = ['open', 'high', 'low', 'close', 'volume']
+    df = pandas.DataFrame(
+        dict((f.capitalize(), list(getattr(data.lines, f).array))
+             for f in fields),
+        index=pandas.DatetimeIndex(
+            [bt.num2date(dt) for dt in data.datetime.array]))
+
+    check = testcommon.checkbulkload
+    check(bt.feeds.PandasData, main=main, dataname=df)
+    check(bt.feeds.PandasData, main=main, dataname=df,
+          fromdate=datetime.datetime(2006, 3, 1),
+          todate=datetime.datetime(2006, 6, 30))
+    check(bt.feeds.PandasData, main=main, dataname=df.reset_index(),
+          datetime='index', openinterest=None)
+    check(bt.feeds.PandasDirectData, main=main, dataname=df,
+          openinterest=-1)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import datetime
+import math
+
+import testcommon
+
+import backtrader as bt
+from backtrader import mathsupport
+
+
+def _nan(values):
+    # nan != nan ... replace it for the comparison
+    return ['nan' if math.isnan(x) else x for x in values]
+
+
+class TradeStrategy(bt.Strategy):
+    '''Buys/sells a symbol with a crossover of the close and a moving
+    average. The symbol is either the 1st data or the symbol of a panel'''
+    params = (('symbol', None),)
+
+    def __init__(self):
+        if self.p.symbol is None:
+            self.target = self.data
+        else:
+            self.target = self.panel.getdata(self.p.symbol)
+
+        self.sma = bt.ind.SMA(self.target, period=15)
+
+    def next(self):
+        if not self.getposition(self.target):
+            if self.target.close[0] > self.sma[0]:
+                self.buy(data=self.target)
+        elif self.target.close[0] < self.sma[0]:
+            self.close(data=self.target)
+
+    def stop(self):
+        self.value = self.broker.getvalue()
+
+
+class PanelStrategy(bt.Strategy):
+    def __init__(self):
+        self.sma = bt.ind.PanelSMA(self.panel.close, period=5)
+        self.rank = bt.ind.PanelRank(self.sma)
+        self.zscore = bt.ind.PanelZScore(self.panel.close)
+        self.values = list()
+
+    def next(self):
+        self.values.append([_nan(f[0]) for f in
+                            (self.panel.close, self.sma, self.rank,
+                             self.zscore)])
+
+
+def _getpanel():
+    return bt.feeds.PanelData(dataname=dict(
+        day=testcommon.getdata(0),
+        late=testcommon.getdata(0, fromdate=datetime.datetime(2006, 3, 1)),
+        week=testcommon.getdata(1),
+    ))
+
+
+def _runpanel(numpy):
+    mathsupport.usenumpy(numpy)
+    try:
+        cerebro = bt.Cerebro(stdstats=False)
+        cerebro.adddata(_getpanel())
+        cerebro.addstrategy(PanelStrategy)
+        return cerebro.run()[0]
+    finally:
+        mathsupport.usenumpy(True)
+
+
+def _runtrade(panel):
+    cerebro = bt.Cerebro()
+    if panel:
+        cerebro.adddata(_getpanel())
+        cerebro.addstrategy(TradeStrategy, symbol='day')
+    else:
+        cerebro.adddata(testcommon.getdata(0))
+        cerebro.addstrategy(TradeStrategy)
+
+    return cerebro.run()[0]
+
+
+def test_run(main=False):
+    strat = _runpanel(numpy=False)
+    npstrat = _runpanel(numpy=True)
+    assert strat.values == npstrat.values
+
+    panel = strat.panel
+    assert panel.symbols == ['day', 'late', 'week']
+    assert len(strat.values) == panel.nbars == 255  # daily bars cover all
+
+    # closes at the start of March: late starts, week only on fridays with
+    # the previous close in between
+    day, late, week = (panel.close.column(s) for s in panel.symbols)
+    assert math.isnan(late[0]) and not math.isnan(late[-1])
+    first = next(i for i, x in enumerate(late) if not math.isnan(x))
+    assert late[first] == day[first]
+    assert week[1:10].tolist().count(week[5]) > 1
+
+    # a symbol of the panel trades like the same data added on its own
+    tstrat = _runtrade(panel=False)
+    pstrat = _runtrade(panel=True)
+    assert tstrat.value == pstrat.value != 10000.0
+
+    if main:
+        print(pstrat.value, strat.values[-1])
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import datetime
+import os.path
+import shutil
+import tempfile
+
+import testcommon
+
+import backtrader as bt
+
+try:
+    import pyarrow
+    import pyarrow.feather
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+def _load(data, preload):
+    data.setenvironment(bt.Cerebro())
+    data._start()
+    if preload:
+        data.preload()
+    else:
+        while data.load():
+            pass
+
+        data.home()
+
+    return [list(line.array) for line in data.lines]
+
+
+def test_run(main=False):
+    if pyarrow is None:
+        testcommon.skiptest('pyarrow not available')
+
+    csvdata = testcommon.getdata(0)
+    kwargs = dict(fromdate=datetime.datetime(2006, 3, 1),
+                  todate=datetime.datetime(2006, 6, 30))
+    expected = _load(testcommon.getdata(0, **kwargs), True)
+
+    fields = ['datetime', 'open', 'high', 'low', 'close', 'volume']
+    csvlines = _load(csvdata, True)
+    cols = dict((f, csvlines[csvdata.getlinealiases().index(f)])
+                for f in fields)
+    cols['datetime'] = [bt.num2date(dt) for dt in cols['datetime']]
+    table = pyarrow.table(cols)
+
+    tmpdir = tempfile.mkdtemp()
+    try:
+        pqpath = os.path.join(tmpdir, 'bars.parquet')
+        pyarrow.parquet.write_table(table, pqpath, row_group_size=50)
+        ipcpath = os.path.join(tmpdir, 'bars.arrow')
+        pyarrow.feather.write_feather(table, ipcpath)
+
+        for dataname in (pqpath, ipcpath, table):
+            for preload in (True, False):
+                data = bt.feeds.ParquetData(dataname=dataname, batchsize=32,
+                                            **kwargs)
+                lines = _load(data, preload)
+                if main:
+                    print(type(dataname).__name__, preload, len(lines[0]))
+
+                for alias, values, expvalues in zip(
+                        data.getlinealiases(), lines, expected):
+                    if alias in fields:
+                        assert values == expvalues
+                    else:  # no column in the table: left as NaN
+                        assert all(value != value for value in values)
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
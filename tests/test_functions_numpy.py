@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import math
+
+import testcommon
+
+import backtrader as bt
+from backtrader import mathsupport
+
+
+class RunStrategy(bt.Strategy):
+    def __init__(self):
+        d = self.data
+        diff = d.close - d.open
+        zero = bt.If(diff > 0, diff, 0.0)  # holds zeros
+        sma = bt.ind.Highest(d.close, period=30)  # nans at the start
+        self.ops = [
+            bt.DivByZero(d.close, zero),
+            bt.DivByZero(zero, zero, zero=-1.0),
+            bt.DivZeroByZero(d.close, zero),
+            bt.DivZeroByZero(zero, zero, single=5.0, dual=-5.0),
+            bt.Cmp(d.close, sma),
+            bt.CmpEx(d.close, d.open, d.high, d.low, sma),
+            bt.If(sma, d.close, 0.0),
+            bt.If(d.close > sma, d.high, d.low),
+            bt.And(d.close > d.open, sma, zero),
+            bt.Or(d.close > d.open, sma),
+            bt.Or(zero),
+            bt.Max(sma, d.close, d.open),
+            bt.Max(d.close, sma),
+            bt.Min(sma, d.close, 4000.0),
+            bt.Min(d.low, sma),
+            bt.Sum(d.close, d.open),
+            bt.Sum(d.close, d.open, d.high),
+            bt.Any(zero, d.close < d.open),
+            bt.All(sma, zero),
+        ]
+
+
+def _run(numpy):
+    mathsupport.usenumpy(numpy)
+    try:
+        cerebro = bt.Cerebro(stdstats=False)
+        cerebro.adddata(testcommon.getdata(0))
+        cerebro.addstrategy(RunStrategy)
+        strat = cerebro.run()[0]
+    finally:
+        mathsupport.usenumpy(True)
+
+    # nan != nan ... replace it for the comparison
+    return [['nan' if math.isnan(x) else x for x in op.array]
+            for op in strat.ops]
+
+
+def test_run(main=False):
+    python = _run(False)
+    numpy = _run(True)
+    for i, (pvals, nvals) in enumerate(zip(python, numpy)):
+        assert pvals == nvals, 'operation %d differs' % i
+
+    if main:
+        print('numpy active', mathsupport.np is not None, 'results equal')
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import datetime
+import io
+import math
+
+import testcommon
+
+import backtrader as bt
+from backtrader import mathsupport
+
+
+class RunStrategy(bt.Strategy):
+    def __init__(self):
+        self.inds = [
+            bt.ind.SMA(period=30),
+            bt.ind.EMA(period=30),
+            bt.ind.SMMA(period=14),
+            bt.ind.WMA(period=10),
+            bt.ind.SumN(self.data.volume, period=10),
+            bt.ind.Highest(self.data.high, period=14),
+            bt.ind.Lowest(self.data.low, period=14),
+            bt.ind.FindFirstIndexHighest(self.data.high, period=10),
+            bt.ind.FindFirstIndexLowest(self.data.low, period=10),
+            bt.ind.FindLastIndexHighest(self.data.high, period=10),
+            bt.ind.FindLastIndexLowest(self.data.low, period=10),
+            bt.ind.Accum(self.data.close),
+            bt.ind.BollingerBands(),
+            bt.ind.Stochastic(),
+            bt.ind.MACD(),
+        ]
+
+
+class FlatStrategy(bt.Strategy):
+    def __init__(self):
+        self.inds = [
+            bt.ind.SMA(period=3),
+            bt.ind.SumN(self.data.close, period=20),
+            bt.ind.StdDev(period=20),
+        ]
+
+
+def _flatdata():
+    # A long series of flat stretches: exact zeros in the deviations
+    dt = datetime.date(1960, 1, 1)
+    rows = ['Date,Open,High,Low,Close,Volume,OpenInterest']
+    for i in range(15000):
+        price = '%.2f' % (100.1 + (i // 50 % 7) * 0.37)
+        rows.append(','.join([(dt + datetime.timedelta(days=i)).isoformat()] +
+                             [price] * 4 + ['1000', '0']))
+
+    return bt.feeds.BacktraderCSVData(dataname=io.StringIO('\n'.join(rows)),
+                                      name='flat')
+
+
+def _runflat(numpy, runonce):
+    mathsupport.usenumpy(numpy)
+    try:
+        cerebro = bt.Cerebro(stdstats=False, runonce=runonce)
+        cerebro.adddata(_flatdata())
+        cerebro.addstrategy(FlatStrategy)
+        strat = cerebro.run()[0]
+    finally:
+        mathsupport.usenumpy(True)
+
+    # str: NaN == NaN
+    return [str([list(line.array) for line in ind.lines])
+            for ind in strat.inds]
+
+
+def _run(numpy):
+    mathsupport.usenumpy(numpy)
+    try:
+        cerebro = bt.Cerebro(stdstats=False)
+        cerebro.adddata(testcommon.getdata(0))
+        cerebro.addstrategy(RunStrategy)
+        strat = cerebro.run()[0]
+    finally:
+        mathsupport.usenumpy(True)
+
+    return [[list(line.array) for line in ind.lines] for ind in strat.inds]
+
+
+def test_run(main=False):
+    python = _run(False)
+    numpy = _run(True)
+
+    maxdiff = 0.0
+    for pind, nind in zip(python, numpy):
+        for pline, nline in zip(pind, nind):
+            assert len(pline) == len(nline)
+            for pval, nval in zip(pline, nline):
+                if math.isnan(pval):
+                    assert math.isnan(nval)
+                    continue
+
+                diff = abs(pval - nval) / max(1.0, abs(pval))
+                maxdiff = max(maxdiff, diff)
+
+    assert maxdiff < 1e-9
+
+    # the window sums are those of math.fsum, whatever the length of the
+    # series: the same values as the python loops and as next
+    flat = _runflat(False, True)
+    assert _runflat(True, True) == flat
+    assert _runflat(True, False) == flat
+
+    if main:
+        print('numpy kernels active', mathsupport.np is not None,
+              'max relative difference', maxdiff)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import testcommon
+
+import backtrader as bt
+
+
+class CountedSMA(bt.indicators.SMA):
+    calls = 0
+
+    def once(self, start, end):
+        if end - start > 1:  # skip the call from oncestart
+            CountedSMA.calls += 1
+
+        super(CountedSMA, self).once(start, end)
+
+
+class OnceCacheStrategy(bt.Strategy):
+    params = (('fast', 5), ('slow', 20),)
+
+    def __init__(self):
+        fast = CountedSMA(self.data, period=self.p.fast)
+        slow = CountedSMA(self.data, period=self.p.slow)
+        self.cross = bt.indicators.CrossOver(fast, slow)
+        self.macd = bt.indicators.MACD(self.data.close)
+        self.values = list()
+
+    def next(self):
+        self.values.append((self.cross[0], self.macd.signal[0],
+                            self.macd.macd[0]))
+        if self.cross > 0:
+            self.buy()
+        elif self.cross < 0:
+            self.close()
+
+    def stop(self):
+        self.value = self.broker.getvalue()
+
+
+def _run(indcache, maxcpus=1):
+    CountedSMA.calls = 0
+    cerebro = bt.Cerebro(indcache=indcache, maxcpus=maxcpus, optreturn=False)
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.optstrategy(OnceCacheStrategy, fast=[5, 10], slow=[20, 30, 40])
+    results = cerebro.run()
+    values = [(r[0].p.fast, r[0].p.slow, r[0].value,
+               r[0].values) for r in results]
+    return values, CountedSMA.calls
+
+
+def test_run(main=False):
+    nocache, nocalls = _run(False)
+    cached, calls = _run(True)
+    assert nocalls == 12
+    assert calls == 5  # 2 fast + 3 slow
+    assert cached == nocache
+
+    cached, _ = _run(True, maxcpus=2)
+    assert cached == nocache
+
+    if main:
+        print('sma calculations', nocalls, '->', calls)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import testcommon
+
+import backtrader as bt
+from backtrader.linebuffer import LineBuffer
+
+
+class WindowStrategy(bt.Strategy):
+    params = (('period', 100),)
+
+    def __init__(self):
+        self.sma = bt.ind.SMA(period=self.p.period)
+        self.highest = bt.ind.Highest(period=self.p.period)
+        self.values = list()
+        self.sizes = set()
+
+    def next(self):
+        self.values.append((self.sma[0], self.highest[0],
+                            self.data.close[-(self.p.period - 1)]))
+        self.sizes.add(len(self.data.close.array))
+
+
+def runstrat(**kwargs):
+    cerebro = bt.Cerebro(stdstats=False, **kwargs)
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.addstrategy(WindowStrategy)
+    return cerebro.run()[0]
+
+
+def test_run(main=False):
+    # the values dropped in blocks are counted and the window is kept
+    lb = LineBuffer()
+    lb._minperiod = 30
+    lb.qbuffer()
+    for i in range(1000):
+        lb.forward()
+        lb[0] = i
+
+    assert len(lb) == lb.buflen() == 1000
+    assert len(lb.array) < lb.qlimit
+    assert list(lb.get(size=30)) == list(range(970, 1000))
+    assert lb[-29] == 970
+
+    strat = runstrat(runonce=False)
+    qstrat = runstrat(exactbars=1)
+
+    if main:
+        print(len(qstrat.values), min(qstrat.sizes), max(qstrat.sizes))
+
+    assert qstrat.values == strat.values
+    assert max(qstrat.sizes) < qstrat.data.close.qlimit < len(strat.data)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
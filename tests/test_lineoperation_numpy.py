@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import math
+
+import testcommon
+
+import backtrader as bt
+from backtrader import mathsupport
+
+
+class RunStrategy(bt.Strategy):
+    params = (('divzero', False),)
+
+    def __init__(self):
+        d = self.data
+        self.ops = [
+            d.close - d.open,
+            (d.high + d.low) / 2.0,
+            d.close * 2,
+            2 - d.close,
+            10.0 / d.close,
+            d.close // 3,
+            d.close > d.open,
+            d.close <= 4000,
+            d.close != d.open,
+            abs(d.close - d.open),
+            -d.close,
+            d.close ** 2,
+            d.volume / (d.high - d.low),
+        ]
+
+        if self.p.divzero:
+            self.ops.append(d.close / (d.close - d.close))
+
+
+def _run(numpy, **kwargs):
+    mathsupport.usenumpy(numpy)
+    try:
+        cerebro = bt.Cerebro(stdstats=False)
+        cerebro.adddata(testcommon.getdata(0))
+        cerebro.addstrategy(RunStrategy, **kwargs)
+        strat = cerebro.run()[0]
+    finally:
+        mathsupport.usenumpy(True)
+
+    # nan != nan ... replace it for the comparison
+    return [['nan' if math.isnan(x) else x for x in op.array]
+            for op in strat.ops]
+
+
+def test_run(main=False):
+    assert _run(False) == _run(True)
+
+    # the vectorized path must not hide a division by zero
+    for numpy in [False, True]:
+        try:
+            _run(numpy, divzero=True)
+        except ZeroDivisionError:
+            pass
+        else:
+            assert False, 'ZeroDivisionError expected'
+
+    if main:
+        print('numpy active', mathsupport.np is not None, 'results equal')
+
+
+if __name__ == '__main__':
+    test_run(main=True)
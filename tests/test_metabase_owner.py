@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import testcommon
+
+import backtrader as bt
+from backtrader import metabase
+
+
+class Spread(bt.Indicator):
+    lines = ('spread',)
+
+    def __init__(self):
+        self.sma = bt.ind.SMA(self.data, period=5)
+        self.l.spread = self.data - self.sma
+
+
+class Maker(bt.Indicator):
+    lines = ('maker',)
+
+    def __init__(self):
+        self.l.maker = self.data + 0.0
+
+    def make(self):
+        # created by the code of this indicator, during the construction of
+        # the strategy
+        return bt.ind.SMA(self.data, period=3)
+
+
+class Failing(bt.Indicator):
+    lines = ('fail',)
+
+    def __init__(self):
+        bt.ind.SMA(self.data, period=5)
+        raise ValueError('failed')
+
+
+class OwnerStrategy(bt.Strategy):
+    def __init__(self):
+        self.spread = Spread(self.data)
+        self.delayed = self.data.close(-1)
+        self.cmp = self.data.close > self.spread
+        self.maker = Maker(self.data)
+        self.made = self.maker.make()
+
+        try:
+            Failing(self.data)
+        except ValueError:
+            self.failed = True
+
+        self.constructing = list(metabase._constructing())
+
+
+def test_run(main=False):
+    cerebro = bt.Cerebro(stdstats=False)
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.addstrategy(OwnerStrategy)
+    strat = cerebro.run()[0]
+
+    assert strat.env is cerebro
+    assert strat.spread._owner is strat
+    assert strat.spread.sma._owner is strat.spread
+    assert strat.delayed._owner is strat  # not the data which is called
+    assert strat.cmp._owner is strat
+    assert strat.maker._owner is strat
+    assert strat.made._owner is strat.maker  # not the strategy
+
+    # the failed construction does not leave itself as a possible owner
+    assert strat.failed
+    assert strat.constructing == [strat]
+    assert not metabase._constructing() and not metabase._creators()
+
+    # only given plotinfo values are set in the instance
+    sma = bt.ind.SMA(strat.data, plotname='mysma')
+    assert sma.plotinfo.plotname == 'mysma'
+    assert sma.plotinfo.subplot is False
+
+    if main:
+        print(strat.spread.spread[0])
+
+
+if __name__ == '__main__':
+    test_run(main=True)
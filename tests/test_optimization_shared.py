@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import gc
+import sys
+
+import testcommon
+
+import backtrader as bt
+from backtrader import linebuffer
+
+
+class SmaSum(bt.Analyzer):
+    def start(self):
+        self.rets['sum'] = 0.0
+        mapsrc = self.data.close._mapsrc
+        self.rets['mapping'] = mapsrc[0] if mapsrc else None
+
+    def prenext(self):
+        pass  # sma not yet producing values
+
+    def next(self):
+        self.rets['sum'] += self.strategy.sma[0]
+
+
+class RunStrategy(bt.Strategy):
+    params = (('period', 15),)
+
+    def __init__(self):
+        self.sma = bt.indicators.SMA(self.data, period=self.p.period)
+
+
+class SharedFullStrategy(RunStrategy):
+    pass  # unique name: the class of its lines is pickled with it
+
+
+def _run(maxcpus, optshared=True):
+    cerebro = bt.Cerebro(maxcpus=maxcpus, optshared=optshared)
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.optstrategy(RunStrategy, period=range(10, 20))
+    cerebro.addanalyzer(SmaSum, _name='smasum')
+    results = cerebro.run()
+
+    # after the run no line of the datas may remain in shared memory
+    assert not any(line._mapsrc for line in cerebro.datas[0].lines)
+
+    return [(r[0].p.period, r[0].analyzers.smasum.get_analysis())
+            for r in results]
+
+
+def _runfull():
+    # full strategies (optreturn=False) are returned with their lines mapped
+    # to the blocks of the main process, each attached only once
+    errors = list()
+    hook, sys.unraisablehook = sys.unraisablehook, errors.append
+    try:
+        cerebro = bt.Cerebro(maxcpus=2, optreturn=False)
+        cerebro.adddata(testcommon.getdata(0))
+        cerebro.optstrategy(SharedFullStrategy, period=range(10, 20))
+        results = cerebro.run()
+
+        values = [r[0].sma[0] for r in results]
+        del results, cerebro
+        gc.collect()  # blocks which could not be closed would complain here
+    finally:
+        sys.unraisablehook = hook
+
+    return values, errors
+
+
+def test_run(main=False):
+    expected = _run(maxcpus=1)
+    shared = _run(maxcpus=2)
+    private = _run(maxcpus=2, optshared=False)
+
+    domap = 'mapshared' if linebuffer.shared_memory is not None else None
+    assert all(r['mapping'] is None for p, r in expected + private)
+    assert all(r['mapping'] == domap for p, r in shared)
+
+    strip = lambda rs: [(p, r['sum']) for p, r in rs]
+    assert strip(expected) == strip(shared) == strip(private)
+
+    values, errors = _runfull()
+    assert len(values) == 10 and not errors
+
+    if main:
+        for p, r in shared:
+            print('period', p, 'sum', r['sum'], 'mapping', r['mapping'])
+
+
+if __name__ == '__main__':
+    test_run(main=True)
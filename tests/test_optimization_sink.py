@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import csv
+import io
+import os
+import shutil
+import sys
+import tempfile
+
+import testcommon
+
+import backtrader as bt
+
+
+class RunStrategy(bt.Strategy):
+    params = (('period', 15),)
+
+    def __init__(self):
+        self.sma = bt.indicators.SMA(self.data, period=self.p.period)
+
+    def next(self):
+        if self.data.close[0] > self.sma[0]:
+            self.buy()
+        elif self.position:
+            self.close()
+
+
+PERIODS = list(range(10, 22))
+
+
+def _run(out, **kwargs):
+    cerebro = bt.Cerebro(optreturn=True, **kwargs)
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.optstrategy(RunStrategy, period=PERIODS)
+    cerebro.addanalyzer(bt.analyzers.SQN, _name='sqn')
+    cerebro.addoptsink(bt.OptSinkCSV, out=out)
+
+    progress = list()
+    cerebro.optprogress(lambda p: progress.append((p.done, p.total, p.eta)))
+    results = cerebro.run()
+    return results, progress
+
+
+def _read(out):
+    with io.open(out, 'r', newline='') as f:
+        return list(csv.DictReader(f))
+
+
+def test_run(main=False):
+    tmpdir = tempfile.mkdtemp()
+    try:
+        out = os.path.join(tmpdir, 'opt.csv')
+        results, progress = _run(out, maxcpus=1)
+        rows = _read(out)
+        assert [int(r['period']) for r in rows] == PERIODS
+        assert len(results) == len(PERIODS)
+        assert progress[-1][:2] == (len(PERIODS), len(PERIODS))
+        assert progress[-1][2] == 0.0
+
+        sqns = [r[0].analyzers.sqn.get_analysis().sqn for r in results]
+        assert [float(r['sqn.sqn']) for r in rows] == sqns
+
+        if main:
+            print('columns', list(rows[0].keys()))
+
+        # resume after a "crash" which lost the last half of the results
+        for maxcpus, chunksize in [(1, None), (2, None), (2, 4)]:
+            half = len(PERIODS) // 2
+            with io.open(out, 'w', newline='') as f:
+                writer = csv.DictWriter(f, list(rows[0].keys()))
+                writer.writeheader()
+                writer.writerows(rows[:half])
+
+            results, progress = _run(out, maxcpus=maxcpus, optkeep=False,
+                                     optchunksize=chunksize)
+
+            assert results == []
+            assert progress[-1][:2] == (half, half)
+            assert _read(out) == rows
+
+        # nothing left to be done
+        results, progress = _run(out, maxcpus=2)
+        assert results == [] and progress == []
+        assert _read(out) == rows
+
+        # no file: sys.stdout (the default) or a given stream
+        stream, stdout = io.StringIO(), sys.stdout
+        sys.stdout = stream
+        try:
+            _run(None, maxcpus=1)
+        finally:
+            sys.stdout = stdout
+
+        given = io.StringIO()
+        _run(given, maxcpus=1)
+        for f in (stream, given):
+            assert not f.closed
+            f.seek(0)
+            assert list(csv.DictReader(f)) == rows
+
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -121,5 +121,20 @@ def test_run(main=False):
     assert pending[1].size == 40
     assert pending[1].price == 1.3
 
+    # The clone is a snapshot: later changes to the order do not reach it
+    assert clone.ref == order.ref and clone.status == bt.Order.Completed
+    assert clone.executed.size == order.executed.size == 100
+    assert clone.created is order.created
+    order.cancel()
+    assert clone.status == bt.Order.Completed
+    assert clone.p.size == 100 and clone.data is order.data
+
+    # The values are held in slots
+    for obj in (order.created, order.executed[0], position):
+        assert not hasattr(obj, '__dict__')
+
+    order.addinfo(name='o1')
+    assert order.info.name == 'o1'
+
 if __name__ == '__main__':
     test_run(main=True)
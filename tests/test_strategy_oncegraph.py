@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import math
+
+import testcommon
+
+import backtrader as bt
+
+
+class NextRange(bt.Indicator):
+    lines = ('range',)
+
+    def __init__(self):
+        self.hl = self.data.high - self.data.low
+
+    def next(self):  # once is simulated with next
+        self.l.range[0] = self.hl[0] + self.data.close[0] - self.data.open[-1]
+
+
+class OwnOnce(bt.Indicator):
+    lines = ('own',)
+
+    def __init__(self):
+        self.l.own = bt.ind.SMA(self.data, period=3)
+        self.oncecalls = 0
+
+    def _once(self):  # cannot be replaced by the flat schedule
+        self.oncecalls += 1
+        super(OwnOnce, self)._once()
+
+
+class OnceGraphStrategy(bt.Strategy):
+    def __init__(self):
+        d = self.data
+        self.inds = [
+            bt.ind.MACDHisto(d),
+            bt.ind.Ichimoku(d),
+            bt.ind.Stochastic(d),
+            NextRange(d),
+            bt.ind.SMA(NextRange(d), period=3),
+            bt.ind.SMA(d.close - d.open, period=5) > d.high(-1),
+            OwnOnce(d),
+        ]
+        self.values = list()
+
+    def next(self):
+        self.values.append([ind[0] for ind in self.inds])
+        if self.inds[0].histo[0] > 0:
+            self.buy()
+        elif self.position:
+            self.close()
+
+    def stop(self):
+        self.value = self.broker.getvalue()
+
+
+class FusedStrategy(bt.Strategy):
+    params = (('zerodiv', False),)
+
+    def __init__(self):
+        d = self.data
+        self.hl = d.high - d.low  # kept: cannot be fused
+        self.chain = (self.hl + (d.close - d.open) * 2.0) / abs(-d.close)
+        self.sma = bt.ind.SMA(d.close * 2.0 - d.open, period=3)
+        if self.p.zerodiv:
+            self.zero = (d.close - d.open) / (d.close - d.close)
+
+        self.values = list()
+
+    def next(self):
+        self.values.append([self.hl[0], self.chain[0], self.sma[0]])
+
+
+def _run(oncegraph, stratcls=OnceGraphStrategy, **kwargs):
+    cerebro = bt.Cerebro(stdstats=False, oncegraph=oncegraph)
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.addstrategy(stratcls, **kwargs)
+    strat = cerebro.run()[0]
+
+    # nan != nan ... replace it for the comparison
+    values = [['nan' if math.isnan(x) else x for x in vals]
+              for vals in strat.values]
+    return strat, values
+
+
+def test_run(main=False):
+    strat, values = _run(False)
+    gstrat, gvalues = _run(True)
+
+    assert strat._oncesteps is None
+    assert gstrat._oncesteps  # the schedule has been compiled
+
+    assert values == gvalues
+    assert strat.inds[-1].oncecalls == gstrat.inds[-1].oncecalls == 1
+    assert gstrat.inds[-1]._once in gstrat._oncesteps
+    assert strat.value == gstrat.value
+    if main:
+        print(len(gstrat._oncesteps), gstrat.value)
+
+    # chains of operations are fused in a single expression
+    strat, values = _run(False, FusedStrategy)
+    gstrat, gvalues = _run(True, FusedStrategy)
+    assert values == gvalues
+
+    ops = [op for op in gstrat.getindicators()
+           if isinstance(op, bt.linebuffer.LineActions)]
+    fused = [op for op in ops if op._fusedin is not None]
+    assert gstrat.chain._fused and gstrat.chain._fusedin is None
+    assert len(gstrat.chain._fused) == 5  # - * + neg abs
+    assert all(op.buflen() == 0 for op in fused)  # no intermediate buffers
+    assert len(fused) == 6  # and close * 2.0 in the input of the sma
+    assert gstrat.hl._fusedin is None and gstrat.hl.buflen()
+    sma = gstrat.sma.data.lines[0]  # the input of an indicator is a buffer
+    assert sma._fusedin is None and len(sma._fused) == 1
+
+    # a division by zero fails as it does without fusing
+    for oncegraph in (False, True):
+        try:
+            _run(oncegraph, FusedStrategy, zerodiv=True)
+        except ZeroDivisionError:
+            pass
+        else:
+            assert False, 'division by zero not raised'
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import testcommon
+
+import backtrader as bt
+
+
+class VecCrossStrategy(bt.SignalStrategy):
+    params = (
+        ('sigtype', bt.SIGNAL_LONGSHORT),
+        ('exit', False),
+    )
+
+    def __init__(self):
+        sma1, sma2 = bt.ind.SMA(period=10), bt.ind.SMA(period=30)
+        self.signal_add(self.p.sigtype, bt.ind.CrossOver(sma1, sma2))
+        if self.p.exit:
+            self.signal_add(bt.SIGNAL_LONGEXIT,
+                            self.data.close - bt.ind.SMA(period=15))
+
+
+class VecCrossNotify(VecCrossStrategy):
+    def notify_trade(self, trade):
+        pass  # must be called bar by bar: no vectorized run
+
+
+# cash, commission, futures, coc, checksubmit, signal type, exit, accumulate
+CHECKS = [
+    (30000.0, 0.0, False, False, True, bt.SIGNAL_LONGSHORT, False, False),
+    (30000.0, 0.01, False, True, True, bt.SIGNAL_LONG, True, True),
+    (12000.0, 0.01, False, False, False, bt.SIGNAL_SHORT, False, True),
+    (60000.0, 2.0, True, False, True, bt.SIGNAL_LONGSHORT, False, True),
+    (60000.0, 2.0, True, True, False, bt.SIGNAL_LONG, True, False),
+]
+
+
+def runcheck(idata, vecsignals, check, stratcls=VecCrossStrategy):
+    cash, comm, futures, coc, checksubmit, sigtype, exit, acc = check
+
+    cerebro = bt.Cerebro(stdstats=False, vecsignals=vecsignals)
+    cerebro.adddata(testcommon.getdata(idata))
+    cerebro.addstrategy(stratcls, sigtype=sigtype, exit=exit,
+                        _accumulate=acc)
+    cerebro.addsizer(bt.sizers.FixedSize, stake=3)
+    cerebro.broker.set_cash(cash)
+    cerebro.broker.set_coc(coc)
+    cerebro.broker.set_checksubmit(checksubmit)
+    if futures:
+        cerebro.broker.setcommission(commission=comm, margin=2000.0, mult=10)
+    else:
+        cerebro.broker.setcommission(commission=comm)
+
+    cerebro.addanalyzer(bt.analyzers.TimeReturn,
+                        timeframe=bt.TimeFrame.Weeks)
+    cerebro.addanalyzer(bt.analyzers.DrawDown)
+    cerebro.addanalyzer(bt.analyzers.TradeAnalyzer)
+
+    strat = cerebro.run()[0]
+    results = [analyzer.get_analysis() for analyzer in strat.analyzers]
+    broker = cerebro.broker
+    return strat, results, (broker.getvalue(), broker.getcash(),
+                            broker.getposition(strat.data).size)
+
+
+def test_run(main=False):
+    for idata in range(2):
+        for check in CHECKS:
+            strat, results, state = runcheck(idata, False, check)
+            vstrat, vresults, vstate = runcheck(idata, True, check)
+
+            if main:
+                print(idata, check, state, vresults[2].total.total)
+
+            assert not hasattr(strat, 'vecsignal')
+            assert vstrat.vecsignal.value[-1] == state[0]
+            assert vresults == results
+            assert vstate == state
+
+    # a strategy with code to run bar by bar goes through the event loop
+    strat, _, _ = runcheck(0, True, CHECKS[0], stratcls=VecCrossNotify)
+    assert not hasattr(strat, 'vecsignal')
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -88,6 +88,9 @@ def test_run(main=False):
     assert not tr.isclosed
     assert tr.size == size + upsize
     assert tr.price == price  # size is being reduced, price must not change
+
+    clone = tr.clone()  # snapshot as delivered in notifications
+    assert clone.ref == tr.ref and clone.size == tr.size and clone.long
     # assert tr.value == upvalue
     assert tr.commission == commission + upcomm
 
@@ -123,6 +126,7 @@ def test_run(main=False):
 
     assert tr.isclosed
     assert tr.size == size + upsize
+    assert not clone.isclosed and clone.size == 5
     assert tr.price == price  # no change ... we simple closed the operation
     # assert tr.value == upvalue
     assert tr.commission == commission + upcomm
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import datetime
+
+import testcommon
+
+from backtrader import mathsupport
+from backtrader.utils import (date2num, num2date, npepoch2nums, npnum2dates,
+                              nplocal2nums, UTC)
+
+
+class DSTZone(datetime.tzinfo):
+    '''UTC+1 with UTC+2 from the 26th of March (02:00) to the 29th of October
+    (03:00) of each year (in local time)'''
+    def _isdst(self, dt):
+        dt = dt.replace(tzinfo=None)
+        return (datetime.datetime(dt.year, 3, 26, 2) <= dt <
+                datetime.datetime(dt.year, 10, 29, 3))
+
+    def utcoffset(self, dt):
+        return datetime.timedelta(hours=1 + self._isdst(dt))
+
+    def dst(self, dt):
+        return datetime.timedelta(hours=self._isdst(dt))
+
+    def tzname(self, dt):
+        return 'DST' if self._isdst(dt) else 'STD'
+
+    def localize(self, dt):
+        return dt.replace(tzinfo=self)
+
+
+def test_run(main=False):
+    tz = DSTZone()
+
+    # minute bars over a year and the hours around the transitions
+    start = datetime.datetime(2006, 1, 2)
+    dts = [start + datetime.timedelta(minutes=37 * i) for i in range(15000)]
+    for day in (datetime.datetime(2006, 3, 26), datetime.datetime(2006, 10, 29)):
+        dts += [day + datetime.timedelta(minutes=m) for m in range(0, 300, 7)]
+
+    nums = [date2num(dt) for dt in dts]
+
+    # cached offsets deliver the values of localize/astimezone
+    utcdts = [num2date(x) for x in nums]
+    assert [date2num(dt, tz=tz) for dt in utcdts] == \
+        [date2num(tz.localize(dt)) for dt in utcdts]
+
+    assert [num2date(x, tz=tz) for x in nums] == \
+        [dt.replace(tzinfo=UTC).astimezone(tz).replace(tzinfo=None)
+         for dt in utcdts]
+
+    # memoized: same object
+    assert num2date(nums[0], tz=tz) is num2date(nums[0], tz=tz)
+
+    if main:
+        print('scalar conversions equal', len(nums))
+
+    if mathsupport.np is None:
+        return  # no batch conversions
+
+    np = mathsupport.np
+    assert npnum2dates(nums).tolist() == utcdts
+    assert npnum2dates(nums, tz=tz).tolist() == \
+        [num2date(x, tz=tz) for x in nums]
+    assert nplocal2nums(nums, tz).tolist() == \
+        [date2num(dt, tz=tz) for dt in utcdts]
+
+    epoch = datetime.datetime(1970, 1, 1)
+    seconds = [(dt - epoch).total_seconds() for dt in dts]
+    assert npepoch2nums(np.array(seconds, dtype=np.int64)).tolist() == nums
+    assert npepoch2nums(np.array(seconds) * 1e3, unit='ms').tolist() == nums
+
+    if main:
+        print('batch conversions equal')
+
+
+if __name__ == '__main__':
+    test_run(main=True)
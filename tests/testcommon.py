@@ -25,6 +25,7 @@ import datetime
 import os
 import os.path
 import sys
+import unittest
 
 # append module root directory to sys.path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -58,6 +59,34 @@ def getdata(index, fromdate=FROMDATE, todate=TODATE):
     return data
 
 
+def skiptest(reason):
+    '''Skips the running test, which is reported as skipped (and not as
+    passed) by the test runners'''
+    raise unittest.SkipTest(reason)
+
+
+def preloadlines(datacls, bulkload, **kwargs):
+    '''Preloads a data feed with or without the bulk path and returns the
+    values of its lines'''
+    data = datacls(bulkload=bulkload, **kwargs)
+    data.setenvironment(bt.Cerebro())
+    data._start()
+    data.preload()
+    return [list(line.array) for line in data.lines]
+
+
+def checkbulkload(datacls, main=False, **kwargs):
+    '''Checks that the bulk path delivers the same values as the row by row
+    path during preload'''
+    rowlines = preloadlines(datacls, False, **kwargs)
+    bulklines = preloadlines(datacls, True, **kwargs)
+
+    if main:
+        print(datacls.__name__, 'bars', len(rowlines[0]))
+
+    assert str(rowlines) == str(bulklines)  # str: NaN == NaN
+
+
 def runtest(datas,
             strategy,
             runonce=None,
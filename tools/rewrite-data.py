@@ -29,16 +29,15 @@ import sys
 
 
 import backtrader as bt
-from backtrader.utils.py3 import bytes
+from backtrader.utils.py3 import bytes, string_types
 
 
 DATAFORMATS = dict(
     btcsv=bt.feeds.BacktraderCSVData,
+    btbin=bt.feeds.BacktraderBinaryData,
     vchartcsv=bt.feeds.VChartCSVData,
     vchart=bt.feeds.VChartData,
-    vcdata=bt.feeds.VCData,
     vcfile=bt.feeds.VChartFile,
-    ibdata=bt.feeds.IBData,
     sierracsv=bt.feeds.SierraChartCSVData,
     mt4csv=bt.feeds.MT4CSVData,
     yahoocsv=bt.feeds.YahooFinanceCSVData,
@@ -46,6 +45,11 @@ DATAFORMATS = dict(
     yahoo=bt.feeds.YahooFinanceData,
 )
 
+# feeds which are only available if their packages are installed
+for fmtname, clsname in (('vcdata', 'VCData'), ('ibdata', 'IBData')):
+    if hasattr(bt.feeds, clsname):
+        DATAFORMATS[fmtname] = getattr(bt.feeds, clsname)
+
 
 class RewriteStrategy(bt.Strategy):
     params = (
@@ -93,6 +97,31 @@ class RewriteStrategy(bt.Strategy):
         self.f.write(bytes(txt))
 
 
+class BinaryRewriteStrategy(bt.Strategy):
+    '''Writes all bars of the data at the end in the format read by
+    BacktraderBinaryData'''
+    params = (
+        ('outfile', None),
+        ('valuesize', 8),
+    )
+
+    def stop(self):
+        data = self.data
+        columns = dict()
+        for name in bt.feeds.btbinary.FIELDS:
+            columns[name] = getattr(data.lines, name).get(size=len(data))
+
+        tz = data.p.tz
+        if not isinstance(tz, string_types):
+            tz = getattr(tz, 'zone', '')  # pytz timezones have a name
+
+        bt.feeds.writebinary(self.p.outfile, columns,
+                             timeframe=data._timeframe,
+                             compression=data._compression,
+                             tz=tz, symbol=data._name,
+                             valuesize=self.p.valuesize)
+
+
 def runstrat(pargs=None):
     args = parse_args(pargs)
 
@@ -119,13 +148,28 @@ def runstrat(pargs=None):
         todate = datetime.datetime.strptime(args.todate, fmtstr)
         dfkwargs['todate'] = todate
 
+    if args.timeframe is not None:
+        dfkwargs['timeframe'] = bt.TimeFrame.TFrame(args.timeframe)
+    if args.compression is not None:
+        dfkwargs['compression'] = args.compression
+    if args.tz is not None:
+        dfkwargs['tz'] = args.tz
+
     dfcls = DATAFORMATS[args.format]
     data = dfcls(dataname=args.infile, **dfkwargs)
     cerebro.adddata(data)
 
-    cerebro.addstrategy(RewriteStrategy,
-                        separator=args.separator,
-                        outfile=args.outfile)
+    if args.outformat == 'btbin':
+        if args.outfile is None:
+            sys.exit('An output file is needed for the binary format')
+
+        cerebro.addstrategy(BinaryRewriteStrategy,
+                            outfile=args.outfile,
+                            valuesize=args.valuesize)
+    else:
+        cerebro.addstrategy(RewriteStrategy,
+                            separator=args.separator,
+                            outfile=args.outfile)
 
     cerebro.run(stdstats=False)
 
@@ -141,7 +185,8 @@ def runstrat(pargs=None):
 def parse_args(pargs=None):
     parser = argparse.ArgumentParser(
         formatter_class=argparse.ArgumentDefaultsHelpFormatter,
-        description='Rewrite formats to BacktraderCSVData format')
+        description=('Rewrite formats to BacktraderCSVData format or to '
+                     'the binary format of BacktraderBinaryData'))
 
     parser.add_argument('--format', '-fmt', required=False,
                         choices=DATAFORMATS.keys(),
@@ -154,6 +199,29 @@ def parse_args(pargs=None):
     parser.add_argument('--outfile', '-o', default=None, required=False,
                         help='File to write to')
 
+    parser.add_argument('--outformat', '-ofmt', required=False,
+                        choices=['btcsv', 'btbin'], default='btcsv',
+                        help='Format to write')
+
+    parser.add_argument('--valuesize', required=False, type=int,
+                        choices=[4, 8], default=8,
+                        help=('Bytes of the prices/volume/openinterest in the '
+                              'binary format (float32/float64)'))
+
+    parser.add_argument('--timeframe', required=False, default=None,
+                        choices=bt.TimeFrame.Names[1:],
+                        help=('Timeframe of the input data (written to the '
+                              'binary format). Default: that of the feed'))
+
+    parser.add_argument('--compression', required=False, default=None,
+                        type=int,
+                        help=('Compression of the input data (written to the '
+                              'binary format). Default: that of the feed'))
+
+    parser.add_argument('--tz', required=False, default=None,
+                        help=('Timezone of the input data (written to the '
+                              'binary format)'))
+
     parser.add_argument('--fromdate', '-f', required=False,
                         help='Starting date in YYYY-MM-DD format')
 